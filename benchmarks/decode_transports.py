@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Compares the cost of decoding SoftLayer responses by transport.
+
+Builds ``Account::getVirtualGuests`` results shaped like the ones of the
+compute driver masks, encodes them as the XML-RPC and REST endpoints do
+and times how long decoding them takes:
+
+    python benchmarks/decode_transports.py --guests 10 100 1000
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import timeit
+
+from six.moves import xmlrpc_client
+
+
+def make_guest(index):
+    return {
+        'id': 1000000 + index,
+        'globalIdentifier': '%08x-0000-4000-8000-%012x' % (index, index),
+        'hostname': 'vs%d' % index,
+        'domain': 'example.com',
+        'fullyQualifiedDomainName': 'vs%d.example.com' % index,
+        'accountId': 123456,
+        'maxCpu': 2,
+        'maxMemory': 4096,
+        'startCpus': 2,
+        'hourlyBillingFlag': True,
+        'localDiskFlag': False,
+        'dedicatedAccountHostOnlyFlag': False,
+        'createDate': '2014-06-03T15:12:37-06:00',
+        'modifyDate': '2014-06-03T15:20:02-06:00',
+        'provisionDate': '2014-06-03T15:20:02-06:00',
+        'primaryIpAddress': '169.54.%d.%d' % (index // 250, index % 250),
+        'primaryBackendIpAddress': '10.1.%d.%d' % (index // 250,
+                                                   index % 250),
+        'status': {'keyName': 'ACTIVE', 'name': 'Active'},
+        'powerState': {'keyName': 'RUNNING', 'name': 'Running'},
+        'datacenter': {'id': 265592, 'name': 'dal05',
+                       'longName': 'Dallas 5'},
+        'operatingSystem': {
+            'softwareLicense': {
+                'softwareDescription': {
+                    'name': 'Ubuntu', 'version': '14.04-64 Minimal',
+                    'referenceCode': 'UBUNTU_14_64'}},
+            'passwords': [{'username': 'root',
+                           'password': 'secret%d' % index}],
+        },
+        'blockDeviceTemplateGroup': {'globalIdentifier': 'image-%d' % index},
+        'tagReferences': [{'tag': {'name': 'tag%d' % tag}}
+                          for tag in range(3)],
+        'networkComponents': [
+            {'id': index * 2 + port, 'port': port, 'speed': 100,
+             'maxSpeed': 1000, 'status': 'ACTIVE',
+             'macAddress': '06:00:00:00:%02x:%02x' % (index % 256, port),
+             'primaryIpAddress': '10.1.0.%d' % port}
+            for port in range(2)],
+        'billingItem': {'id': 50000000 + index, 'recurringFee': '0.067',
+                        'orderItem': {'order': {'userRecordId': 42}}},
+    }
+
+
+def encode(guests):
+    xmlrpc = xmlrpc_client.dumps((guests,), methodresponse=True,
+                                 allow_none=True)
+    return xmlrpc.encode('utf-8'), json.dumps(guests).encode('utf-8')
+
+
+def decode_xmlrpc(content):
+    return xmlrpc_client.loads(content)[0][0]
+
+
+def decode_json(content):
+    return json.loads(content.decode('utf-8'))
+
+
+def run(count, repeat):
+    guests = [make_guest(index) for index in range(count)]
+    xmlrpc, rest = encode(guests)
+    assert decode_xmlrpc(xmlrpc) == decode_json(rest) == guests
+
+    number = max(1, 1000 // count)
+    results = {}
+    for name, decode, content in [('xmlrpc', decode_xmlrpc, xmlrpc),
+                                  ('rest', decode_json, rest)]:
+        best = min(timeit.repeat(lambda: decode(content), number=number,
+                                 repeat=repeat))
+        results[name] = (best / number * 1000, len(content))
+
+    print('%6d guests  xmlrpc %9.2f ms %9d bytes  rest %9.2f ms %9d bytes'
+          '  %5.1fx' % (count, results['xmlrpc'][0], results['xmlrpc'][1],
+                        results['rest'][0], results['rest'][1],
+                        results['xmlrpc'][0] / results['rest'][0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guests', type=int, nargs='+',
+                        default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for count in args.guests:
+        run(count, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Benchmarks jumpgate end to end against a fake SoftLayer API.
+
+For every account size, builds the application with
+``jumpgate.wsgi.make_api`` in a fresh process, sends one request of each
+flow to check its SoftLayer API call budget (see
+``jumpgate.testing.load.FLOWS``) and then times a run of every flow:
+
+    python benchmarks/e2e.py --guests 10 1000 10000
+    python benchmarks/e2e.py --transport rest --slapi-latency 0.05 \\
+        --save results.json
+    python benchmarks/e2e.py --baseline results.json --tolerance 0.25
+
+Exits with an error when a flow fails, exceeds its call budget or, given
+a baseline, its p99 latency grew beyond the tolerance.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join(ROOT, 'etc', 'jumpgate.conf')
+
+
+def run_size(args, guests):
+    """Benchmarks one account size, in the current process."""
+    sys.path.insert(0, ROOT)
+    from jumpgate.testing import load
+
+    harness = load.LoadHarness(args.config, guests=guests,
+                               transport=args.transport,
+                               latency=args.slapi_latency)
+    results = {}
+    try:
+        harness.authenticate()
+        for name, method, path, budget in load.FLOWS:
+            if args.flows and name not in args.flows:
+                continue
+            result = {'budget': budget}
+            try:
+                result['cold_calls'] = harness.check_budget(name, method,
+                                                            path, budget)
+            except AssertionError as e:
+                result['failure'] = str(e)
+            result.update(harness.run_flow(method, path,
+                                           requests=args.requests,
+                                           concurrency=args.concurrency,
+                                           duration=args.duration))
+            results[name] = result
+    finally:
+        harness.close()
+    return results
+
+
+def spawn(args, guests):
+    command = [sys.executable, os.path.abspath(__file__), '--worker',
+               '--guests', str(guests), '--config', args.config,
+               '--transport', args.transport,
+               '--slapi-latency', str(args.slapi_latency),
+               '--requests', str(args.requests),
+               '--concurrency', str(args.concurrency),
+               '--duration', str(args.duration)]
+    if args.flows:
+        command += ['--flows'] + args.flows
+    output = subprocess.check_output(command)
+    return json.loads(output.decode('utf-8'))
+
+
+def report(guests, results, baseline, tolerance):
+    failures = []
+    print('%d guests' % guests)
+    print('  %-16s %8s %6s %9s %9s %9s %6s' % (
+        'flow', 'req/s', 'calls', 'p50 ms', 'p90 ms', 'p99 ms', 'errors'))
+    for name, result in sorted(results.items()):
+        print('  %-16s %8.1f %6.1f %9.2f %9.2f %9.2f %6d' % (
+            name, result['throughput'], result['slapi_calls'],
+            result['p50'] * 1000, result['p90'] * 1000,
+            result['p99'] * 1000, result['errors']))
+        if 'failure' in result:
+            failures.append(result['failure'])
+        if result['errors']:
+            failures.append('%s: %d requests failed'
+                            % (name, result['errors']))
+
+        previous = baseline.get(str(guests), {}).get(name)
+        if previous and result['p99'] > previous['p99'] * (1 + tolerance):
+            failures.append('%s: p99 latency %.2f ms, baseline %.2f ms'
+                            % (name, result['p99'] * 1000,
+                               previous['p99'] * 1000))
+    return ['%d guests, %s' % (guests, failure) for failure in failures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guests', type=int, nargs='+',
+                        default=[10, 1000, 10000])
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help='Base jumpgate configuration')
+    parser.add_argument('--transport', default='xmlrpc',
+                        choices=['xmlrpc', 'rest'])
+    parser.add_argument('--slapi-latency', type=float, default=0,
+                        help='Seconds added to every SoftLayer API call')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Requests sent per flow')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Seconds after which a flow stops sending '
+                             'requests')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Threads sending requests')
+    parser.add_argument('--flows', nargs='+',
+                        help='Flows to run, all of them by default')
+    parser.add_argument('--save', help='Writes the results to a JSON file')
+    parser.add_argument('--baseline',
+                        help='JSON file of results to compare latencies to')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed p99 latency growth over the baseline')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_size(args, args.guests[0]), sys.stdout)
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # Drivers cache module level state, so each size gets its own process
+    results = {}
+    failures = []
+    for guests in args.guests:
+        results[str(guests)] = spawn(args, guests)
+        failures += report(guests, results[str(guests)], baseline,
+                           args.tolerance)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if failures:
+        print('\n'.join(['FAILED'] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
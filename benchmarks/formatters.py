@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""Times the formatters building list responses, per formatted item.
+
+SoftLayer payloads come from jumpgate.testing.fake_slapi accounts, masked
+like the drivers request them. Every formatter formats all the items of a
+list response the way its handler does, with a request routed through the
+real dispatchers:
+
+    python benchmarks/formatters.py --items 100 1000
+    python benchmarks/formatters.py --save before.json
+    python benchmarks/formatters.py --baseline before.json
+
+On Python 3, tracemalloc also reports the memory allocated per item
+(total of the allocations, freed or not) and the peak of a list.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from falcon.testing import helpers  # noqa
+import falcon  # noqa
+import mock  # noqa
+
+from jumpgate import api  # noqa
+from jumpgate.common import dispatcher  # noqa
+from jumpgate.common import utils  # noqa
+from jumpgate.compute.drivers.sl import flavors  # noqa
+from jumpgate.compute.drivers.sl import servers  # noqa
+from jumpgate.image.drivers.sl import images  # noqa
+from jumpgate.network.drivers.sl import networks  # noqa
+from jumpgate.network.drivers.sl import subnets  # noqa
+from jumpgate.testing import fake_slapi  # noqa
+from jumpgate.volume.drivers.sl import volumes  # noqa
+
+MOUNTS = [('compute', '/compute'), ('image', '/image'),
+          ('volume', '/volume'), ('network', '/network')]
+
+
+def make_app():
+    app = api.Jumpgate()
+    for service, mount in MOUNTS:
+        disp = dispatcher.Dispatcher(mount=mount)
+        __import__('jumpgate.' + service, fromlist=['add_endpoints'])
+        sys.modules['jumpgate.' + service].add_endpoints(disp)
+        app.add_dispatcher(service, disp)
+    return app
+
+
+def make_request(tenant_id):
+    req = falcon.Request(helpers.create_environ(
+        path='/compute/v2/%s/servers/detail' % tenant_id,
+        headers={'Host': 'jumpgate.example.com'}))
+    req.env['tenant_id'] = str(tenant_id)
+    req.env['sl_client'] = mock.MagicMock()
+    return req
+
+
+def make_flavors(count):
+    flavor_list = []
+    for index in range(count):
+        flavor_list.append({
+            'id': str(index + 1), 'name': 'flavor %d' % index,
+            'cpus': index % 8 + 1, 'ram': 1024 * (index % 16 + 1),
+            'disk': 25, 'disk-type': 'SAN', 'portspeed': 100})
+    return flavor_list
+
+
+def make_cases(count):
+    """Returns {name: (function formatting all items, item count)}."""
+    data = fake_slapi.generate_account(guests=count, images=count,
+                                       vlans=count)
+    api_ = fake_slapi.FakeSLAPI(data)
+    tenant_id = fake_slapi.ACCOUNT_ID
+
+    def fetch(service, method, mask=None):
+        return api_.call(service, method, mask=mask)
+
+    guests = fetch('Account', 'getVirtualGuests',
+                   servers.get_virtual_guest_mask())
+    private_images = fetch('Account', 'getPrivateBlockDeviceTemplateGroups',
+                           images.SLImages.image_mask)
+    disks = fetch('Account', 'getVirtualDiskImages',
+                  volumes.get_virt_disk_img_mask())
+    vlans = fetch('Account', 'getNetworkVlans', networks.NETWORK_MASK)
+    account_subnets = fetch('Account', 'getSubnets')
+    flavor_refs = make_flavors(min(count, 200))
+
+    app = make_app()
+    client = mock.MagicMock()
+
+    def server_details():
+        req = make_request(tenant_id)
+        return [servers.get_server_details_dict(app, req, guest, False)
+                for guest in guests]
+
+    def v2_images():
+        req = make_request(tenant_id)
+        return [images.get_v2_image_details_dict(app, req, image, tenant_id)
+                for image in private_images]
+
+    def v1_images():
+        req = make_request(tenant_id)
+        return [images.get_v1_image_details_dict(app, req, image, tenant_id)
+                for image in private_images]
+
+    def volume_list():
+        return [volumes.format_volume(tenant_id, disk, client)
+                for disk in disks]
+
+    def subnet_list():
+        return [subnets.format_subnetwork(subnet, tenant_id)
+                for subnet in account_subnets]
+
+    def network_list():
+        return [networks.format_network(vlan, tenant_id) for vlan in vlans]
+
+    def flavor_details():
+        req = make_request(tenant_id)
+        flavor_url = utils.url_builder(app, req, 'compute', 'v2_flavor',
+                                       'flavor_id')
+        return [flavors.get_flavor_details(app, req, flavor, detail=True,
+                                           flavor_url=flavor_url)
+                for flavor in flavor_refs]
+
+    return {
+        'get_server_details_dict': (server_details, len(guests)),
+        'get_v2_image_details_dict': (v2_images, len(private_images)),
+        'get_v1_image_details_dict': (v1_images, len(private_images)),
+        'format_volume': (volume_list, len(disks)),
+        'format_subnetwork': (subnet_list, len(account_subnets)),
+        'format_network': (network_list, len(vlans)),
+        'get_flavor_details': (flavor_details, len(flavor_refs)),
+    }
+
+
+def measure_allocations(func):
+    tracemalloc.start()
+    try:
+        start = tracemalloc.take_snapshot()
+        result = func()
+        end = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in
+                    end.compare_to(start, 'filename')
+                    if stat.size_diff > 0)
+    del result
+    return allocated, peak
+
+
+def run(count, repeat, allocations):
+    results = {}
+    for name, (func, items) in sorted(make_cases(count).items()):
+        number = max(1, 2000 // max(items, 1))
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        result = {'items': items, 'us_per_item':
+                  best / number / max(items, 1) * 1e6}
+        if allocations and tracemalloc is not None:
+            allocated, peak = measure_allocations(func)
+            result['bytes_per_item'] = allocated / float(max(items, 1))
+            result['peak_bytes'] = peak
+        results[name] = result
+    return results
+
+
+def report(count, results, baseline):
+    print('%d items' % count)
+    print('  %-28s %6s %10s %12s %12s %8s' % (
+        'formatter', 'items', 'us/item', 'bytes/item', 'peak KiB',
+        'speedup'))
+    for name, result in sorted(results.items()):
+        previous = baseline.get(str(count), {}).get(name)
+        speedup = ''
+        if previous:
+            speedup = '%.2fx' % (previous['us_per_item'] /
+                                 result['us_per_item'])
+        print('  %-28s %6d %10.2f %12.0f %12.1f %8s' % (
+            name, result['items'], result['us_per_item'],
+            result.get('bytes_per_item', 0),
+            result.get('peak_bytes', 0) / 1024.0, speedup))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[100, 1000],
+                        help='Items per list response')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-allocations', action='store_true',
+                        help='Skip the tracemalloc reports')
+    parser.add_argument('--save', help='Writes the results to a JSON file')
+    parser.add_argument('--baseline',
+                        help='JSON file of results to compare timings to')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for count in args.items:
+        results[str(count)] = run(count, args.repeat,
+                                  not args.no_allocations)
+        report(count, results[str(count)], baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
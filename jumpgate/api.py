@@ -1,12 +1,15 @@
 import importlib
 import logging
+import time
 
 import falcon
 
+from jumpgate.common import deadline
 from jumpgate.common import dispatcher
 from jumpgate.common import error_handling
 from jumpgate.common import exceptions
 from jumpgate.common import hooks
+from jumpgate.common import lazy
 from jumpgate.common import nyi
 from jumpgate.common import utils
 from jumpgate import config
@@ -37,6 +40,7 @@ class Jumpgate(object):
         self.default_route = None
 
         self._dispatchers = {}
+        self._lazy_drivers = {}
         self._error_handlers = []
 
     def add_error_handler(self, ex, handler):
@@ -44,21 +48,32 @@ class Jumpgate(object):
             self._error_handlers.insert(0, (ex, handler))
 
     def make_api(self):
+        # The deadline is set right after the request id, before the hooks
+        # creating the SoftLayer client and authenticating the request
+        for index, hook in enumerate([self.hook_bind_app,
+                                      deadline.hook_set_deadline]):
+            if hook not in self.before_hooks:
+                self.before_hooks.insert(index + 1, hook)
         self.before_hooks.extend(self.hooks.optional_request_hooks())
         self.after_hooks.extend(self.hooks.optional_response_hooks())
 
         api = falcon.API(before=self.before_hooks, after=self.after_hooks)
 
         # Set the default route to the NYI object
-        api.add_sink(self.default_route or nyi.NYI(before=self.before_hooks,
-                                                   after=self.after_hooks))
+        default_route = self.default_route or nyi.NYI(before=self.before_hooks,
+                                                      after=self.after_hooks)
+        api.add_sink(default_route)
 
         # Add Error Handlers - ordered generic to more specific
         built_in_handlers = [(Exception, handle_unexpected_errors),
                              (exceptions.ResponseException,
                               exceptions.ResponseException.handle),
                              (exceptions.InvalidTokenError,
-                              exceptions.InvalidTokenError.handle)]
+                              exceptions.InvalidTokenError.handle),
+                             (exceptions.OverLimit,
+                              exceptions.OverLimit.handle),
+                             (exceptions.ServiceUnavailable,
+                              exceptions.ServiceUnavailable.handle)]
 
         for ex, handler in built_in_handlers + self._error_handlers:
             wrapped_handler = utils.wrap_handler_with_hooks(handler,
@@ -72,6 +87,15 @@ class Jumpgate(object):
                 api.add_route(endpoint, handler)
                 api.add_route('%s.json' % endpoint, handler)
 
+        # Lazily loaded services get a sink on their mount instead. The
+        # sinks added last are tried first, so longer mounts are added last
+        services = sorted(self._lazy_drivers,
+                          key=lambda s: len(self._dispatchers[s].mount or ''))
+        for service in services:
+            sink = lazy.LazyService(self, service, self._dispatchers[service],
+                                    self._lazy_drivers[service], default_route)
+            api.add_sink(sink, sink.prefix)
+
         return api
 
     def add_dispatcher(self, service, disp):
@@ -80,6 +104,25 @@ class Jumpgate(object):
     def get_dispatcher(self, service):
         return self._dispatchers[service]
 
+    def route_nickname(self, path):
+        """Returns the nickname of the endpoint handling a path, if any."""
+        return self.route_endpoint(path)[0]
+
+    def route_endpoint(self, path):
+        """Returns the nickname and path template handling a path.
+
+        Both are None when no endpoint handles the path.
+        """
+        for disp in self._dispatchers.values():
+            nickname = disp.match(path)
+            if nickname is not None:
+                return nickname, disp.get_endpoint(nickname)
+        return None, None
+
+    def hook_bind_app(self, req, resp, kwargs):
+        req.env['jumpgate.app'] = self
+        req.env['jumpgate.start_time'] = time.time()
+
     def get_endpoint_url(self, service, *args, **kwargs):
         disp = self._dispatchers.get(service)
         return disp.get_endpoint_url(*args, **kwargs)
@@ -88,23 +131,40 @@ class Jumpgate(object):
         for service in SUPPORTED_SERVICES:
             enabled_services = self.config['enabled_services']
             if service in enabled_services:
-                service_module = importlib.import_module('jumpgate.' + service)
-
-                # Import the dispatcher for the service
-                mount = self.config[service]['mount']
-                disp = dispatcher.Dispatcher(mount=mount)
-                service_module.add_endpoints(disp)
-                self.add_dispatcher(service, disp)
-                self.installed_modules[service] = True
+                self.load_service_endpoints(service)
             else:
                 self.installed_modules[service] = False
 
+    def load_service_endpoints(self, service):
+        service_module = importlib.import_module('jumpgate.' + service)
+
+        # Import the dispatcher for the service
+        mount = self.config[service]['mount']
+        disp = dispatcher.Dispatcher(mount=mount)
+        service_module.add_endpoints(disp)
+        self.add_dispatcher(service, disp)
+        self.installed_modules[service] = True
+
     def load_drivers(self):
         for service, disp in self._dispatchers.items():
-            module = importlib.import_module(self.config[service]['driver'])
-
-            if hasattr(module, 'setup_routes'):
-                module.setup_routes(self, disp)
+            self.load_service_driver(service, disp)
+
+    def load_service_driver(self, service, disp):
+        module = importlib.import_module(self.config[service]['driver'])
+
+        if not hasattr(module, 'setup_routes'):
+            return
+        if self.config.get('lazy_load'):
+            # Hooks are part of the falcon API, only the routes can be set
+            # up after make_api()
+            if hasattr(module, 'add_hooks'):
+                module.add_hooks(self)
+            self._lazy_drivers[service] = module
+        else:
+            self.setup_service_routes(service, module, disp)
+
+    def setup_service_routes(self, service, module, disp):
+        module.setup_routes(self, disp)
 
 
 def handle_unexpected_errors(ex, req, resp, params):
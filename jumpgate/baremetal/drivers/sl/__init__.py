@@ -1,9 +1,12 @@
-from jumpgate.baremetal.drivers.sl import nodes
-from jumpgate.common import sl
+from jumpgate.common import sl as sl_common
 
 
-def setup_routes(app, disp):
-    # V1 Routes
-    disp.set_handler('v1_nodes', nodes.NodesV1())
+def add_hooks(app):
+    sl_common.add_hooks(app)
+
 
-    sl.add_hooks(app)
+def setup_routes(app, disp):
+    # The handlers are imported here, on the first request of a lazily
+    # loaded service
+    from jumpgate.baremetal.drivers.sl import routes
+    routes.setup_routes(app, disp)
@@ -0,0 +1,32 @@
+"""Reports the time jumpgate spends importing and setting up services.
+
+A worker imports jumpgate, loads its configuration, then imports the
+package and the driver of every enabled service and sets up their routes,
+which imports the handler modules and reads their files. Every phase of
+``wsgi.make_api()`` is timed along with the modules it imported, see
+``jumpgate.common.startup``; a module shared by several phases counts for
+the first one only. With lazy_load enabled, setting up the routes of a
+service is deferred to its first request and falcon compiles no route at
+startup. The modules spending the most time importing themselves are
+listed last.
+"""
+from __future__ import print_function
+import argparse
+import os
+
+from jumpgate.common import startup
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report the import and setup time of jumpgate services.')
+    parser.add_argument('--config',
+                        default=os.environ.get('JUMPGATE_CONFIG'),
+                        help='Jumpgate config location')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Slowest modules to list, 0 lists none')
+    args = parser.parse_args()
+
+    profile = startup.StartupProfile(profile_calls=False)
+    profile.run(args.config)
+    profile.report(top=0, modules=args.top)
@@ -3,7 +3,8 @@ import argparse
 import os
 from wsgiref import simple_server
 
-from jumpgate import wsgi
+from jumpgate.common import reloader
+from jumpgate.common import startup
 
 
 def main():
@@ -19,11 +20,37 @@ def main():
                         type=int,
                         default=5000,
                         help='port to listen on')
+    parser.add_argument('--profile-startup',
+                        action='store_true',
+                        help='print a profile of the startup and exit')
+    parser.add_argument('--profile-top',
+                        type=int,
+                        default=20,
+                        help='slowest calls listed by --profile-startup')
+    parser.add_argument('--profile-modules',
+                        type=int,
+                        default=0,
+                        help='slowest modules listed by --profile-startup')
+    parser.add_argument('--profile-output',
+                        help='file --profile-startup saves the call '
+                             'profile to, for pstats or snakeviz')
 
     args = parser.parse_args()
+    if args.profile_startup:
+        profile = startup.StartupProfile()
+        profile.run(args.config)
+        profile.report(top=args.profile_top, modules=args.profile_modules)
+        if args.profile_output:
+            profile.stats.dump_stats(args.profile_output)
+        return
+
+    # Imported here so that --profile-startup times the jumpgate imports
+    from jumpgate import wsgi
     httpd = simple_server.make_server(args.host,
                                       args.port,
                                       wsgi.make_api(args.config))
+    # This process is jumpgate's own, SIGHUP may reload files
+    reloader.start(sighup=True)
     print("Starting server on (%s:%s)" % (args.host, args.port))
     print("""
 Warning: This is currently a test server for Jumpgate and not fit for
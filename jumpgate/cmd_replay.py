@@ -0,0 +1,200 @@
+"""Replays captured requests against a jumpgate instance.
+
+Reads the files written by ``jumpgate.common.hooks.capture`` and sends
+their requests with the captured inter-arrival times divided by --speed.
+Captured placeholders are filled with the replay credentials: the tenant
+id of its token and the token id itself. Token requests send the replay
+credentials. Other requests with a body are skipped unless
+--include-writes is given, in which case they are sent with an empty
+JSON object since bodies are never captured.
+"""
+from __future__ import print_function
+import argparse
+import collections
+from concurrent import futures
+import glob
+import json
+import sys
+import threading
+import time
+
+import requests
+
+READ_METHODS = ('GET', 'HEAD')
+TOKENS_ROUTE = 'v2_tokens'
+
+
+def load_records(paths):
+    """Returns the captured records of files, by time.
+
+    Rotated files (capture.jsonl.1, ...) matching the given paths are read
+    as well.
+    """
+    records = []
+    for path in paths:
+        for name in sorted(set(glob.glob(path) + glob.glob(path + '.*'))):
+            with open(name) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        records.append(json.loads(line))
+    records.sort(key=lambda record: record.get('time') or 0)
+    return records
+
+
+def percentile(durations, pct):
+    if not durations:
+        return 0
+    ordered = sorted(durations)
+    return ordered[min(int(len(ordered) * pct / 100.0), len(ordered) - 1)]
+
+
+class Replayer(object):
+    """Sends captured requests to a jumpgate instance."""
+
+    def __init__(self, url, username=None, api_key=None, token=None,
+                 tenant_id=None, include_writes=False, timeout=60):
+        self.url = url.rstrip('/')
+        self.username = username
+        self.api_key = api_key
+        self.token = token
+        self.tenant_id = tenant_id
+        self.include_writes = include_writes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.results = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.lag = []
+        self.skipped = 0
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _credentials(self):
+        return {'auth': {'passwordCredentials': {
+            'username': self.username, 'password': self.api_key}}}
+
+    def authenticate(self):
+        if self.token is not None:
+            return
+        resp = self._session().post(self.url + '/v2.0/tokens',
+                                    json=self._credentials(),
+                                    timeout=self.timeout)
+        resp.raise_for_status()
+        token = resp.json()['access']['token']
+        self.token = token['id']
+        self.tenant_id = token['tenant']['id']
+
+    def prepare(self, record):
+        """Returns the (method, path, params, body) to send, or None."""
+        method = record['method']
+        body = None
+        if record.get('route') == TOKENS_ROUTE and method == 'POST':
+            body = self._credentials()
+        elif method not in READ_METHODS:
+            if not self.include_writes:
+                return None
+            body = {}
+
+        path = (record['path']
+                .replace('{tenant_id}', str(self.tenant_id))
+                .replace('{token_id}', str(self.token)))
+        return method, path, record.get('query') or {}, body
+
+    def send(self, record, scheduled):
+        request = self.prepare(record)
+        if request is None:
+            with self._lock:
+                self.skipped += 1
+            return
+
+        method, path, params, body = request
+        start = time.time()
+        try:
+            resp = self._session().request(
+                method, self.url + path, params=params, json=body,
+                headers={'X-Auth-Token': self.token}, timeout=self.timeout)
+            status = resp.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        duration = time.time() - start
+
+        key = record.get('route') or path
+        with self._lock:
+            self.lag.append(start - scheduled)
+            self.results[key].append(duration)
+            if not isinstance(status, int) or status >= 500:
+                self.errors[key] += 1
+
+    def replay(self, records, speed=1.0, concurrency=16):
+        """Sends records, keeping their intervals divided by speed."""
+        if not records:
+            return 0
+        first = records[0].get('time') or 0
+        pool = futures.ThreadPoolExecutor(max_workers=concurrency)
+        start = time.time()
+        try:
+            for record in records:
+                scheduled = start + ((record.get('time') or first) -
+                                     first) / speed
+                delay = scheduled - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, record, scheduled)
+        finally:
+            pool.shutdown(wait=True)
+        return time.time() - start
+
+    def report(self, elapsed, out=sys.stdout):
+        sent = sum(len(durations) for durations in self.results.values())
+        print('%d requests in %.1fs (%.1f req/s), %d skipped, '
+              'p99 start lag %.1f ms' % (
+                  sent, elapsed, sent / elapsed if elapsed else 0,
+                  self.skipped, percentile(self.lag, 99) * 1000), file=out)
+        print('  %-32s %7s %9s %9s %7s' % (
+            'route', 'count', 'p50 ms', 'p99 ms', 'errors'), file=out)
+        for key, durations in sorted(self.results.items()):
+            print('  %-32s %7d %9.2f %9.2f %7d' % (
+                key, len(durations), percentile(durations, 50) * 1000,
+                percentile(durations, 99) * 1000, self.errors[key]),
+                file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay requests captured by jumpgate.')
+    parser.add_argument('captures', nargs='+',
+                        help='Capture files, rotated files are included')
+    parser.add_argument('--url', default='http://127.0.0.1:5000',
+                        help='jumpgate instance to send requests to')
+    parser.add_argument('--username', help='SoftLayer username')
+    parser.add_argument('--api-key', help='SoftLayer API key')
+    parser.add_argument('--token', help='Token to use instead of logging in')
+    parser.add_argument('--tenant-id', help='Tenant id of --token')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed, 2 sends requests twice as fast '
+                             'as captured')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Requests sent at the same time at most')
+    parser.add_argument('--include-writes', action='store_true',
+                        help='Also send requests that are not reads')
+    parser.add_argument('--limit', type=int,
+                        help='Replay the first requests only')
+
+    args = parser.parse_args()
+    if args.token is None and not (args.username and args.api_key):
+        parser.error('--token or --username and --api-key are required')
+
+    records = load_records(args.captures)[:args.limit]
+    replayer = Replayer(args.url, username=args.username,
+                        api_key=args.api_key, token=args.token,
+                        tenant_id=args.tenant_id,
+                        include_writes=args.include_writes)
+    replayer.authenticate()
+    elapsed = replayer.replay(records, speed=args.speed,
+                              concurrency=args.concurrency)
+    replayer.report(elapsed)
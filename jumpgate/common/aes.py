@@ -1,26 +1,130 @@
 import base64
+import hashlib
+import hmac
+import os
+import struct
 
 from Crypto.Cipher import AES
+from Crypto.Util.strxor import strxor
+import six
 
 from jumpgate import config
 
 BLOCK_SIZE = 32
 PADDING = '#'
 
+NONCE_SIZE = 8
+TAG_SIZE = 16
+_COUNTER_BLOCK = struct.Struct('!%dsQ' % NONCE_SIZE)
+
+# (secret key, cipher) of the last secret key a cipher was created for
+_cipher = (None, None)
+# (secret key, (AES cipher, HMAC)) of the last secret key
+_token_ciphers = (None, None)
+
 
 def pad(string):
     return string + (BLOCK_SIZE - len(string) % BLOCK_SIZE) * PADDING
 
 
 def create_cypher():
-    return AES.new(pad(config.CONF['secret_key']))
+    """Returns the cipher of the configured secret key.
+
+    The cipher is created once per secret key. An ECB cipher keeps no state
+    between calls, so the same one encrypts and decrypts on every thread.
+    """
+    global _cipher
+    secret_key = config.CONF['secret_key']
+    cached_key, cipher = _cipher
+    if cipher is None or cached_key != secret_key:
+        # ECB was the implicit default of pycrypto; pycryptodome requires it
+        cipher = AES.new(six.b(pad(secret_key)), AES.MODE_ECB)
+        _cipher = (secret_key, cipher)
+    return cipher
 
 
 def encode_aes(string):
     cipher = create_cypher()
-    return base64.b64encode(cipher.encrypt(pad(string)))
+    return base64.b64encode(cipher.encrypt(pad(string).encode('utf-8')))
 
 
 def decode_aes(encrypted_string):
     cipher = create_cypher()
-    return cipher.decrypt(base64.b64decode(encrypted_string)).rstrip(PADDING)
+    decrypted = cipher.decrypt(base64.b64decode(encrypted_string))
+    return decrypted.decode('utf-8').rstrip(PADDING)
+
+
+def create_token_ciphers():
+    """Returns the (AES cipher, HMAC) of the configured secret key.
+
+    Their keys are derived from the secret key once per secret key. Use
+    copies of the HMAC, the AES cipher is an ECB cipher and shared.
+    """
+    global _token_ciphers
+    secret_key = config.CONF['secret_key']
+    cached_key, ciphers = _token_ciphers
+    if ciphers is None or cached_key != secret_key:
+        secret = six.b(secret_key)
+        encryption_key = hmac.new(secret, b'jumpgate encryption',
+                                  hashlib.sha256).digest()
+        mac_key = hmac.new(secret, b'jumpgate authentication',
+                           hashlib.sha256).digest()
+        ciphers = (AES.new(encryption_key, AES.MODE_ECB),
+                   hmac.new(mac_key, digestmod=hashlib.sha256))
+        _token_ciphers = (secret_key, ciphers)
+    return ciphers
+
+
+if hasattr(int, 'from_bytes'):
+    def _xor(data, stream):
+        return (int.from_bytes(data, 'big') ^
+                int.from_bytes(stream, 'big')).to_bytes(len(data), 'big')
+else:
+    # Python 2, Crypto.Util.strxor costs more than int.from_bytes()
+    _xor = strxor
+
+
+def _ctr(cipher, nonce, data):
+    """AES-CTR of data, the counter block being nonce + a 64 bit counter.
+
+    The key stream comes from the shared ECB cipher, creating a CTR cipher
+    per message costs more than encrypting a token.
+    """
+    if not data:
+        return data
+    blocks = (len(data) + AES.block_size - 1) // AES.block_size
+    stream = cipher.encrypt(b''.join(_COUNTER_BLOCK.pack(nonce, counter)
+                                     for counter in range(blocks)))
+    return _xor(data, stream[:len(data)])
+
+
+def _tag(mac, message):
+    mac = mac.copy()
+    mac.update(message)
+    return mac.digest()[:TAG_SIZE]
+
+
+def encrypt_then_mac(data, header=b''):
+    """Encrypts data with AES-CTR and authenticates it with HMAC-SHA256.
+
+    Returns header + nonce + ciphertext + tag, the tag covering the header.
+    """
+    cipher, mac = create_token_ciphers()
+    nonce = os.urandom(NONCE_SIZE)
+    message = header + nonce + _ctr(cipher, nonce, data)
+    return message + _tag(mac, message)
+
+
+def verify_then_decrypt(message, header_size=0):
+    """Returns the data of an encrypt_then_mac() message.
+
+    Raises ValueError if the message is truncated or its tag is invalid.
+    """
+    if len(message) < header_size + NONCE_SIZE + TAG_SIZE:
+        raise ValueError('Truncated message')
+    cipher, mac = create_token_ciphers()
+    message, tag = message[:-TAG_SIZE], message[-TAG_SIZE:]
+    if not hmac.compare_digest(_tag(mac, message), tag):
+        raise ValueError('Invalid message tag')
+    nonce = message[header_size:header_size + NONCE_SIZE]
+    return _ctr(cipher, nonce, message[header_size + NONCE_SIZE:])
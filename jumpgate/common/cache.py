@@ -0,0 +1,152 @@
+import threading
+import time
+
+from oslo.config import cfg
+
+from jumpgate.common import cache_backends
+
+opts = [
+    cfg.IntOpt('hot_window', default=30,
+               help='Seconds after a change to a resource during which reads '
+                    'of that resource bypass every cache'),
+]
+
+cfg.CONF.register_opts(opts, group='cache')
+
+# How long a change is remembered for, to compare it with cached data
+_HOT_RETENTION = 3600
+
+
+class ResourceCache(object):
+    """Cache of SoftLayer resources keyed by (owner, resource type, id).
+
+    The owner is the key of the tenant and user a resource was read for,
+    see ``inventory.get_owner()``: users of a tenant may not see the same
+    resources.
+
+    Handlers that change a resource call ``invalidate()``. This makes the
+    resource "hot" for ``hot_window`` seconds for every user of the
+    tenant. While a resource is hot, reads bypass the cache and nothing is
+    cached for it, and copies cached before the change are never served
+    again. Other caches of the same data (such as the inventory mirror)
+    can use ``hot_until()`` to find out if their copy predates a change.
+
+    Entries are kept in the backend configured in the [cache] group. With
+    a shared backend, changes are also recorded in the backend so that
+    every worker sees them.
+    """
+
+    def __init__(self, backend=None):
+        self._lock = threading.Lock()
+        self._backend = backend
+        self._hot = {}
+        self._hot_types = {}
+
+    @property
+    def backend(self):
+        # Built on first use, once the configuration has been loaded
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = cache_backends.make_backend()
+        return self._backend
+
+    def get(self, owner, resource_type, resource_id):
+        key = _key(owner, resource_type, resource_id)
+        entry = self.backend.get(_backend_key('resources', key))
+        if entry is None:
+            return None
+
+        expires, value, stored_at = entry
+        if (expires < time.time() or
+                self.hot_until(owner, resource_type,
+                               resource_id) > stored_at):
+            # Expired, or stored before a change made by any user
+            self.backend.delete(_backend_key('resources', key))
+            return None
+        return value
+
+    def set(self, owner, resource_type, resource_id, value, ttl):
+        key = _key(owner, resource_type, resource_id)
+        if ttl <= 0 or self.is_hot(owner, resource_type, resource_id):
+            return
+        now = time.time()
+        self.backend.set(_backend_key('resources', key),
+                         (now + ttl, value, now), ttl)
+
+    def invalidate(self, owner, resource_type, resource_id):
+        """Records a change of a resource for every user of its tenant."""
+        key = _hot_key(owner, resource_type, resource_id)
+        now = time.time()
+        hot_until = now + cfg.CONF['cache']['hot_window']
+
+        self.backend.delete(_backend_key(
+            'resources', _key(owner, resource_type, resource_id)))
+        if self.backend.shared:
+            self.backend.set(_backend_key('hot', key), hot_until,
+                             _HOT_RETENTION)
+            self.backend.set(_backend_key('hot', key[:2]), hot_until,
+                             _HOT_RETENTION)
+
+        with self._lock:
+            self._hot[key] = hot_until
+            self._hot_types[key[:2]] = hot_until
+
+            for hot in (self._hot, self._hot_types):
+                for old_key in [k for k, until in hot.items()
+                                if until < now - _HOT_RETENTION]:
+                    del hot[old_key]
+
+    def hot_until(self, owner, resource_type, resource_id=None):
+        """Returns when the last change of a resource stops being hot.
+
+        Changes made by any user of the tenant of owner count. Without a
+        resource id, the last change of any resource of that type is used.
+        Returns 0 when there was no recent change.
+        """
+        if resource_id is None:
+            key = (_tenant(owner), resource_type)
+            hot_until = self._hot_types.get(key, 0)
+        else:
+            key = _hot_key(owner, resource_type, resource_id)
+            hot_until = self._hot.get(key, 0)
+
+        if self.backend.shared:
+            # Changes made by other workers
+            hot_until = max(hot_until,
+                            self.backend.get(_backend_key('hot', key)) or 0)
+        return hot_until
+
+    def is_hot(self, owner, resource_type, resource_id=None):
+        return self.hot_until(owner, resource_type,
+                              resource_id) > time.time()
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._hot.clear()
+            self._hot_types.clear()
+
+
+def _key(owner, resource_type, resource_id):
+    return str(owner), resource_type, str(resource_id)
+
+
+def _tenant(owner):
+    # Owners are 'tenant/user' keys
+    return str(owner).split('/', 1)[0]
+
+
+def _hot_key(owner, resource_type, resource_id):
+    return _tenant(owner), resource_type, str(resource_id)
+
+
+def _backend_key(kind, key):
+    return '/'.join((kind,) + key)
+
+
+RESOURCES = ResourceCache()
+
+
+def invalidate(owner, resource_type, resource_id):
+    RESOURCES.invalidate(owner, resource_type, resource_id)
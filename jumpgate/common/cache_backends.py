@@ -0,0 +1,360 @@
+"""Storage backends for the caches of jumpgate.common.cache.
+
+``memory`` keeps entries in a per-process LRU. ``shm`` keeps them in a
+memory-mapped file shared by every worker of a host, and ``memcached``
+in memcached servers shared by every host. Shared backends store JSON,
+so only JSON-serializable values can be cached. Failures of a shared
+backend are logged and behave like cache misses.
+"""
+import collections
+import contextlib
+import hashlib
+import json
+import logging
+import mmap
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+from oslo.config import cfg
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.StrOpt('backend', default='memory',
+               help="Cache storage: 'memory' (per worker), 'shm' (shared "
+                    "by the workers of a host) or 'memcached'"),
+    cfg.IntOpt('max_entries', default=10000,
+               help='Entries kept by the memory backend'),
+    cfg.StrOpt('shm_path', default=None,
+               help='File mapped by the shm backend. Defaults to a file in '
+                    '/dev/shm or in the temporary directory.'),
+    cfg.IntOpt('shm_size', default=64 * 1024 * 1024,
+               help='Size in bytes of the shm backend file'),
+    cfg.IntOpt('shm_slot_size', default=4096,
+               help='Size in bytes of a shm backend entry. Larger values '
+                    'are not cached.'),
+    cfg.ListOpt('memcached_servers', default=['127.0.0.1:11211'],
+                help='host:port of the memcached servers'),
+    cfg.FloatOpt('memcached_timeout', default=1.0,
+                 help='Seconds to wait for a memcached server'),
+    cfg.StrOpt('key_prefix', default='jumpgate',
+               help='Prefix of the keys stored in memcached'),
+]
+
+cfg.CONF.register_opts(opts, group='cache')
+
+
+class MemoryBackend(object):
+    """Least recently used entries of one process."""
+
+    shared = False
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                return None
+            self._entries[key] = entry
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key, delta, ttl):
+        """Atomically adds delta to a counter, never going below 0.
+
+        A missing counter starts at 0. Counters expire ttl seconds after
+        their last change, so counters in use never expire.
+        Returns the new value, or None when the backend failed.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < now:
+                entry = (now, 0)
+            value = max(entry[1] + delta, 0)
+            self._entries[key] = (now + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedMemoryBackend(object):
+    """Direct-mapped cache in a memory-mapped file.
+
+    The file is split in fixed-size slots and a key can only be stored in
+    the slot its hash points to, replacing whatever was there. Every
+    process mapping the same file sees the same entries; accesses are
+    serialized with flock().
+    """
+
+    shared = True
+
+    # key digest, expiration time, value length
+    _header = struct.Struct('<16sdI')
+
+    def __init__(self, path, size, slot_size):
+        if fcntl is None:
+            raise ValueError('The shm cache backend requires fcntl')
+        if slot_size <= self._header.size:
+            raise ValueError('shm_slot_size is too small')
+
+        self.slot_size = slot_size
+        self.slots = max(size // slot_size, 1)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        length = self.slots * slot_size
+        if os.fstat(self._fd).st_size < length:
+            os.ftruncate(self._fd, length)
+        self._map = mmap.mmap(self._fd, length)
+        # flock() does not exclude the threads of a process
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive=False):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive
+                        else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slot(self, key):
+        digest = hashlib.md5(key.encode('utf-8')).digest()
+        index = struct.unpack('<Q', digest[:8])[0] % self.slots
+        return digest, index * self.slot_size
+
+    def get(self, key):
+        digest, offset = self._slot(key)
+        with self._locked():
+            stored, expires, length = self._header.unpack_from(self._map,
+                                                               offset)
+            if stored != digest or expires < time.time():
+                return None
+            start = offset + self._header.size
+            data = self._map[start:start + length]
+        try:
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            # Written by a process that did not finish the write
+            return None
+
+    def set(self, key, value, ttl):
+        data = json.dumps(value).encode('utf-8')
+        if len(data) > self.slot_size - self._header.size:
+            return
+
+        digest, offset = self._slot(key)
+        start = offset + self._header.size
+        with self._locked(exclusive=True):
+            self._map[start:start + len(data)] = data
+            self._header.pack_into(self._map, offset, digest,
+                                   time.time() + ttl, len(data))
+
+    def incr(self, key, delta, ttl):
+        digest, offset = self._slot(key)
+        start = offset + self._header.size
+        now = time.time()
+        with self._locked(exclusive=True):
+            stored, expires, length = self._header.unpack_from(self._map,
+                                                               offset)
+            value = 0
+            if stored == digest and expires >= now:
+                try:
+                    value = int(self._map[start:start + length])
+                except ValueError:
+                    pass
+            value = max(value + delta, 0)
+            data = str(value).encode('ascii')
+            self._map[start:start + len(data)] = data
+            self._header.pack_into(self._map, offset, digest, now + ttl,
+                                   len(data))
+        return value
+
+    def delete(self, key):
+        digest, offset = self._slot(key)
+        with self._locked(exclusive=True):
+            if self._header.unpack_from(self._map, offset)[0] == digest:
+                self._header.pack_into(self._map, offset, b'', 0, 0)
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for index in range(self.slots):
+                self._header.pack_into(self._map, index * self.slot_size,
+                                       b'', 0, 0)
+
+
+class MemcachedBackend(object):
+    """Minimal client of the memcached text protocol.
+
+    Keys are spread over the servers by hash, and every thread keeps its
+    own connection to each server.
+    """
+
+    shared = True
+
+    def __init__(self, servers, timeout=1.0, prefix='jumpgate'):
+        self.servers = []
+        for server in servers:
+            host, _, port = server.strip().partition(':')
+            self.servers.append((host or '127.0.0.1', int(port or 11211)))
+        self.timeout = timeout
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _key(self, key):
+        # memcached keys can't contain spaces and are limited in length
+        return '%s:%s' % (self.prefix,
+                          hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def _server(self, key):
+        return self.servers[(zlib.crc32(key.encode('utf-8')) & 0xffffffff)
+                            % len(self.servers)]
+
+    def _command(self, server, command, read_reply):
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        try:
+            connection = connections.get(server)
+            if connection is None:
+                sock = socket.create_connection(server, self.timeout)
+                connection = (sock, sock.makefile('rb'))
+                connections[server] = connection
+            connection[0].sendall(command)
+            return read_reply(connection[1])
+        except (socket.error, IOError, ValueError) as e:
+            LOG.warning('memcached server %s:%s failed: %s',
+                        server[0], server[1], e)
+            connection = connections.pop(server, None)
+            if connection is not None:
+                connection[1].close()
+                connection[0].close()
+            return None
+
+    def get(self, key):
+        key = self._key(key)
+
+        def read_reply(reader):
+            value = None
+            line = reader.readline()
+            while line.startswith(b'VALUE '):
+                length = int(line.split()[3])
+                value = reader.read(length + 2)[:length]
+                line = reader.readline()
+            if line != b'END\r\n':
+                raise ValueError('unexpected reply %r' % line)
+            return value
+
+        data = self._command(self._server(key),
+                             ('get %s\r\n' % key).encode('ascii'),
+                             read_reply)
+        return json.loads(data.decode('utf-8')) if data is not None else None
+
+    def set(self, key, value, ttl):
+        key = self._key(key)
+        data = json.dumps(value).encode('utf-8')
+        command = ('set %s 0 %d %d\r\n' % (key, max(int(ttl), 1),
+                                           len(data))).encode('ascii')
+        self._command(self._server(key), command + data + b'\r\n',
+                      lambda reader: reader.readline())
+
+    def incr(self, key, delta, ttl):
+        key = self._key(key)
+        server = self._server(key)
+        verb = 'incr' if delta >= 0 else 'decr'
+        # touch pushes the expiry back, like the other backends do
+        command = ('%s %s %d\r\ntouch %s %d\r\n' % (
+            verb, key, abs(delta), key, max(int(ttl), 1))).encode('ascii')
+        data = str(delta).encode('ascii')
+        add = ('add %s 0 %d %d\r\n' % (key, max(int(ttl), 1), len(data))
+               ).encode('ascii') + data + b'\r\n'
+
+        def read_reply(reader):
+            line = reader.readline()
+            if line.startswith(b'NOT_FOUND') or line.startswith(b'NOT_STORED'):
+                return False
+            if line.startswith(b'STORED'):
+                return delta
+            return int(line)
+
+        def read_replies(reader):
+            value = read_reply(reader)
+            reader.readline()
+            return value
+
+        # add fails when another client created the counter meanwhile
+        for attempt in range(2):
+            value = self._command(server, command, read_replies)
+            if value is not False:
+                return value
+            if delta <= 0:
+                return 0
+            value = self._command(server, add, read_reply)
+            if value is not False:
+                return value
+        return None
+
+    def delete(self, key):
+        key = self._key(key)
+        self._command(self._server(key),
+                      ('delete %s\r\n' % key).encode('ascii'),
+                      lambda reader: reader.readline())
+
+    def clear(self):
+        for server in self.servers:
+            self._command(server, b'flush_all\r\n',
+                          lambda reader: reader.readline())
+
+
+def _default_shm_path():
+    directory = '/dev/shm'
+    if not os.path.isdir(directory):
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, 'jumpgate-cache')
+
+
+def make_backend():
+    """Returns a new backend as configured in the [cache] group."""
+    conf = cfg.CONF['cache']
+    backend = conf['backend']
+    if backend == 'memory':
+        return MemoryBackend(conf['max_entries'])
+    if backend == 'shm':
+        return SharedMemoryBackend(conf['shm_path'] or _default_shm_path(),
+                                   conf['shm_size'], conf['shm_slot_size'])
+    if backend == 'memcached':
+        return MemcachedBackend(conf['memcached_servers'],
+                                conf['memcached_timeout'],
+                                conf['key_prefix'])
+    raise ValueError("Unsupported cache backend '%s'" % backend)
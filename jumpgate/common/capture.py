@@ -0,0 +1,136 @@
+"""Capture of request metadata, for replaying production-shaped traffic.
+
+When ``jumpgate.common.hooks.capture`` is listed in the response hooks,
+a JSON line is written for every captured request to a rotating file:
+
+    {"time": 1404415957.12, "method": "GET", "route": "v2_servers",
+     "path": "/compute/v2/{tenant_id}/servers", "query": {"limit": "10"},
+     "body_bytes": 0, "status": 200, "latency": 0.084,
+     "sl_calls": ["Account.getVirtualGuests"]}
+
+Records are sanitized: no headers or bodies are kept, the tenant id and
+the token ids in paths are replaced by placeholders and the values of
+sensitive query parameters are redacted. ``jumpgate-replay`` sends the
+captured requests to a jumpgate instance.
+"""
+import json
+import logging
+from logging import handlers
+import random
+import threading
+import time
+
+from oslo.config import cfg
+from six.moves.urllib import parse
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.StrOpt('path', default='jumpgate-capture.jsonl',
+               help='File the captured requests are written to'),
+    cfg.IntOpt('max_bytes', default=50 * 1024 * 1024,
+               help='Size in bytes at which the capture file is rotated'),
+    cfg.IntOpt('backup_count', default=5,
+               help='Rotated capture files kept'),
+    cfg.FloatOpt('sample_rate', default=1.0,
+                 help='Fraction of the requests captured'),
+    cfg.ListOpt('redacted_params',
+                default=['password', 'token', 'secret', 'key'],
+                help='Query parameters whose name contains one of these '
+                     'words are captured without their value'),
+    cfg.ListOpt('redacted_path_vars', default=['tenant_id', 'token_id'],
+                help='Path variables replaced by a placeholder'),
+]
+
+cfg.CONF.register_opts(opts, group='capture')
+
+REDACTED = '***'
+
+_lock = threading.Lock()
+_logger = None
+_logger_path = None
+
+
+def get_logger():
+    """Returns the logger writing to the configured capture file."""
+    global _logger, _logger_path
+    conf = cfg.CONF['capture']
+    with _lock:
+        if _logger is None or _logger_path != conf['path']:
+            logger = logging.getLogger('jumpgate.capture.records')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            handler = handlers.RotatingFileHandler(
+                conf['path'], maxBytes=conf['max_bytes'],
+                backupCount=conf['backup_count'])
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            _logger, _logger_path = logger, conf['path']
+        return _logger
+
+
+def sanitize_path(path, endpoint):
+    """Replaces the redacted variables of path by placeholders.
+
+    :param endpoint: path template of the endpoint handling path
+    """
+    if not endpoint:
+        return path
+    redacted = cfg.CONF['capture']['redacted_path_vars']
+    parts = path.split('/')
+    templates = endpoint.split('/')
+    if len(parts) != len(templates):
+        return path
+    for index, template in enumerate(templates):
+        if template.startswith('{') and template[1:-1] in redacted:
+            suffix = '.json' if parts[index].endswith('.json') else ''
+            parts[index] = template + suffix
+    return '/'.join(parts)
+
+
+def sanitize_query(query_string):
+    words = cfg.CONF['capture']['redacted_params']
+    query = {}
+    for name, value in parse.parse_qsl(query_string or '',
+                                       keep_blank_values=True):
+        if any(word in name.lower() for word in words):
+            value = REDACTED
+        query[name] = value
+    return query
+
+
+def make_record(req, status):
+    """Returns the sanitized metadata of a request."""
+    env = req.env
+    route, endpoint = None, None
+    app = env.get('jumpgate.app')
+    if app is not None:
+        route, endpoint = app.route_endpoint(req.path)
+
+    start = env.get('jumpgate.start_time')
+    client = env.get('sl_client')
+    return {
+        'time': start,
+        'method': req.method,
+        'route': route,
+        'path': sanitize_path(req.path, endpoint),
+        'query': sanitize_query(req.query_string),
+        'body_bytes': req.content_length or 0,
+        'status': status,
+        'latency': time.time() - start if start else None,
+        'sl_calls': list(getattr(client, 'calls', [])),
+    }
+
+
+def capture(req, status):
+    """Writes the record of a request, subject to sampling."""
+    if random.random() >= cfg.CONF['capture']['sample_rate']:
+        return
+    try:
+        get_logger().info(json.dumps(make_record(req, status)))
+    except Exception:
+        # Capturing must never fail a request
+        LOG.exception('Failed to capture request')
@@ -27,7 +27,14 @@ FILE_OPTIONS = {
                    help='Secret key used to encrypt tokens'),
         cfg.ListOpt('request_hooks', default=[]),
         cfg.ListOpt('response_hooks', default=[]),
-        cfg.StrOpt('default_domain', default='jumpgate.com')
+        cfg.StrOpt('default_domain', default='jumpgate.com'),
+        cfg.StrOpt('state_path', default='/var/lib/jumpgate',
+                   help='Directory of the files kept between restarts, '
+                        'such as the issued tokens'),
+        cfg.BoolOpt('lazy_load', default=False,
+                    help='Set up the routes of a service on its first '
+                         'request instead of at startup, which starts '
+                         'workers faster'),
     ],
     'softlayer': [
         cfg.StrOpt('endpoint', default=SoftLayer.API_PUBLIC_ENDPOINT),
@@ -42,7 +49,10 @@ FILE_OPTIONS = {
         cfg.StrOpt('token_driver', default='jumpgate.identity.drivers.core.'
                    'JumpgateTokenDriver'),
         cfg.StrOpt('token_id_driver', default='jumpgate.identity.drivers.core.'
-                   'AESTokenIdDriver')
+                   'AESTokenIdDriver'),
+        cfg.BoolOpt('accept_legacy_token_ids', default=True,
+                    help='Whether CompactTokenIdDriver accepts the token IDs '
+                         'of AESTokenIdDriver'),
     ],
     'compute': [
         cfg.StrOpt('driver', default='jumpgate.compute.drivers.sl'),
@@ -59,6 +69,9 @@ FILE_OPTIONS = {
         cfg.StrOpt('default_security_group_rules', default=20),
         cfg.StrOpt('default_security_groups', default=10),
         cfg.StrOpt('default_availability_zone', default=None),
+        cfg.IntOpt('server_cache_ttl', default=0,
+                   help='Seconds server views are cached for. 0 disables '
+                        'the cache.'),
     ],
     'image': [
         cfg.StrOpt('driver', default='jumpgate.image.drivers.sl'),
@@ -81,6 +94,18 @@ FILE_OPTIONS = {
     ],
     'flavors': [
         cfg.StrOpt('flavor_list', default=None),
+        cfg.StrOpt('source', default='file',
+                   help="Where flavors come from: 'file' (flavor_list) or "
+                        "'softlayer' (generated from the product catalog)"),
+        cfg.StrOpt('catalog_cache', default='flavor_catalog.json',
+                   help='File the generated flavors are cached in'),
+        cfg.IntOpt('catalog_ttl', default=86400,
+                   help='Seconds after which generated flavors are '
+                        'generated again'),
+        cfg.StrOpt('username', default=None,
+                   help='SoftLayer user the flavors are generated with'),
+        cfg.StrOpt('api_key', default=None, secret=True,
+                   help='API key of the flavor generation user'),
     ]}
 
 CONF = cfg.CONF
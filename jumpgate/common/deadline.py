@@ -0,0 +1,80 @@
+"""Time budget of the requests.
+
+Every request gets a deadline from the [deadline] options, by endpoint
+nickname or by default. The SoftLayer client of the request bounds the
+timeout of its calls by the time left and fails the request with a
+``DeadlineExceeded`` fault once it is spent, instead of piling up calls
+the client gave up on.
+
+Clients may ask for a shorter deadline with the configured header. Only
+clients in ``trusted_networks`` may ask for a longer one.
+"""
+import time
+
+import ipaddress
+from oslo.config import cfg
+import six
+
+from jumpgate.common import exceptions
+
+opts = [
+    cfg.FloatOpt('default_timeout', default=60,
+                 help='Seconds a request may spend. 0 disables deadlines.'),
+    cfg.DictOpt('route_timeouts', default={},
+                help='Seconds a request may spend by endpoint nickname, '
+                     'e.g. v2_servers_detail:30,v2_server_action:120'),
+    cfg.StrOpt('header', default='X-Request-Timeout',
+               help='Header in which clients send the seconds they are '
+                    'willing to wait'),
+    cfg.ListOpt('trusted_networks', default=[],
+                help='Networks of the clients allowed to extend their '
+                     'deadline with the header'),
+]
+
+cfg.CONF.register_opts(opts, group='deadline')
+
+
+def is_trusted(req):
+    address = req.env.get('REMOTE_ADDR')
+    networks = cfg.CONF['deadline']['trusted_networks']
+    if not address or not networks:
+        return False
+
+    try:
+        address = ipaddress.ip_address(six.text_type(address))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(six.text_type(network),
+                                               strict=False)
+               for network in networks)
+
+
+def get_timeout(req):
+    """Returns the seconds the request may spend, 0 for no limit."""
+    conf = cfg.CONF['deadline']
+    timeout = conf['default_timeout']
+
+    app = req.env.get('jumpgate.app')
+    if conf['route_timeouts'] and app is not None:
+        nickname = app.route_nickname(req.path)
+        if nickname in conf['route_timeouts']:
+            timeout = float(conf['route_timeouts'][nickname])
+
+    requested = req.get_header(conf['header'])
+    if requested:
+        try:
+            requested = float(requested)
+        except ValueError:
+            raise exceptions.ResponseException(
+                '%s must be a number of seconds' % conf['header'],
+                error_type='badRequest', code=400)
+        if requested > 0 and (timeout <= 0 or requested < timeout or
+                              is_trusted(req)):
+            timeout = requested
+    return timeout
+
+
+def hook_set_deadline(req, resp, kwargs):
+    timeout = get_timeout(req)
+    if timeout > 0:
+        req.env['jumpgate.deadline'] = time.time() + timeout
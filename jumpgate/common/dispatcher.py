@@ -1,37 +1,95 @@
 import collections
 import logging
+import re
 LOG = logging.getLogger(__name__)
 
 
+def _compile_endpoint(endpoint):
+    """Returns a regex matching the paths routed to an endpoint.
+
+    Like the falcon routes added for it, variables match one path segment
+    and the endpoint also matches with a '.json' suffix, which is not part
+    of the variables.
+    """
+    pattern = ''
+    for part in re.split(r'(\{\w+\})', endpoint):
+        if part.startswith('{') and part.endswith('}'):
+            pattern += '(?P<%s>[^/]+?)' % part[1:-1]
+        else:
+            pattern += re.escape(part)
+    return re.compile('^%s(?:\\.json)?$' % pattern)
+
+
+class _PathTemplate(object):
+    """Fills the variables of an endpoint path template.
+
+    The template is compiled once into a format string. Like str.replace()
+    on the template, variables without a value are left as they are and a
+    variable used twice is filled twice.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        parts = re.split(r'(\{\w+\})', endpoint)
+        # re.split() puts the captured variables at the odd indexes
+        self.variables = tuple(part[1:-1] for part in parts[1::2])
+        self.format = '%s'.join(part.replace('%', '%%')
+                                for part in parts[::2])
+
+    def fill(self, req, kwargs):
+        if not self.variables:
+            return self.endpoint
+        values = []
+        for var in self.variables:
+            if var == 'tenant_id':
+                values.append(req.env['tenant_id'])
+            elif var in kwargs:
+                values.append(kwargs[var])
+            else:
+                values.append('{%s}' % var)
+        return self.format % tuple(values)
+
+
+_EMPTY_TEMPLATE = _PathTemplate('')
+
+
+def get_base_url(req):
+    """Returns the URL the endpoint paths of a request are appended to.
+
+    It is computed once per request.
+    """
+    base_url = req.env.get('jumpgate.base_url')
+    if base_url is None:
+        base_url = req.env['jumpgate.base_url'] = (
+            req.protocol + '://' + req.get_header('host') + req.app)
+    return base_url
+
+
 class Dispatcher(object):
     def __init__(self, mount=None):
         self._endpoints = collections.OrderedDict()
+        self._patterns = {}
+        self._templates = {}
         self.mount = mount
 
     def add_endpoint(self, nickname, endpoint):
         if self.mount:
             endpoint = self.mount + endpoint
         self._endpoints[nickname] = (endpoint, None)
+        self._patterns.pop(nickname, None)
+        self._templates[nickname] = _PathTemplate(endpoint)
 
-    def get_endpoint_path(self, req, nickname, **kwargs):
-        path = ''
-        if nickname in self._endpoints:
-            path = self._endpoints[nickname][0]
+    def get_endpoint(self, nickname):
+        """Returns the mounted path template of an endpoint."""
+        return self._endpoints[nickname][0]
 
-        if '{tenant_id}' in path:
-            tenant_id = req.env['tenant_id']
-            path = path.replace('{tenant_id}', tenant_id)
-
-        for var, value in kwargs.items():
-            if '{%s}' % var in path:
-                path = path.replace('{%s}' % var, str(value))
-        return path
+    def get_endpoint_path(self, req, nickname, **kwargs):
+        template = self._templates.get(nickname, _EMPTY_TEMPLATE)
+        return template.fill(req, kwargs)
 
     def get_endpoint_url(self, req, nickname, **kwargs):
-        return (req.protocol + '://' +
-                req.get_header('host') +
-                req.app +
-                self.get_endpoint_path(req, nickname, **kwargs))
+        template = self._templates.get(nickname, _EMPTY_TEMPLATE)
+        return get_base_url(req) + template.fill(req, kwargs)
 
     def get_unused_endpoints(self):
         results = []
@@ -57,3 +115,34 @@ class Dispatcher(object):
                 endpoints.append((endpoint, h))
 
         return endpoints
+
+    def get_handler(self, nickname):
+        return self._endpoints[nickname][1]
+
+    def match(self, path):
+        """Returns the nickname of the routed endpoint handling a path.
+
+        Endpoints added last win, like falcon routes: /servers/detail is
+        v2_servers_detail, not v2_server.
+        """
+        return self.resolve(path)[0]
+
+    def resolve(self, path):
+        """Returns the nickname and the fields of the routed endpoint
+        handling a path, or (None, None).
+
+        Falcon tries the routes added last first, so do endpoints.
+        """
+        for nickname in reversed(self._endpoints):
+            endpoint, handler = self._endpoints[nickname]
+            if not handler:
+                continue
+            pattern = self._patterns.get(nickname)
+            if pattern is None:
+                # Compiled on first use to keep startup fast
+                pattern = self._patterns[nickname] = _compile_endpoint(
+                    endpoint)
+            m = pattern.match(path)
+            if m:
+                return nickname, m.groupdict()
+        return None, None
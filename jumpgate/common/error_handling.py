@@ -27,6 +27,12 @@ def duplicate(resp, message, details=None, code=409):
     error(resp, 'duplicate', message, details=details, code=code)
 
 
+def over_limit(resp, message, retry_after, code=413):
+    error(resp, 'overLimit', message, code=code)
+    resp.body['overLimit']['retryAfter'] = str(retry_after)
+    resp.set_header('Retry-After', str(retry_after))
+
+
 def error(resp, error_type, message, details=None, code=500):
     error_dict = {
         'code': str(code),
@@ -39,3 +39,48 @@ class InvalidTokenError(Unauthorized):
                              "valid for the given user/tenant pair",
                              details=ex.details,
                              code=ex.code)
+
+
+class OverLimit(ResponseException):
+    error_type = 'overLimit'
+    code = 413
+
+    def __init__(self, msg, retry_after=1, code=None):
+        super(OverLimit, self).__init__(msg, error_type=self.error_type,
+                                        code=code)
+        self.retry_after = retry_after
+
+    @staticmethod
+    def handle(ex, req, resp, params):
+        error_handling.over_limit(resp, ex.msg, ex.retry_after, code=ex.code)
+
+
+class ServiceUnavailable(ResponseException):
+    error_type = 'computeFault'
+    code = 503
+
+    def __init__(self, msg, retry_after=None):
+        super(ServiceUnavailable, self).__init__(msg,
+                                                 error_type=self.error_type)
+        self.retry_after = retry_after
+
+    @staticmethod
+    def handle(ex, req, resp, params):
+        error_handling.compute_fault(resp, ex.msg, code=ex.code)
+        if ex.retry_after:
+            resp.set_header('Retry-After', str(ex.retry_after))
+
+
+class DeadlineExceeded(ResponseException):
+    """The request ran out of time before getting its SoftLayer results.
+
+    503 when there was no time left to make a call, 504 when a call was
+    cut short by the deadline.
+    """
+    error_type = 'computeFault'
+    code = 504
+
+    def __init__(self, msg, code=None):
+        super(DeadlineExceeded, self).__init__(msg,
+                                               error_type=self.error_type,
+                                               code=code)
@@ -0,0 +1,10 @@
+from jumpgate.common import capture
+from jumpgate.common import hooks
+
+
+@hooks.response_hook(True)
+def capture_request(req, resp):
+    status = resp.status
+    if not isinstance(status, int):
+        status = int(str(status).split(' ', 1)[0])
+    capture.capture(req, status)
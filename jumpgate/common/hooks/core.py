@@ -5,6 +5,11 @@ from falcon import status_codes
 
 from jumpgate.common import hooks
 
+# Statuses falcon has no constant for
+_STATUS_LINES = {
+    429: '429 Too Many Requests',
+}
+
 
 @hooks.response_hook(False)
 def hook_format(req, resp):
@@ -15,8 +20,8 @@ def hook_format(req, resp):
 
     if isinstance(resp.status, int):
         resp.status = getattr(status_codes,
-                              'HTTP_%s' % resp.status,
-                              resp.status)
+                              'HTTP_%d' % resp.status,
+                              _STATUS_LINES.get(resp.status, resp.status))
 
     resp.set_header('X-Compute-Request-Id', req.env['REQUEST_ID'])
 
@@ -0,0 +1,23 @@
+from jumpgate.common import hooks
+from jumpgate.common import limits
+from jumpgate.common import utils
+
+
+def _get_tenant_id(req):
+    return (utils.lookup(req.env, 'auth', 'tenant_id') or
+            req.env.get('tenant_id'))
+
+
+@hooks.request_hook(True)
+def limit_concurrent_requests(req, resp, kwargs):
+    # Must run after the authentication hooks to know the tenant
+    tenant_id = _get_tenant_id(req)
+    if limits.acquire_request_slot(tenant_id):
+        req.env['jumpgate.request_slot'] = tenant_id
+
+
+@hooks.response_hook(True)
+def release_concurrent_requests(req, resp):
+    tenant_id = req.env.pop('jumpgate.request_slot', None)
+    if tenant_id is not None:
+        limits.release_request_slot(tenant_id)
@@ -3,6 +3,7 @@ import SoftLayer
 
 from jumpgate.common import hooks
 from jumpgate.common.sl import auth
+from jumpgate.common.sl import client as sl_client
 
 
 @hooks.request_hook(True)
@@ -12,11 +13,13 @@ def bind_client(req, resp, kwargs):
         extra_args['proxy'] = cfg.CONF['softlayer']['proxy']
 
     endpoint = cfg.CONF['softlayer']['endpoint']
-    client = SoftLayer.Client(endpoint_url=endpoint, **extra_args)
+    client = sl_client.Client(endpoint_url=endpoint, **extra_args)
     client.auth = None
+    client.set_deadline(req.env.get('jumpgate.deadline'))
     req.env['sl_client'] = client
 
     auth_token = req.env.get('auth', None)
 
     if auth_token is not None:
         client.auth = auth.get_auth(auth_token)
+        client.tenant_id = auth_token.get('tenant_id')
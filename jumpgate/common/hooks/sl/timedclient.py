@@ -1,22 +1,24 @@
 import time
 
 from oslo.config import cfg
-import SoftLayer
 
 from jumpgate.common import hooks
 from jumpgate.common.sl import auth
+from jumpgate.common.sl import client as sl_client
 
 
 @hooks.request_hook(True)
 def bind_client(req, resp, kwargs):
     req.env['sl_timehook_start_time'] = time.time()
     endpoint = cfg.CONF['softlayer']['endpoint']
-    client = SoftLayer.TimedClient(endpoint_url=endpoint,
+    client = sl_client.TimedClient(endpoint_url=endpoint,
                                    proxy=cfg.CONF['softlayer']['proxy'])
     client.auth = None
+    client.set_deadline(req.env.get('jumpgate.deadline'))
     req.env['sl_client'] = client
 
     auth_token = req.env.get('auth', None)
 
     if auth_token is not None:
         client.auth = auth.get_auth(auth_token)
+        client.tenant_id = auth_token.get('tenant_id')
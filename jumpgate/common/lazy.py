@@ -0,0 +1,81 @@
+"""Services whose routes are set up on their first request.
+
+With ``lazy_load`` enabled, ``Jumpgate.load_drivers()`` only adds the
+hooks of the drivers, which have to be known when the falcon API is built,
+and ``Jumpgate.make_api()`` adds a falcon sink on the mount of every
+service instead of its routes. The first request of a service sets up its
+routes, which imports its handler modules and reads their files. The sink
+then routes the requests of the service the way falcon routes them.
+"""
+import logging
+import re
+import threading
+import time
+
+import falcon
+
+LOG = logging.getLogger(__name__)
+
+
+class LazyService(object):
+    """Falcon sink serving the requests of a lazily loaded service.
+
+    :param module: driver module of the service, with setup_routes()
+    :param default: responder of the requests no endpoint handles
+    """
+
+    def __init__(self, app, service, disp, module, default):
+        self.app = app
+        self.service = service
+        self.disp = disp
+        self.module = module
+        self.default = default
+        self.prefix = re.compile('%s(?=[/.]|$)' % re.escape(disp.mount or ''))
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                start = time.time()
+                self.module.setup_routes(self.app, self.disp)
+                self._loaded = True
+                LOG.info("Loaded the %s routes in %.3fs", self.service,
+                         time.time() - start)
+
+    def __call__(self, req, resp, **kwargs):
+        self.load()
+        nickname, params = self.disp.resolve(req.path)
+        if nickname is None:
+            return self.default(req, resp, **kwargs)
+
+        handler = self.disp.get_handler(nickname)
+        responder = None
+        if req.method in falcon.HTTP_METHODS:
+            responder = getattr(handler, 'on_' + req.method.lower(), None)
+        if responder is None:
+            # Like falcon's default responders, these run no hooks
+            return self._not_allowed(req, resp, handler)
+
+        for hook in self.app.before_hooks:
+            hook(req, resp, params)
+        responder(req, resp, **params)
+        for hook in self.app.after_hooks:
+            hook(req, resp)
+
+    def _not_allowed(self, req, resp, handler):
+        if req.method not in falcon.HTTP_METHODS:
+            resp.status = falcon.HTTP_400
+            return
+
+        allowed = [method for method in sorted(falcon.HTTP_METHODS)
+                   if hasattr(handler, 'on_' + method.lower())]
+        if 'OPTIONS' not in allowed:
+            allowed.append('OPTIONS')
+        resp.set_header('Allow', ', '.join(allowed))
+        if req.method == 'OPTIONS':
+            resp.status = falcon.HTTP_204
+        else:
+            resp.status = falcon.HTTP_405
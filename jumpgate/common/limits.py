@@ -0,0 +1,128 @@
+"""Per-tenant limits protecting workers and the SoftLayer API.
+
+Two limits are enforced, both disabled by default:
+
+* the number of requests of a tenant being processed at the same time,
+  enforced by the request hooks of ``jumpgate.common.hooks.limits``;
+* the rate of SoftLayer API calls made for a tenant, enforced by
+  ``jumpgate.common.sl.client.Client``.
+
+Counters are kept in the cache backend configured in the [cache] group,
+so the limits apply to all the workers sharing that backend. When the
+backend fails, requests are let through.
+"""
+import math
+import threading
+import time
+
+from oslo.config import cfg
+
+from jumpgate.common import cache_backends
+from jumpgate.common import exceptions
+
+opts = [
+    cfg.IntOpt('max_concurrent_requests', default=0,
+               help='Requests of a tenant processed at the same time. '
+                    '0 disables the limit.'),
+    cfg.FloatOpt('slapi_calls_per_second', default=0,
+                 help='Average rate of SoftLayer API calls allowed per '
+                      'tenant. 0 disables the limit.'),
+    cfg.IntOpt('slapi_burst', default=20,
+               help='SoftLayer API calls a tenant can make in a burst'),
+    cfg.IntOpt('status_code', default=429,
+               help='Status of overLimit faults: 429, or 413 for clients '
+                    'expecting the Compute v2 behaviour'),
+]
+
+cfg.CONF.register_opts(opts, group='limits')
+
+# Counters of requests that never ended (killed workers) are forgotten
+_REQUEST_COUNTER_TTL = 600
+
+_lock = threading.Lock()
+_backend = None
+
+
+def get_backend():
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = cache_backends.make_backend()
+        return _backend
+
+
+def acquire_request_slot(tenant_id):
+    """Counts a request of a tenant as being processed.
+
+    :returns: whether the request was counted and must be released
+    :raises OverLimit: when the tenant has too many requests in progress
+    """
+    conf = cfg.CONF['limits']
+    if conf['max_concurrent_requests'] <= 0 or tenant_id is None:
+        return False
+
+    key = 'limits/requests/%s' % tenant_id
+    count = get_backend().incr(key, 1, _REQUEST_COUNTER_TTL)
+    if count is not None and count > conf['max_concurrent_requests']:
+        get_backend().incr(key, -1, _REQUEST_COUNTER_TTL)
+        raise exceptions.OverLimit(
+            'This project has too many requests in progress',
+            retry_after=1, code=conf['status_code'])
+    return count is not None
+
+
+def release_request_slot(tenant_id):
+    get_backend().incr('limits/requests/%s' % tenant_id, -1,
+                       _REQUEST_COUNTER_TTL)
+
+
+def consume_slapi_call(tenant_id):
+    """Counts a SoftLayer API call made for a tenant.
+
+    Calls are counted in windows of ``slapi_burst / slapi_calls_per_second``
+    seconds. A call is allowed while the calls of the current window, plus
+    the calls of the previous window weighted by how much of it the last
+    window-long period still covers, stay within ``slapi_burst``. This only
+    needs an atomic increment and a read, which every cache backend
+    provides. The estimate assumes the calls of the previous window were
+    evenly spread, so a burst at the end of a window and another one right
+    after can go over ``slapi_burst``, but less than the twice as many
+    calls fixed windows would let through.
+
+    :raises OverLimit: when the estimate goes over the burst
+    """
+    conf = cfg.CONF['limits']
+    rate = conf['slapi_calls_per_second']
+    if rate <= 0 or tenant_id is None:
+        return
+
+    burst = max(conf['slapi_burst'], 1)
+    window = burst / float(rate)
+    now = time.time()
+    current = int(now // window)
+    key = 'limits/slapi/%s/%d'
+    # Counters are read during the next window too
+    ttl = int(math.ceil(2 * window)) + 1
+    count = get_backend().incr(key % (tenant_id, current), 1, ttl)
+    if count is None:
+        return
+
+    previous = get_backend().get(key % (tenant_id, current - 1)) or 0
+    elapsed = now / window - current
+    if count + previous * (1 - elapsed) <= burst:
+        return
+
+    # Rejected calls don't use the budget
+    get_backend().incr(key % (tenant_id, current), -1, ttl)
+    count -= 1
+    # When the weight of the previous window leaves room for one call,
+    # that window being this one when it is full
+    if count >= burst:
+        retry_at = (current + 2 - (burst - 1) / float(count)) * window
+    else:
+        retry_at = (current + 1 - (burst - count - 1) /
+                    float(previous)) * window
+    raise exceptions.OverLimit(
+        'This project made too many SoftLayer API calls',
+        retry_after=max(int(math.ceil(retry_at - now)), 1),
+        code=conf['status_code'])
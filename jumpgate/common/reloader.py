@@ -0,0 +1,121 @@
+"""Reloads configuration files used by running handlers.
+
+Drivers register the files they load in ``setup_routes`` with ``watch()``.
+Files are checked for changes every ``watch_interval`` seconds. The
+``jumpgate`` command can also reload all of them on SIGHUP; under a WSGI
+server, which uses SIGHUP for its own reloads, the signal is left alone.
+Reloads run in a background thread, never on the request path. Callbacks
+must build the new data completely before swapping it in with a single
+assignment, so requests see either the old or the new data. When a
+callback fails the previous data is kept.
+"""
+import logging
+import os
+import signal
+import threading
+
+from oslo.config import cfg
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.IntOpt('watch_interval', default=0,
+               help='Seconds between two checks of the modification time '
+                    'of reloadable files. 0 disables the checks.'),
+    cfg.BoolOpt('reload_on_sighup', default=False,
+                help='Reload every reloadable file on SIGHUP. Only used by '
+                     'the jumpgate command, WSGI servers handle SIGHUP '
+                     'themselves.'),
+]
+
+cfg.CONF.register_opts(opts, group='reload')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class Reloader(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        # path -> [last seen modification time, callbacks]
+        self._watches = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def watch(self, path, callback):
+        """Calls ``callback(path)`` when the file at path changes."""
+        with self._lock:
+            watch = self._watches.setdefault(path, [_mtime(path), []])
+            watch[1].append(callback)
+
+    def check(self, force=False):
+        """Reloads the files changed since the last check.
+
+        :param force: reload every file, changed or not
+        """
+        with self._lock:
+            watches = list(self._watches.items())
+
+        with self._reloading:
+            for path, watch in watches:
+                mtime = _mtime(path)
+                if mtime is None or (mtime == watch[0] and not force):
+                    continue
+                watch[0] = mtime
+
+                LOG.info('Reloading %s', path)
+                for callback in list(watch[1]):
+                    try:
+                        callback(path)
+                    except Exception:
+                        LOG.exception('Unable to reload %s', path)
+
+    def start(self, interval=0, sighup=False):
+        if sighup and hasattr(signal, 'SIGHUP'):
+            try:
+                signal.signal(signal.SIGHUP, self._handle_sighup)
+            except ValueError:
+                # Handlers can only be installed from the main thread
+                LOG.warning('Unable to reload files on SIGHUP outside of '
+                            'the main thread')
+
+        if interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run,
+                                            args=(interval,))
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _handle_sighup(self, signum, frame):
+        thread = threading.Thread(target=self.check, kwargs={'force': True})
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, interval):
+        while not self._stopped.wait(interval):
+            self.check()
+
+
+RELOADER = Reloader()
+
+
+def watch(path, callback):
+    RELOADER.watch(path, callback)
+
+
+def start(sighup=False):
+    """Starts checking the watched files.
+
+    :param sighup: also reload them on SIGHUP when reload_on_sighup is set,
+        only for processes jumpgate owns
+    """
+    conf = cfg.CONF['reload']
+    RELOADER.start(conf['watch_interval'],
+                   sighup and conf['reload_on_sighup'])
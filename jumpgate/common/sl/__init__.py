@@ -2,6 +2,7 @@ from oslo.config import cfg
 import SoftLayer
 
 from jumpgate.common.sl import auth
+from jumpgate.common.sl import client as sl_client
 from jumpgate.common.sl import errors
 
 opts = [
@@ -15,8 +16,9 @@ cfg.CONF.register_opts(opts, group='softlayer')
 
 def hook_get_client(req, resp, kwargs):
     endpoint = cfg.CONF['softlayer']['endpoint']
-    client = SoftLayer.Client(endpoint_url=endpoint)
+    client = sl_client.Client(endpoint_url=endpoint)
     client.auth = None
+    client.set_deadline(req.env.get('jumpgate.deadline'))
     req.env['tenant_id'] = None
 
     if req.headers.get('X-AUTH-TOKEN'):
@@ -29,6 +31,7 @@ def hook_get_client(req, resp, kwargs):
             client.auth = auth.get_auth(token_details)
 
             req.env['tenant_id'] = token_details['tenant_id']
+            client.tenant_id = token_details['tenant_id']
 
     req.env['sl_client'] = client
 
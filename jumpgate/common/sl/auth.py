@@ -1,12 +1,9 @@
-import base64
-import json
 import logging
 import time
 
 from oslo.config import cfg
 import SoftLayer
 
-from jumpgate.common import aes
 from jumpgate.common import exceptions
 from jumpgate.common import utils
 from jumpgate.identity.drivers import core as identity
@@ -17,8 +14,8 @@ LOG = logging.getLogger(__name__)
 
 def get_token_details(token, tenant_id=None):
     try:
-        token_details = json.loads(aes.decode_aes(base64.b64decode(token)))
-    except (TypeError, ValueError):
+        token_details = identity.token_id_driver().token_from_id(token)
+    except exceptions.InvalidTokenError:
         raise exceptions.Unauthorized('Invalid Key')
 
     if time.time() > token_details['expires']:
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import exceptions
+from jumpgate.common import limits
+from jumpgate.common.sl import hedging
+from jumpgate.common.sl import resilience
+from jumpgate.common.sl import transports as sl_transports
+
+LOG = logging.getLogger(__name__)
+
+# Smallest timeout accepted by requests
+_MIN_TIMEOUT = 0.001
+
+
+class Client(SoftLayer.Client):
+    """SoftLayer client counting its calls against the budget of a tenant.
+
+    ``tenant_id`` is set by the hooks creating the client once the request
+    is authenticated. Calls made without a tenant are not limited.
+
+    Reads failing with transient errors are retried and every method is
+    protected by a circuit breaker, see ``jumpgate.common.sl.resilience``.
+    Calls cut short by the deadline of the request are not counted by the
+    breakers.
+    Slow reads may be hedged, see ``jumpgate.common.sl.hedging``. Calls
+    are made with the transport selected by
+    ``jumpgate.common.sl.transports``.
+    Calls are also bounded by the deadline of the request. The deadline is
+    kept per thread, so background workers reusing the client of a request
+    are not cut short by it.
+
+    ``calls`` lists the 'Service.method' names of the calls made by the
+    thread which created the client, retries and hedges excluded. Calls
+    made by background workers reusing the client are not recorded.
+    """
+
+    tenant_id = None
+
+    def __init__(self, *args, **kwargs):
+        self._local = threading.local()
+        self._local.calls = []
+        super(Client, self).__init__(*args, **kwargs)
+
+    @property
+    def calls(self):
+        return getattr(self._local, 'calls', [])
+
+    def set_deadline(self, deadline):
+        """Bounds the calls of the current thread to end before deadline.
+
+        :param deadline: a time.time() value, or None for no deadline
+        """
+        self._local.deadline = deadline
+
+    def get_deadline(self):
+        return getattr(self._local, 'deadline', None)
+
+    def remaining_time(self):
+        deadline = self.get_deadline()
+        return deadline - time.time() if deadline is not None else None
+
+    @property
+    def timeout(self):
+        remaining = self.remaining_time()
+        if remaining is None:
+            return self._timeout
+        if self._timeout:
+            return max(min(self._timeout, remaining), _MIN_TIMEOUT)
+        return max(remaining, _MIN_TIMEOUT)
+
+    @timeout.setter
+    def timeout(self, timeout):
+        self._timeout = timeout
+
+    def call(self, service, method, *args, **kwargs):
+        if kwargs.pop('iter', False):
+            # iter_call() comes back here once per page, each page is a call
+            return self.iter_call(service, method, *args, **kwargs)
+
+        calls = getattr(self._local, 'calls', None)
+        if calls is not None:
+            calls.append(service + '.' + method)
+        breaker = resilience.get_breaker(service, method)
+        retries = 0
+        if resilience.is_idempotent(method):
+            retries = cfg.CONF['resilience']['retry_attempts']
+
+        attempt = 0
+        while True:
+            self._check_deadline(service, method)
+            limits.consume_slapi_call(self.tenant_id)
+            breaker.before_call()
+            try:
+                if hedging.should_hedge(service, method):
+                    result = hedging.hedged_call(self, self._call, service,
+                                                 method, *args, **kwargs)
+                else:
+                    result = self._call(service, method, *args, **kwargs)
+            except exceptions.DeadlineExceeded:
+                # Cut short by the deadline of this request, which clients
+                # choose: it tells nothing about the health of SoftLayer
+                breaker.discard()
+                raise
+            except Exception as e:
+                transient = resilience.is_transient(e)
+                breaker.record(not transient)
+                if not transient or attempt >= retries:
+                    raise
+
+                delay = resilience.retry_delay(attempt)
+                remaining = self.remaining_time()
+                if remaining is not None and remaining <= delay:
+                    raise
+                LOG.info('Retrying %s::%s in %.2fs after: %s',
+                         service, method, delay, e)
+                time.sleep(delay)
+                attempt += 1
+            else:
+                breaker.record(True)
+                return result
+
+    def _check_deadline(self, service, method):
+        remaining = self.remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise exceptions.DeadlineExceeded(
+                'The request deadline passed before calling %s::%s'
+                % (service, method), code=503)
+
+    def _call(self, service, method, *args, **kwargs):
+        transport = sl_transports.select_transport(service, self.auth,
+                                                   kwargs.get('mask'))
+        try:
+            if transport == sl_transports.REST:
+                return self.rest_call(service, method, *args, **kwargs)
+            return super(Client, self).call(service, method, *args, **kwargs)
+        except SoftLayer.TransportError:
+            remaining = self.remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise exceptions.DeadlineExceeded(
+                    'The request deadline passed while calling %s::%s'
+                    % (service, method), code=504)
+            raise
+
+    def rest_call(self, service, method, *args, **kwargs):
+        """Makes a call with the REST transport, see Client.call."""
+        invalid_kwargs = set(kwargs.keys()) - SoftLayer.API.VALID_CALL_ARGS
+        if invalid_kwargs:
+            raise TypeError(
+                'Invalid keyword arguments: %s' % ','.join(invalid_kwargs))
+
+        if not service.startswith(self._prefix):
+            service = self._prefix + service
+
+        headers = {
+            'User-Agent': self.user_agent or SoftLayer.consts.USER_AGENT,
+        }
+        if kwargs.get('raw_headers'):
+            headers.update(kwargs['raw_headers'])
+
+        request = SoftLayer.transports.Request()
+        request.endpoint = sl_transports.get_rest_endpoint()
+        request.service = service
+        request.method = method
+        request.args = args
+        request.transport_headers = headers
+        request.timeout = self.timeout
+        request.proxy = self.proxy
+        request.identifier = kwargs.get('id')
+        request.mask = kwargs.get('mask')
+        request.filter = kwargs.get('filter')
+        request.limit = kwargs.get('limit')
+        request.offset = kwargs.get('offset')
+        if self.auth is not None:
+            request.username = self.auth.username
+            request.api_key = self.auth.api_key
+
+        return sl_transports.make_rest_api_call(request)
+
+
+class TimedClient(Client, SoftLayer.TimedClient):
+    """Client that also records the duration of its calls."""
+
+    def rest_call(self, service, method, *args, **kwargs):
+        start_time = time.time()
+        result = super(TimedClient, self).rest_call(service, method, *args,
+                                                    **kwargs)
+        self.last_calls.append((service + '.' + method, start_time,
+                                time.time() - start_time))
+        return result
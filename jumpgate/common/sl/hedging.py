@@ -0,0 +1,198 @@
+"""Hedged SoftLayer reads.
+
+When a call of a hedged method takes longer than the ``percentile`` of its
+recent durations, a duplicate call is made and the first successful
+response is used. Hedges are limited to ``budget`` of the hedged calls,
+so slow SoftLayer responses can't double the load of the API.
+
+Hedged calls run in a thread pool. The deadline of the request is kept
+per thread by the client, so it is passed explicitly to the pool threads.
+When the pool is busy, calls are made directly and are not hedged.
+"""
+import collections
+import threading
+import time
+
+from concurrent import futures
+from oslo.config import cfg
+
+from jumpgate.common import exceptions
+from jumpgate.common import limits
+
+opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help='Hedge the calls of the hedged methods'),
+    cfg.ListOpt('methods',
+                default=['Virtual_Guest.getObject', 'Account.getCurrentUser'],
+                help='Service.method of the read calls to hedge'),
+    cfg.FloatOpt('percentile', default=95,
+                 help='Percentile of the recent durations of a method after '
+                      'which its calls are hedged'),
+    cfg.FloatOpt('min_delay', default=0.05,
+                 help='Minimum seconds before hedging a call'),
+    cfg.IntOpt('min_samples', default=20,
+               help='Calls of a method to measure before hedging it'),
+    cfg.FloatOpt('budget', default=0.05,
+                 help='Maximum share of the hedged calls that are hedged'),
+    cfg.IntOpt('pool_size', default=16,
+               help='Threads making hedged calls'),
+]
+
+cfg.CONF.register_opts(opts, group='hedging')
+
+# Durations kept per method
+_SAMPLES = 256
+# Hedges the budget can save up
+_BURST = 10
+
+
+def _method_name(service, method):
+    if service.startswith('SoftLayer_'):
+        service = service[len('SoftLayer_'):]
+    return '%s.%s' % (service, method)
+
+
+class LatencyTracker(object):
+    """Recent durations of the calls of a method."""
+
+    def __init__(self, size=_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = collections.deque(maxlen=size)
+        self._delay = None
+        self._added = 0
+
+    def record(self, duration):
+        with self._lock:
+            self._samples.append(duration)
+            self._added += 1
+
+    def delay(self):
+        """Returns the seconds after which to hedge, None when unknown."""
+        conf = cfg.CONF['hedging']
+        with self._lock:
+            if len(self._samples) < max(conf['min_samples'], 1):
+                return None
+            # Sorting is amortized over a few calls
+            if self._delay is None or self._added >= 16:
+                samples = sorted(self._samples)
+                index = int(len(samples) * conf['percentile'] / 100.0)
+                self._delay = samples[min(index, len(samples) - 1)]
+                self._added = 0
+            return max(self._delay, conf['min_delay'])
+
+
+class HedgeBudget(object):
+    """Credits a fraction of a hedge for every hedged call."""
+
+    def __init__(self, burst=_BURST):
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._credit = 0.0
+
+    def deposit(self, ratio):
+        with self._lock:
+            self._credit = min(self._credit + ratio, self.burst)
+
+    def withdraw(self):
+        with self._lock:
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+            return True
+
+
+_lock = threading.Lock()
+_trackers = {}
+_budget = HedgeBudget()
+_executor = None
+_slots = None
+stats = {'calls': 0, 'hedges': 0, 'wins': 0}
+
+
+def _count(key):
+    with _lock:
+        stats[key] += 1
+
+
+def should_hedge(service, method):
+    conf = cfg.CONF['hedging']
+    return (conf['enabled'] and method.startswith('get') and
+            _method_name(service, method) in conf['methods'])
+
+
+def get_tracker(name):
+    with _lock:
+        tracker = _trackers.get(name)
+        if tracker is None:
+            tracker = _trackers[name] = LatencyTracker()
+        return tracker
+
+
+def _submit(fn):
+    """Runs fn in the pool, returns None when the pool is busy."""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            size = max(cfg.CONF['hedging']['pool_size'], 1)
+            _executor = futures.ThreadPoolExecutor(size)
+            _slots = threading.BoundedSemaphore(size)
+    if not _slots.acquire(False):
+        return None
+    future = _executor.submit(fn)
+    future.add_done_callback(lambda f: _slots.release())
+    return future
+
+
+def hedged_call(client, call, service, method, *args, **kwargs):
+    """Makes ``call(service, method, ...)``, hedging it when it is slow."""
+    tracker = get_tracker(_method_name(service, method))
+    delay = tracker.delay()
+    _budget.deposit(cfg.CONF['hedging']['budget'])
+    _count('calls')
+    deadline = client.get_deadline()
+
+    def run():
+        client.set_deadline(deadline)
+        try:
+            start = time.time()
+            result = call(service, method, *args, **kwargs)
+            tracker.record(time.time() - start)
+            return result
+        finally:
+            client.set_deadline(None)
+
+    primary = _submit(run) if delay is not None else None
+    if primary is None:
+        start = time.time()
+        result = call(service, method, *args, **kwargs)
+        tracker.record(time.time() - start)
+        return result
+
+    try:
+        return primary.result(timeout=delay)
+    except futures.TimeoutError:
+        pass
+
+    if not _budget.withdraw():
+        return primary.result()
+    try:
+        limits.consume_slapi_call(client.tenant_id)
+    except exceptions.OverLimit:
+        return primary.result()
+    hedge = _submit(run)
+    if hedge is None:
+        return primary.result()
+    _count('hedges')
+
+    failed = None
+    pending = [primary, hedge]
+    while pending:
+        done, pending = futures.wait(pending,
+                                     return_when=futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    _count('wins')
+                return future.result()
+            failed = failed or future
+    return failed.result()
@@ -0,0 +1,284 @@
+"""Local mirror of the SoftLayer inventory of active tenants.
+
+When enabled, a background synchronizer is started for every tenant (and
+user, since SoftLayer permissions are per user) that makes requests. It
+periodically loads each registered resource type into a local SQLite
+store, and handlers read from the store instead of SoftLayer as long as
+the mirrored data is fresh enough. Handlers fall back to SoftLayer when
+the mirror is disabled, stale or has not been synchronized yet.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from oslo.config import cfg
+
+from jumpgate.common import cache
+from jumpgate.common import utils
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.BoolOpt('enabled', default=False,
+                help='Serve list and show requests from the local mirror'),
+    cfg.StrOpt('db_path', default=':memory:',
+               help='SQLite database used to store the mirror'),
+    cfg.IntOpt('sync_interval', default=60,
+               help='Seconds between two synchronizations of a tenant'),
+    cfg.IntOpt('max_staleness', default=120,
+               help='Age in seconds after which mirrored data is ignored'),
+    cfg.IntOpt('idle_timeout', default=900,
+               help='Seconds without requests after which a tenant is no '
+                    'longer synchronized'),
+]
+
+cfg.CONF.register_opts(opts, group='inventory')
+
+# resource type -> function(client) returning a list of dicts with an 'id'
+RESOURCES = {}
+
+_lock = threading.Lock()
+_store = None
+
+
+def register_resource(resource_type, loader):
+    RESOURCES[resource_type] = loader
+
+
+class InventoryStore(object):
+    """SQLite storage of the mirrored resources."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS resources ('
+                'owner TEXT NOT NULL, '
+                'resource_type TEXT NOT NULL, '
+                'position INTEGER NOT NULL, '
+                'resource_id TEXT NOT NULL, '
+                'data TEXT NOT NULL, '
+                'PRIMARY KEY (owner, resource_type, resource_id))')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS resources_by_position '
+                'ON resources (owner, resource_type, position)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS sync_state ('
+                'owner TEXT NOT NULL, '
+                'resource_type TEXT NOT NULL, '
+                'synced_at REAL NOT NULL, '
+                'PRIMARY KEY (owner, resource_type))')
+
+    def replace(self, owner, resource_type, resources, synced_at=None):
+        """Atomically replaces every mirrored resource of a type."""
+        rows = [(owner, resource_type, position, str(resource['id']),
+                 json.dumps(resource))
+                for position, resource in enumerate(resources)]
+        synced_at = synced_at or time.time()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM resources WHERE owner = ? AND resource_type = ?',
+                (owner, resource_type))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?)',
+                rows)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)',
+                (owner, resource_type, synced_at))
+
+    def synced_at(self, owner, resource_type):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT synced_at FROM sync_state '
+                'WHERE owner = ? AND resource_type = ?',
+                (owner, resource_type)).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, owner, resource_type, max_age):
+        synced_at = self.synced_at(owner, resource_type)
+        return synced_at is not None and time.time() - synced_at <= max_age
+
+    def list(self, owner, resource_type):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data FROM resources '
+                'WHERE owner = ? AND resource_type = ? ORDER BY position',
+                (owner, resource_type)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, owner, resource_type, resource_id):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM resources WHERE owner = ? AND '
+                'resource_type = ? AND resource_id = ?',
+                (owner, resource_type, str(resource_id))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, owner, resource_type, resource_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM resources WHERE owner = ? AND '
+                'resource_type = ? AND resource_id = ?',
+                (owner, resource_type, str(resource_id)))
+
+
+class TenantWorker(object):
+    """Background thread doing periodic work for one active tenant.
+
+    The thread stops by itself once ``touch()`` has not been called for
+    ``idle_timeout`` seconds. Subclasses implement ``run_once()``.
+    """
+
+    def __init__(self, owner, client, interval, idle_timeout):
+        self.owner = owner
+        self.client = client
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.last_used = time.time()
+        self.stopped = threading.Event()
+        self._thread = None
+
+    def touch(self, client):
+        # Keep the most recent credentials of the tenant
+        self.client = client
+        self.last_used = time.time()
+
+    def is_idle(self):
+        return time.time() - self.last_used > self.idle_timeout
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def _run(self):
+        while not self.stopped.is_set() and not self.is_idle():
+            try:
+                self.run_once()
+            except Exception:
+                LOG.exception('Background work failed for %s', self.owner)
+            self.stopped.wait(self.interval)
+        self.stopped.set()
+
+
+class TenantWorkers(object):
+    """Keeps one running TenantWorker per owner."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.workers = {}
+        self._lock = threading.Lock()
+
+    def get(self, owner, client):
+        """Returns the worker of an owner, starting it if needed."""
+        with self._lock:
+            worker = self.workers.get(owner)
+            if worker is None or worker.stopped.is_set():
+                worker = self.factory(owner, client)
+                self.workers[owner] = worker
+                worker.start()
+            else:
+                worker.touch(client)
+        return worker
+
+
+class Synchronizer(TenantWorker):
+    def __init__(self, store, owner, client):
+        conf = cfg.CONF['inventory']
+        super(Synchronizer, self).__init__(owner, client,
+                                           conf['sync_interval'],
+                                           conf['idle_timeout'])
+        self.store = store
+
+    def run_once(self):
+        for resource_type, loader in list(RESOURCES.items()):
+            started = time.time()
+            try:
+                resources = loader(self.client)
+            except Exception:
+                LOG.exception('Unable to synchronize %s of %s',
+                              resource_type, self.owner)
+                continue
+            if not isinstance(resources, list):
+                resources = [resources]
+            self.store.replace(self.owner, resource_type, resources,
+                               synced_at=started)
+
+
+_synchronizers = TenantWorkers(
+    lambda owner, client: Synchronizer(get_store(), owner, client))
+
+
+def get_store():
+    global _store
+    with _lock:
+        if _store is None:
+            _store = InventoryStore(cfg.CONF['inventory']['db_path'])
+        return _store
+
+
+def get_owner(req):
+    """Returns the key the mirror of the tenant of a request is stored by."""
+    tenant_id = utils.lookup(req.env, 'auth', 'tenant_id')
+    if tenant_id is None:
+        return None
+    user_id = utils.lookup(req.env, 'auth', 'user_id')
+    return '%s/%s' % (tenant_id, user_id)
+
+
+def activate(req):
+    """Makes sure the tenant of a request is being synchronized.
+
+    :returns: the mirror owner key, or None when the mirror can't be used
+    """
+    if not cfg.CONF['inventory']['enabled'] or not RESOURCES:
+        return None
+
+    owner = get_owner(req)
+    client = req.env.get('sl_client')
+    if owner is None or client is None:
+        return None
+
+    _synchronizers.get(owner, client)
+    return owner
+
+
+def _is_usable(req, owner, resource_type, resource_id=None):
+    synced_at = get_store().synced_at(owner, resource_type)
+    if synced_at is None:
+        return False
+
+    if time.time() - synced_at > cfg.CONF['inventory']['max_staleness']:
+        return False
+
+    # Data synchronized before a recent change settled can't be trusted
+    hot_until = cache.RESOURCES.hot_until(owner, resource_type,
+                                          resource_id)
+    return synced_at >= hot_until
+
+
+def list_resources(req, resource_type):
+    """Returns the mirrored resources of a type or None if unavailable."""
+    owner = activate(req)
+    if owner is None or not _is_usable(req, owner, resource_type):
+        return None
+    return get_store().list(owner, resource_type)
+
+
+def get_resource(req, resource_type, resource_id):
+    """Returns a mirrored resource or None if it is unavailable."""
+    owner = activate(req)
+    if owner is None or not _is_usable(req, owner, resource_type,
+                                       resource_id):
+        return None
+    return get_store().get(owner, resource_type, resource_id)
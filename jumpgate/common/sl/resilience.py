@@ -0,0 +1,199 @@
+"""Retries and circuit breakers around SoftLayer API calls.
+
+Reads (``get*`` methods) failing with a transient error are retried with
+exponential backoff and full jitter, within the deadline of the request.
+Other methods are never retried since they may not be idempotent.
+
+Every ``Service.method`` has a circuit breaker counting the transient
+failures of its calls. Once they reach ``breaker_error_rate`` of the calls
+of a window, the breaker opens and calls fail fast with a 503 until
+``breaker_reset_timeout`` passes. A single trial call is then let through
+and closes the breaker again when it succeeds. Calls cut short by the
+deadline of their request are not counted, since clients may shorten it
+at will. Breakers are kept per process, their state is returned by
+``get_breaker_stats()`` and their transitions are logged.
+"""
+import logging
+import random
+import threading
+import time
+
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import exceptions
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.IntOpt('retry_attempts', default=2,
+               help='Retries of a SoftLayer read failing with a transient '
+                    'error. 0 disables retries.'),
+    cfg.FloatOpt('retry_base_delay', default=0.1,
+                 help='Maximum seconds before the first retry, doubled '
+                      'at every retry'),
+    cfg.FloatOpt('retry_max_delay', default=2.0,
+                 help='Maximum seconds between two retries'),
+    cfg.FloatOpt('breaker_error_rate', default=0.5,
+                 help='Share of failed calls of a SoftLayer method opening '
+                      'its circuit breaker. 0 disables the breakers.'),
+    cfg.IntOpt('breaker_min_calls', default=10,
+               help='Calls of a window needed before its error rate can '
+                    'open a breaker'),
+    cfg.IntOpt('breaker_window', default=30,
+               help='Seconds over which the error rate is measured'),
+    cfg.IntOpt('breaker_reset_timeout', default=30,
+               help='Seconds an open breaker fails calls before letting a '
+                    'trial call through'),
+]
+
+cfg.CONF.register_opts(opts, group='resilience')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+TRANSIENT_ERRORS = (SoftLayer.TransportError,
+                    SoftLayer.exceptions.InternalError,
+                    SoftLayer.exceptions.RemoteSystemError)
+
+
+def is_transient(error):
+    """Tells whether an error of a call may not happen again."""
+    if isinstance(error, exceptions.DeadlineExceeded):
+        # The request is out of time, trying again cannot help
+        return False
+    if isinstance(error, SoftLayer.TransportError):
+        # HTTP client errors won't be fixed by trying again
+        status = error.faultCode if isinstance(error.faultCode, int) else 0
+        return not 400 <= status < 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def is_idempotent(method):
+    return method.startswith('get')
+
+
+def retry_delay(attempt):
+    """Returns the seconds to wait before the retry following attempt."""
+    conf = cfg.CONF['resilience']
+    ceiling = min(conf['retry_max_delay'],
+                  conf['retry_base_delay'] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._calls = 0
+        self._failures = 0
+        self._opened_at = 0
+        self._trial = False
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def before_call(self):
+        """Raises ServiceUnavailable when the call must not be made."""
+        conf = cfg.CONF['resilience']
+        if conf['breaker_error_rate'] <= 0:
+            return
+
+        with self._lock:
+            now = time.time()
+            if self.state == OPEN:
+                retry_after = (self._opened_at +
+                               conf['breaker_reset_timeout'] - now)
+                if retry_after <= 0:
+                    self._transition(HALF_OPEN)
+                else:
+                    self.stats['rejected'] += 1
+                    raise exceptions.ServiceUnavailable(
+                        'SoftLayer %s is failing' % self.name,
+                        retry_after=int(retry_after) + 1)
+
+            if self.state == HALF_OPEN:
+                if self._trial:
+                    self.stats['rejected'] += 1
+                    raise exceptions.ServiceUnavailable(
+                        'SoftLayer %s is failing' % self.name)
+                self._trial = True
+
+    def record(self, success):
+        conf = cfg.CONF['resilience']
+        with self._lock:
+            now = time.time()
+            self.stats['calls'] += 1
+            if not success:
+                self.stats['failures'] += 1
+
+            if self.state == HALF_OPEN:
+                self._trial = False
+                self._reset_window(now)
+                if success:
+                    self._transition(CLOSED)
+                else:
+                    self._open(now)
+                return
+
+            if now - self._window_start >= conf['breaker_window']:
+                self._reset_window(now)
+            self._calls += 1
+            if not success:
+                self._failures += 1
+
+            if (self.state == CLOSED and
+                    conf['breaker_error_rate'] > 0 and
+                    self._calls >= conf['breaker_min_calls'] and
+                    self._failures >= self._calls *
+                    conf['breaker_error_rate']):
+                self._open(now)
+
+    def discard(self):
+        """Forgets a call whose outcome is not SoftLayer's doing."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Lets another trial call through
+                self._trial = False
+
+    def _reset_window(self, now):
+        self._window_start = now
+        self._calls = 0
+        self._failures = 0
+
+    def _open(self, now):
+        self._opened_at = now
+        self.stats['opened'] += 1
+        self._transition(OPEN)
+        self._reset_window(now)
+
+    def _transition(self, state):
+        if state != self.state:
+            LOG.warning('SoftLayer %s circuit breaker %s -> %s',
+                        self.name, self.state, state)
+            self.state = state
+
+
+_lock = threading.Lock()
+_breakers = {}
+
+
+def get_breaker(service, method):
+    name = '%s.%s' % (service, method)
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def get_breaker_stats():
+    """Returns the state and counters of the breaker of every method."""
+    with _lock:
+        breakers = list(_breakers.values())
+    stats = {}
+    for breaker in breakers:
+        stats[breaker.name] = dict(breaker.stats, state=breaker.state)
+    return stats
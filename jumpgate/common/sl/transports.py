@@ -0,0 +1,196 @@
+"""REST/JSON transport of the SoftLayer API.
+
+The SoftLayer library only speaks XML-RPC, whose responses are expensive
+to decode for large results such as ``Account::getVirtualGuests`` with
+deep masks. ``transport = rest`` makes the calls of the jumpgate client go
+to the REST endpoint instead, for every service or for the services listed
+in ``service_transports``.
+
+REST calls return the same values as XML-RPC calls, see ``normalize()``,
+and fail with the same exceptions. The REST endpoint only supports
+username/API key authentication, so calls authenticated with a portal
+token keep using XML-RPC.
+"""
+import json
+import logging
+import threading
+
+from oslo.config import cfg
+import requests
+import six
+import SoftLayer
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.StrOpt('transport', default='xmlrpc',
+               help="Transport of SoftLayer API calls: 'xmlrpc' or 'rest'"),
+    cfg.DictOpt('service_transports', default={},
+                help='Transport by SoftLayer service, e.g. '
+                     'Account:rest,Virtual_Guest:rest'),
+    cfg.StrOpt('rest_endpoint', default=None,
+               help='SoftLayer REST endpoint. Defaults to the REST '
+                    'counterpart of the endpoint option.'),
+]
+
+cfg.CONF.register_opts(opts, group='softlayer')
+
+XMLRPC = 'xmlrpc'
+REST = 'rest'
+
+_PREFIX = 'SoftLayer_'
+
+_local = threading.local()
+
+
+def _short_name(service):
+    if service.startswith(_PREFIX):
+        return service[len(_PREFIX):]
+    return service
+
+
+def select_transport(service, auth, mask=None):
+    """Returns the transport of a call of a service."""
+    conf = cfg.CONF['softlayer']
+    transport = conf['service_transports'].get(_short_name(service),
+                                               conf['transport'])
+    if transport != REST:
+        return XMLRPC
+    if auth is not None and not isinstance(auth,
+                                           SoftLayer.BasicAuthentication):
+        return XMLRPC
+    # Legacy dict masks only exist in XML-RPC headers
+    if isinstance(mask, dict):
+        return XMLRPC
+    return REST
+
+
+def get_rest_endpoint():
+    conf = cfg.CONF['softlayer']
+    if conf['rest_endpoint']:
+        return conf['rest_endpoint']
+    return conf['endpoint'].replace('/xmlrpc/', '/rest/')
+
+
+def format_mask(mask):
+    mask = mask.strip()
+    if not mask.startswith('mask') and not mask.startswith('['):
+        mask = 'mask[%s]' % mask
+    return mask
+
+
+def _session():
+    # Reusing connections saves a TLS handshake per call
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _proxies(proxy):
+    return {'http': proxy, 'https': proxy} if proxy else None
+
+
+def _loads(content):
+    if isinstance(content, six.binary_type):
+        content = content.decode('utf-8')
+    if not content:
+        return None
+    return json.loads(content)
+
+
+if six.PY2:
+    def _string(value):
+        try:
+            return value.encode('ascii')
+        except UnicodeError:
+            return value
+
+    def normalize(value):
+        """Returns a decoded REST result as XML-RPC calls return it.
+
+        xmlrpclib returns ASCII strings as str, json returns unicode.
+        """
+        if isinstance(value, dict):
+            return dict((_string(key), normalize(item))
+                        for key, item in value.items())
+        if isinstance(value, list):
+            return [normalize(item) for item in value]
+        if isinstance(value, six.text_type):
+            return _string(value)
+        return value
+else:
+    def normalize(value):
+        """Returns a decoded REST result as XML-RPC calls return it.
+
+        Both transports decode to the same types on Python 3.
+        """
+        return value
+
+
+def make_rest_api_call(request):
+    """Makes a SoftLayer API call against the REST endpoint.
+
+    Unlike ``SoftLayer.transports.make_rest_api_call``, this supports the
+    parameters, masks, filters and limits of the calls. Calls with
+    parameters, and calls of methods other than getters, are POSTed.
+
+    :param request: a ``SoftLayer.transports.Request`` with the
+                    ``username`` and ``api_key`` attributes set when the
+                    call is authenticated
+    """
+    url_parts = [request.endpoint.rstrip('/'), request.service]
+    if request.identifier is not None:
+        url_parts.append(str(request.identifier))
+    url_parts.append(request.method)
+    url = '%s.json' % '/'.join(url_parts)
+
+    params = {}
+    if request.mask:
+        params['objectMask'] = format_mask(request.mask)
+    if request.filter:
+        params['objectFilter'] = json.dumps(request.filter)
+    if request.limit:
+        params['resultLimit'] = '%d,%d' % (request.offset or 0,
+                                           request.limit)
+
+    http_method = 'GET'
+    data = None
+    if request.args or not request.method.startswith('get'):
+        http_method = 'POST'
+        data = json.dumps({'parameters': list(request.args)})
+
+    auth = None
+    if getattr(request, 'username', None):
+        auth = (request.username, request.api_key)
+
+    LOG.debug('%s %s', http_method, url)
+    try:
+        resp = _session().request(http_method, url,
+                                  params=params,
+                                  data=data,
+                                  auth=auth,
+                                  headers=request.transport_headers,
+                                  timeout=request.timeout,
+                                  proxies=_proxies(request.proxy))
+        content = resp.content
+    except requests.RequestException as e:
+        raise SoftLayer.TransportError(0, str(e))
+
+    if resp.status_code >= 400:
+        try:
+            error = _loads(content)
+        except ValueError:
+            error = None
+        if isinstance(error, dict) and 'error' in error:
+            raise SoftLayer.SoftLayerAPIError(
+                error.get('code') or resp.status_code, error['error'])
+        raise SoftLayer.TransportError(resp.status_code,
+                                       '%s %s' % (resp.status_code,
+                                                  resp.reason))
+
+    try:
+        return normalize(_loads(content))
+    except ValueError as e:
+        raise SoftLayer.TransportError(resp.status_code,
+                                       'Invalid JSON response: %s' % e)
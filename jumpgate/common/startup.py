@@ -0,0 +1,265 @@
+"""Profile of the startup of a worker, ``jumpgate --profile-startup`` and
+``jumpgate-import-report``.
+
+``wsgi.make_api()`` runs with its phases timed: importing jumpgate,
+parsing the configuration, importing the hook modules, loading the
+endpoints and the driver of every service, setting up their routes and
+building the falcon API. The time every phase spends importing modules is
+measured separately. ``--profile-startup`` also runs make_api() under
+cProfile: parsing the files of the drivers and registering the falcon
+routes happen within phases, they are reported from the call profile.
+
+Times include the overhead of the profilers, compare them with each other
+rather than with the startup of a worker that is not profiled.
+"""
+from __future__ import print_function
+import collections
+import cProfile
+import functools
+import importlib
+import pstats
+import subprocess
+import sys
+import time
+
+from oslo.config import cfg
+
+from six.moves import builtins
+
+# (row, path suffix, function) of the calls reported from the profile
+PROFILED_CALLS = [
+    ('flavor parsing', 'compute/drivers/sl/flavor_list_loader.py',
+     'get_flavors'),
+    ('catalog template parsing', 'identity/drivers/sl/tokens.py',
+     'reload_templates'),
+    ('catalog template parsing', 'identity/drivers/sl/auth_tokens_v3.py',
+     'reload_templates'),
+    ('catalog template parsing', 'identity/drivers/sl/services_v3.py',
+     'reload_templates'),
+    ('volume type parsing', 'volume/drivers/sl/routes.py',
+     'load_volume_types'),
+    ('falcon route registration', 'falcon/api.py', 'add_route'),
+]
+
+
+class ImportTimer(object):
+    """Measures the time spent importing modules.
+
+    Only the outermost imports are timed, the imports they trigger are
+    part of their time.
+    """
+
+    def __init__(self):
+        self.seconds = 0
+        self._depth = 0
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def timed_import(*args, **kwargs):
+            self._depth += 1
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self.seconds += time.time() - start
+        return timed_import
+
+
+def slowest_modules(modules, count):
+    """Returns the (self, cumulative, name) import times of the modules
+    spending the most time importing themselves, in microseconds.
+
+    Needs python 3.7 or later, returns [] otherwise.
+    """
+    if sys.version_info < (3, 7):
+        return []
+    code = '; '.join('import %s' % name for name in modules)
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stderr=subprocess.STDOUT).decode('utf-8')
+    times = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            times.append((int(fields[0]), int(fields[1]),
+                          fields[2].strip()))
+        except ValueError:
+            # Header line
+            continue
+    times.sort(reverse=True)
+    return times[:count]
+
+
+class StartupProfile(object):
+    """Times the phases of wsgi.make_api().
+
+    :param profile_calls: whether to run make_api() under cProfile too
+    """
+
+    def __init__(self, profile_calls=True):
+        # name: [seconds, import seconds, imported modules, depth], phases
+        # run by other phases have a depth of 1 or more
+        self.phases = collections.OrderedDict()
+        self.total = 0
+        self.stats = None
+        self.profile_calls = profile_calls
+        self.imports = ImportTimer()
+        self._patches = []
+        self._depth = 0
+
+    def _record(self, name, func, *args, **kwargs):
+        totals = self.phases.setdefault(name, [0, 0, 0, self._depth])
+        modules = len(sys.modules)
+        imports = self.imports.seconds
+        start = time.time()
+        self._depth += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._depth -= 1
+            totals[0] += time.time() - start
+            totals[1] += self.imports.seconds - imports
+            totals[2] += len(sys.modules) - modules
+
+    def _patch(self, owner, name, label):
+        """Times the calls to owner.name as phases named label(*args).
+
+        The calls of a phase add up, APIHooks.load_hooks() for instance is
+        called again once the hooks are loaded.
+        """
+        original = owner.__dict__[name]
+        func = getattr(owner, name)
+
+        @functools.wraps(func)
+        def phase(*args, **kwargs):
+            return self._record(label(*args), func, *args, **kwargs)
+
+        if isinstance(original, (classmethod, staticmethod)):
+            phase = staticmethod(phase)
+        setattr(owner, name, phase)
+        self._patches.append((owner, name, original))
+
+    def _patch_imports(self):
+        for owner, name in [(builtins, '__import__'),
+                            (importlib, 'import_module')]:
+            original = getattr(owner, name)
+            setattr(owner, name, self.imports.wrap(original))
+            self._patches.append((owner, name, original))
+
+    def _unpatch(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def run(self, config_path=None):
+        """Profiles wsgi.make_api(config_path) and returns the API."""
+        start = time.time()
+        self._patch_imports()
+        try:
+            wsgi = self._record('jumpgate imports', importlib.import_module,
+                                'jumpgate.wsgi')
+            from jumpgate import api
+            from jumpgate.common import hooks
+
+            self._patch(wsgi, 'configure', lambda *args: 'configuration')
+            self._patch(type(hooks.APIHooks()), 'load_hooks',
+                        lambda *args: 'hook imports')
+            self._patch(api.Jumpgate, 'load_service_endpoints',
+                        lambda app, service: 'endpoints ' + service)
+            self._patch(api.Jumpgate, 'load_service_driver',
+                        lambda app, service, disp: 'driver ' + service)
+            self._patch(api.Jumpgate, 'setup_service_routes',
+                        lambda app, service, *args: 'routes ' + service)
+            self._patch(api.Jumpgate, 'make_api', lambda *args: 'falcon API')
+
+            if not self.profile_calls:
+                return wsgi.make_api(config_path)
+            profiler = cProfile.Profile()
+            result = profiler.runcall(wsgi.make_api, config_path)
+            self.stats = pstats.Stats(profiler)
+            return result
+        finally:
+            self.total = time.time() - start
+            self._unpatch()
+
+    def service_modules(self):
+        """Returns the modules imported to set up the enabled services."""
+        modules = ['jumpgate.wsgi']
+        for name in self.phases:
+            if not name.startswith('driver '):
+                continue
+            driver = cfg.CONF[name[len('driver '):]]['driver']
+            # The SoftLayer drivers import their handlers in routes
+            routes = driver + '.routes'
+            modules.append(routes if routes in sys.modules else driver)
+        return modules
+
+    def profiled_calls(self):
+        """Returns [(row, seconds, calls)] of PROFILED_CALLS."""
+        rows = []
+        for row, suffix, function in PROFILED_CALLS:
+            seconds, calls = 0, 0
+            for (path, _, name), stat in self.stats.stats.items():
+                if (name == function and
+                        path.replace('\\', '/').endswith(suffix)):
+                    calls += stat[1]
+                    seconds += stat[3]
+            if not calls:
+                continue
+            if rows and rows[-1][0] == row:
+                rows[-1] = (row, rows[-1][1] + seconds, rows[-1][2] + calls)
+            else:
+                rows.append((row, seconds, calls))
+        return rows
+
+    def report(self, top=20, modules=0, out=sys.stdout):
+        """Prints the phases, then the top slowest calls and modules."""
+        print('startup profile, times include the profilers overhead',
+              file=out)
+        print('  %-28s %9s %11s %8s' % ('phase', 'ms', 'imports ms',
+                                        'modules'), file=out)
+        for name, (seconds, imports, count, depth) in self.phases.items():
+            print('  %-28s %9.1f %11.1f %8d' % ('  ' * depth + name,
+                                                seconds * 1000,
+                                                imports * 1000, count),
+                  file=out)
+        other = self.total - sum(phase[0] for phase in self.phases.values()
+                                 if not phase[3])
+        print('  %-28s %9.1f' % ('other', other * 1000), file=out)
+        print('  %-28s %9.1f %11.1f' % ('total', self.total * 1000,
+                                        self.imports.seconds * 1000),
+              file=out)
+        # lazy_load sets up routes on the first request, with falcon sinks
+        deferred = sum(phase[0] for name, phase in self.phases.items()
+                       if name.startswith('routes ') or name == 'falcon API')
+        if any(name.startswith('routes ') for name in self.phases):
+            print('  %-28s %9.1f' % ('total with lazy_load, est.',
+                                     (self.total - deferred) * 1000),
+                  file=out)
+
+        if self.stats is not None:
+            print('\n  %-28s %9s %11s' % ('within the phases', 'ms',
+                                          'calls'), file=out)
+            for row, seconds, calls in self.profiled_calls():
+                print('  %-28s %9.1f %11d' % (row, seconds * 1000, calls),
+                      file=out)
+
+        if top and self.stats is not None:
+            print('\nslowest calls', file=out)
+            self.stats.stream = out
+            self.stats.sort_stats('cumulative').print_stats(top)
+
+        slowest = []
+        if modules:
+            slowest = slowest_modules(self.service_modules(), modules)
+        if slowest:
+            print('\n  %-48s %9s %9s' % ('slowest modules', 'self ms',
+                                         'cumul. ms'), file=out)
+            for self_us, cumulative_us, name in slowest:
+                print('  %-48s %9.1f %9.1f' % (
+                    name, self_us / 1000.0, cumulative_us / 1000.0),
+                    file=out)
@@ -2,9 +2,11 @@ import functools
 import importlib
 import inspect
 import logging
+import threading
 
 LOG = logging.getLogger(__name__)
 _driver_cache = {}
+_driver_lock = threading.Lock()
 
 
 def lookup(dic, key, *keys):
@@ -43,14 +45,44 @@ def import_class(canonical_name):
 
 
 def load_driver(canonical_name):
-    global _driver_cache
-    try:
+    """Returns the driver instance of the given canonical class name.
+
+    A driver is instantiated once per canonical name and that instance is
+    shared by every request of the process, on every thread. Drivers must
+    therefore be thread-safe: state set up in __init__ is read-only
+    afterwards and nothing specific to a request is kept on the instance.
+    """
+    driver = _driver_cache.get(canonical_name)
+    if driver is not None:
+        return driver
+    with _driver_lock:
         driver = _driver_cache.get(canonical_name)
         if driver is None:
-            driver = import_class(canonical_name)
+            try:
+                driver = import_class(canonical_name)()
+            except ImportError as e:
+                LOG.error("Unable to load driver '%s'" % (canonical_name))
+                raise e
             LOG.debug("Loaded driver '%s'" % (canonical_name))
             _driver_cache[canonical_name] = driver
-        return driver()
-    except ImportError as e:
-        LOG.error("Unable to load driver '%s'" % (canonical_name))
-        raise e
+        return driver
+
+
+def url_builder(app, req, service, nickname, var, **kwargs):
+    """Returns a function building the URL of an endpoint from one variable.
+
+    The URL is built once around a placeholder, so formatting the items of
+    a list does not go through app.get_endpoint_url() for every link.
+    """
+    placeholder = '{%s}' % var
+    kwargs[var] = placeholder
+    url = app.get_endpoint_url(service, req, nickname, **kwargs)
+    try:
+        head, tail = url.split(placeholder)
+    except (AttributeError, TypeError, ValueError):
+        # Not a string, or the variable is missing or repeated
+        def build(value):
+            kwargs[var] = value
+            return app.get_endpoint_url(service, req, nickname, **kwargs)
+        return build
+    return lambda value: '%s%s%s' % (head, value, tail)
@@ -43,6 +43,10 @@ def add_endpoints(disp):
         'v2_os_instance_action',
         '/v2/{tenant_id}/servers/{server_id}/os-instance-actions/{action_id}')
 
+    # Server Events
+    disp.add_endpoint('v2_os_server_events',
+                      '/v2/{tenant_id}/os-server-events')
+
     # Images
     disp.add_endpoint('v2_image', '/v2/{tenant_id}/images/{image_guid}')
     disp.add_endpoint('v2_images', '/v2/{tenant_id}/images')
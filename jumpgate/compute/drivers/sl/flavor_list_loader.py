@@ -1,6 +1,17 @@
+import bisect
+import collections
+import functools
+import itertools
 import json
 import logging
 import os
+import threading
+import time
+
+import SoftLayer
+
+from jumpgate.common import reloader
+from jumpgate.common import utils
 
 LOG = logging.getLogger(__name__)
 
@@ -18,11 +29,24 @@ FLAVOR_DICT = {'1': flavor1, '2': flavor2, '3': flavor3, '4': flavor4,
                '5': flavor5}
 
 
+def make_client(conf):
+    """Returns a client of the account flavors are generated from."""
+    extra_args = {}
+    if SoftLayer.__version__ > 'v3.0.3':
+        extra_args['proxy'] = conf.softlayer.proxy
+
+    return SoftLayer.Client(username=conf.flavors.username,
+                            api_key=conf.flavors.api_key,
+                            endpoint_url=conf.softlayer.endpoint,
+                            **extra_args)
+
+
 class Flavors(object):
     _flavors = None
 
     @classmethod
     def get_flavors(cls, app):
+        loaded_file = None
         try:
             if cls._flavors is None:
                 json_file = app.config.flavors.flavor_list
@@ -32,20 +56,51 @@ class Flavors(object):
                 if json_file is None:
                     raise ValueError('flavor_list.json not found')
 
-                with open(json_file) as jf:
-                    json_str = jf.read()
-                    flavors = json.loads(json_str)
-                    cls._flavors = {
-                        int(key): format_flavor_extra_specs(val)
-                        for key, val in flavors.items()
-                    }
+                cls._flavors = load_flavor_file(json_file)
+                loaded_file = json_file
         except Exception as err_str:
             LOG.info(str(err_str))
             cls._flavors = {int(key): format_flavor_extra_specs(val)
                             for key, val in FLAVOR_DICT.items()}
         # Set flavor '1' as the default
         cls._flavors[None] = cls._flavors[1]
-        return get_listing_flavors(cls._flavors)
+        catalog = get_listing_flavors(cls._flavors)
+
+        conf = app.config
+        if conf.flavors.source != 'softlayer':
+            flavors = ReloadableFlavors(catalog)
+            if loaded_file is not None:
+                reloader.watch(loaded_file,
+                               lambda path: cls.reload(path, flavors))
+            return flavors
+
+        flavors = SoftLayerFlavors(conf.flavors.catalog_cache,
+                                   conf.flavors.catalog_ttl,
+                                   functools.partial(make_client, conf),
+                                   catalog)
+        flavors.load()
+        # Pick up the flavors generated by other processes
+        reloader.watch(conf.flavors.catalog_cache,
+                       lambda path: flavors.load())
+        return flavors
+
+    @classmethod
+    def reload(cls, json_file, flavors):
+        '''Loads a flavor file again into a ReloadableFlavors'''
+        new_flavors = load_flavor_file(json_file)
+        catalog = get_listing_flavors(new_flavors)
+        if not len(catalog):
+            raise ValueError('no valid flavors in %s' % json_file)
+        new_flavors[None] = new_flavors.get(1)
+        cls._flavors = new_flavors
+        flavors.replace(catalog)
+
+
+def load_flavor_file(json_file):
+    with open(json_file) as jf:
+        flavors = json.loads(jf.read())
+    return {int(key): format_flavor_extra_specs(val)
+            for key, val in flavors.items()}
 
 
 def format_flavor_extra_specs(flavor):
@@ -94,4 +149,277 @@ def get_listing_flavors(flavors_from_config):
         if flavor_id and is_valid_flavor(flavor, id_set):
             proper_flavors.append(flavor)
             id_set.add(int(flavor['id']))
-    return proper_flavors
+    return FlavorCatalog(proper_flavors)
+
+
+def normalize_id(flavor_id):
+    try:
+        return str(int(flavor_id))
+    except (TypeError, ValueError):
+        return str(flavor_id)
+
+
+class FlavorCatalog(object):
+    '''Immutable set of flavors indexed for the flavor and server handlers
+
+    Flavors are ordered by their numeric id, the order the 'marker'
+    parameter pages through. Lookups by id are O(1) and minRam/minDisk
+    filters use bisect on pre-sorted ram and disk indexes.
+    '''
+
+    # Number of hosts (and tenants) the rendered views are kept for, the
+    # least recently used views are dropped first
+    max_views = 64
+
+    def __init__(self, flavors):
+        self._flavors = sorted(flavors, key=lambda f: int(f['id']))
+        self._ids = [int(f['id']) for f in self._flavors]
+        self._by_id = dict((normalize_id(f['id']), f)
+                           for f in self._flavors)
+        self._by_attr = {}
+        for attr in ('ram', 'disk'):
+            index = sorted((f[attr], pos)
+                           for pos, f in enumerate(self._flavors))
+            self._by_attr[attr] = ([value for value, _ in index],
+                                   [pos for _, pos in index])
+        self._views = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self._flavors)
+
+    def __len__(self):
+        return len(self._flavors)
+
+    def __contains__(self, flavor_id):
+        return normalize_id(flavor_id) in self._by_id
+
+    def get(self, flavor_id):
+        '''Returns the flavor with the given id or None'''
+        return self._by_id.get(normalize_id(flavor_id))
+
+    def filter(self, marker=None, min_disk=None, min_ram=None, limit=None):
+        '''Returns the flavors after marker with enough disk and ram'''
+        start = 0
+        if marker is not None:
+            start = bisect.bisect_right(self._ids, int(marker))
+
+        # Walk the smallest candidate range and check the other conditions
+        minimums = {'disk': min_disk, 'ram': min_ram}
+        candidates = range(start, len(self._flavors))
+        for attr, minimum in minimums.items():
+            if minimum is None:
+                continue
+            values, positions = self._by_attr[attr]
+            first = bisect.bisect_left(values, minimum)
+            if len(values) - first < len(candidates):
+                candidates = sorted(pos for pos in positions[first:]
+                                    if pos >= start)
+
+        results = []
+        for pos in candidates:
+            flavor = self._flavors[pos]
+            if all(minimum is None or flavor[attr] >= minimum
+                   for attr, minimum in minimums.items()):
+                results.append(flavor)
+                if limit is not None and 0 <= limit <= len(results):
+                    break
+        # Negative limits drop flavors from the end, like a list slice
+        return results[:limit] if limit is not None else results
+
+    def get_views(self, key, render):
+        '''Returns the flavors rendered with render() by flavor id
+
+        The rendered flavors are cached under key, which must identify
+        everything the rendering depends on besides the flavor. They are
+        shared between requests and must not be modified.
+        '''
+        with self._lock:
+            views = self._views.pop(key, None)
+            if views is not None:
+                self._views[key] = views
+                return views
+
+        views = dict((normalize_id(f['id']), render(f))
+                     for f in self._flavors)
+        with self._lock:
+            self._views[key] = views
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return views
+
+
+class ReloadableFlavors(object):
+    '''Serves a FlavorCatalog that can be replaced while it is in use
+
+    Handlers keep a reference to this object for their whole life, while
+    the catalog it delegates to is replaced as a whole by replace().
+    '''
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def replace(self, catalog):
+        self.catalog = catalog
+
+    def __iter__(self):
+        return iter(self.catalog)
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __contains__(self, flavor_id):
+        return flavor_id in self.catalog
+
+    def get(self, flavor_id):
+        return self.catalog.get(flavor_id)
+
+    def filter(self, **kwargs):
+        return self.catalog.filter(**kwargs)
+
+    def get_views(self, key, render):
+        return self.catalog.get_views(key, render)
+
+
+class SoftLayerFlavors(ReloadableFlavors):
+    '''Flavors generated from the SoftLayer product catalog
+
+    The generated flavors are cached in a JSON file, so startup only has to
+    read that file. When the file is missing or older than ttl seconds, the
+    flavors are generated again in a background thread and the fallback
+    catalog is served until the first generation completes.
+    '''
+
+    def __init__(self, cache_file, ttl, make_client, fallback):
+        super(SoftLayerFlavors, self).__init__(fallback)
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.make_client = make_client
+        self.generated_at = 0
+        self._refreshing = threading.Lock()
+
+    def load(self):
+        '''Loads the cached flavors, generating them if they are stale'''
+        try:
+            with open(self.cache_file) as cache:
+                cached = json.load(cache)
+            self._set_flavors(cached['flavors'], cached['generated_at'])
+        except (IOError, OSError, ValueError, KeyError) as e:
+            LOG.info('No usable flavor cache in %s: %s', self.cache_file, e)
+        self._check()
+
+    def refresh(self):
+        '''Generates the flavors and updates the cache file'''
+        cci = SoftLayer.CCIManager(self.make_client())
+        flavors = generate_flavors(cci.get_create_options())
+        generated_at = time.time()
+
+        tmp_file = '%s.%s.tmp' % (self.cache_file, os.getpid())
+        with open(tmp_file, 'w') as cache:
+            json.dump({'generated_at': generated_at, 'flavors': flavors},
+                      cache)
+        os.rename(tmp_file, self.cache_file)
+        self._set_flavors(flavors, generated_at)
+
+    def _set_flavors(self, flavors, generated_at):
+        catalog = get_listing_flavors(
+            dict((int(key), format_flavor_extra_specs(dict(val)))
+                 for key, val in flavors.items()))
+        if not len(catalog):
+            raise ValueError('no valid flavors')
+        self.replace(catalog)
+        self.generated_at = generated_at
+
+    def _check(self):
+        if time.time() - self.generated_at <= self.ttl:
+            return
+        if not self._refreshing.acquire(False):
+            return
+        thread = threading.Thread(target=self._background_refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            LOG.exception('Unable to generate flavors from SoftLayer')
+            # Retry on a later lookup rather than immediately
+            self.generated_at = time.time() - self.ttl + 60
+        finally:
+            self._refreshing.release()
+
+    def __iter__(self):
+        self._check()
+        return super(SoftLayerFlavors, self).__iter__()
+
+    def __contains__(self, flavor_id):
+        self._check()
+        return super(SoftLayerFlavors, self).__contains__(flavor_id)
+
+    def get(self, flavor_id):
+        self._check()
+        return super(SoftLayerFlavors, self).get(flavor_id)
+
+    def filter(self, **kwargs):
+        self._check()
+        return super(SoftLayerFlavors, self).filter(**kwargs)
+
+
+def generate_flavors(create_options):
+    '''Builds flavors from SoftLayer_Virtual_Guest::getCreateObjectOptions
+
+    One flavor is generated for every combination of processor, memory,
+    first disk and port speed. Flavor ids are derived from the flavor
+    attributes, so a flavor keeps its id when the catalog is generated
+    again. The create options are not broken down per datacenter, so the
+    same flavors are generated for every datacenter.
+    '''
+    cpus = set()
+    for option in create_options.get('processors', []):
+        if utils.lookup(option, 'template', 'dedicatedAccountHostOnlyFlag'):
+            continue
+        cpus.add(utils.lookup(option, 'template', 'startCpus'))
+
+    memory = set(utils.lookup(option, 'template', 'maxMemory')
+                 for option in create_options.get('memory', []))
+
+    disks = set()
+    for option in create_options.get('blockDevices', []):
+        template = option.get('template', {})
+        for device in template.get('blockDevices', []):
+            if str(device.get('device')) == '0':
+                disks.add((utils.lookup(device, 'diskImage', 'capacity'),
+                           bool(template.get('localDiskFlag'))))
+
+    speeds = set()
+    for option in create_options.get('networkComponents', []):
+        for component in utils.lookup(option, 'template',
+                                      'networkComponents') or []:
+            speeds.add(component.get('maxSpeed'))
+
+    cpus.discard(None)
+    memory.discard(None)
+    speeds.discard(None)
+    disks = set(disk for disk in disks if disk[0] is not None)
+
+    flavors = {}
+    for cpu, ram, (disk, local), speed in itertools.product(
+            sorted(cpus), sorted(memory), sorted(disks),
+            sorted(speeds) or [None]):
+        disk_type = 'Local' if local else 'SAN'
+        flavor_id = '%d%02d%07d%05d%05d' % (2 if local else 1, cpu, ram,
+                                            disk, speed or 0)
+        if ram % 1024:
+            ram_name = '%dMB' % ram
+        else:
+            ram_name = '%dGB' % (ram // 1024)
+        name = '%d vCPU, %s ram, %dGB, %s' % (cpu, ram_name, disk, disk_type)
+        flavor = {'id': flavor_id, 'cpus': cpu, 'ram': ram, 'disk': disk,
+                  'disk-type': disk_type}
+        if speed is not None:
+            name += ', %dMbps' % speed
+            flavor['portspeed'] = speed
+        flavor['name'] = name
+        flavors[flavor_id] = flavor
+    return flavors
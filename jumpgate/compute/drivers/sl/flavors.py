@@ -1,6 +1,8 @@
 import logging
 
 from jumpgate.common import error_handling
+from jumpgate.common import utils
+from jumpgate.compute.drivers.sl import flavor_list_loader
 
 
 LOG = logging.getLogger(__name__)
@@ -20,9 +22,9 @@ class FlavorV2(object):
         if flavor_id not in self.flavors:
             return error_handling.not_found(resp, 'Flavor could not be found')
 
-        flavor = get_flavor_details(self.app, req, self.flavors[flavor_id],
-                                    detail=True)
-        resp.body = {'flavor': flavor}
+        views = get_flavor_views(self.app, req, self.flavors, detail=True)
+        flavor_id = flavor_list_loader.normalize_id(flavor_id)
+        resp.body = {'flavor': views[flavor_id]}
 
 
 class FlavorsV2(object):
@@ -37,7 +39,8 @@ class FlavorsV2(object):
         flavor_refs = filter_flavor_refs(req, resp, self.flavors)
         if flavor_refs is None:
             return
-        flavors = [get_flavor_details(self.app, req, flavor)
+        views = get_flavor_views(self.app, req, self.flavors)
+        flavors = [views[flavor_list_loader.normalize_id(flavor['id'])]
                    for flavor in flavor_refs]
         resp.body = {'flavors': flavors}
 
@@ -56,73 +59,74 @@ class FlavorsDetailV2(object):
         flavor_refs = filter_flavor_refs(req, resp, self.flavors)
         if flavor_refs is None:
             return
-        flavors = [get_flavor_details(self.app, req, flavor, detail=True)
+        views = get_flavor_views(self.app, req, self.flavors, detail=True)
+        flavors = [views[flavor_list_loader.normalize_id(flavor['id'])]
                    for flavor in flavor_refs]
         resp.body = {'flavors': flavors}
 
 
 def filter_flavor_refs(req, resp, flavor_refs):
-    if req.get_param('marker') is not None:
-        marker = req.get_param('marker')
-        flavor_refs = [f for f in flavor_refs if str(f['id']) > marker]
-
-    if req.get_param('minDisk') is not None:
+    params = {}
+    for name, param in (('marker', 'marker'), ('min_disk', 'minDisk'),
+                        ('min_ram', 'minRam'), ('limit', 'limit')):
+        value = req.get_param(param)
+        if value is None:
+            continue
         try:
-            min_disk = int(req.get_param('minDisk'))
-            flavor_refs = [f for f in flavor_refs
-                           if f['disk'] >= min_disk]
+            params[name] = int(value)
         except ValueError:
             error_handling.bad_request(resp,
-                                       message="Invalid minDisk parameter.")
+                                       message="Invalid %s parameter." % param)
             return
 
-    if req.get_param('minRam') is not None:
-        try:
-            min_ram = int(req.get_param('minRam'))
-            flavor_refs = [f for f in flavor_refs if f['ram'] >= min_ram]
-        except ValueError:
-            error_handling.bad_request(resp,
-                                       message="Invalid minRam parameter.")
-            return
+    return flavor_refs.filter(**params)
+
+
+def get_flavor_views(app, req, flavor_refs, detail=False):
+    """Returns the rendered flavors of a catalog by flavor id.
+
+    Flavor links only depend on the URL flavors are served at, so the
+    views are rendered once per URL and reused by later requests.
+    """
+    flavor_url = utils.url_builder(app, req, 'compute', 'v2_flavor',
+                                   'flavor_id')
+    return flavor_refs.get_views(
+        (flavor_url(''), detail),
+        lambda flavor: get_flavor_details(app, req, flavor, detail=detail,
+                                          flavor_url=flavor_url))
 
-    if req.get_param('limit') is not None:
-        try:
-            limit = int(req.get_param('limit'))
-            flavor_refs = flavor_refs[:limit]
-        except ValueError:
-            error_handling.bad_request(resp,
-                                       message="Invalid limit parameter.")
-            return
 
-    return flavor_refs
+def get_flavor_details(app, req, flavor_ref, detail=False, flavor_url=None):
+    """Formats a flavor.
 
+    :param flavor_url: utils.url_builder() of the flavor links, to share
+                       between the flavors of a list
+    """
+    if flavor_url is None:
+        flavor_url = utils.url_builder(app, req, 'compute', 'v2_flavor',
+                                       'flavor_id')
+    flavor_id = flavor_ref['id']
+    if not detail:
+        return {
+            'id': flavor_id,
+            'links': [{'href': flavor_url(flavor_id), 'rel': 'self'}],
+            'name': flavor_ref['name'],
+        }
 
-def get_flavor_details(app, req, flavor_ref, detail=False):
     flavor = {
-        'id': flavor_ref['id'],
-        'links': [
-            {
-                'href': app.get_endpoint_url('compute', req, 'v2_flavor',
-                                             flavor_id=flavor_ref['id']),
-                'rel': 'self',
-            }
-        ],
+        'id': flavor_id,
+        'links': [{'href': flavor_url(flavor_id), 'rel': 'self'}],
         'name': flavor_ref['name'],
-
+        'disk': flavor_ref['disk'],
+        'ram': flavor_ref['ram'],
+        'vcpus': flavor_ref['cpus'],
+        'OS-FLV-DISK-TYPE:disk_type': flavor_ref['disk-type'],
+        'swap': '',
+        'rxtx_factor': 1,
+        'os-flavor-access:is_public': True,
+        'OS-FLV-EXT-DATA:ephemeral': 0,
+        'OS-FLV-DISABLED:disabled': False,
     }
-    if detail:
-        flavor['disk'] = flavor_ref['disk']
-        flavor['ram'] = flavor_ref['ram']
-        flavor['vcpus'] = flavor_ref['cpus']
-        flavor['OS-FLV-DISK-TYPE:disk_type'] = flavor_ref['disk-type']
-        flavor['swap'] = ''
-        flavor['rxtx_factor'] = 1
-        flavor['os-flavor-access:is_public'] = True
-        flavor['OS-FLV-EXT-DATA:ephemeral'] = 0
-        flavor['OS-FLV-DISABLED:disabled'] = False
-        try:
-            flavor['portspeed'] = flavor_ref['portspeed']
-        except Exception:
-            pass
-
+    if 'portspeed' in flavor_ref:
+        flavor['portspeed'] = flavor_ref['portspeed']
     return flavor
@@ -5,6 +5,7 @@ import string
 import SoftLayer
 
 from jumpgate.common import error_handling
+from jumpgate.common.sl import inventory
 
 
 NULL_KEY = ("AAAAB3NzaC1yc2EAAAABIwAAAIEArkwv9X8eTVK4F7pMlSt45pWoiakFk"
@@ -15,9 +16,11 @@ NULL_KEY = ("AAAAB3NzaC1yc2EAAAABIwAAAIEArkwv9X8eTVK4F7pMlSt45pWoiakFk"
 
 class KeypairsV2(object):
     def on_get(self, req, resp, tenant_id):
-        client = req.env['sl_client']
-        mgr = SoftLayer.SshKeyManager(client)
-        keypairs = mgr.list_keys()
+        keypairs = inventory.list_resources(req, 'ssh_keys')
+        if keypairs is None:
+            client = req.env['sl_client']
+            mgr = SoftLayer.SshKeyManager(client)
+            keypairs = mgr.list_keys()
 
         resp.body = {
             'keypairs': [{
@@ -88,6 +91,10 @@ def format_keypair(keypair):
     }
 
 
+def load_ssh_keys(client):
+    return SoftLayer.SshKeyManager(client).list_keys()
+
+
 def generate_random_key():
     chars = string.digits + string.ascii_letters
     key = "".join([random.choice(chars) for _ in range(8)])
@@ -0,0 +1,189 @@
+import collections
+import datetime
+import json
+import threading
+import time
+
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import error_handling
+from jumpgate.common.sl import inventory
+from jumpgate.compute.drivers.sl import servers
+
+opts = [
+    cfg.IntOpt('server_events_interval', default=10,
+               help='Seconds between two polls of the server states of a '
+                    'tenant with event listeners'),
+    cfg.IntOpt('server_events_buffer', default=1000,
+               help='Number of server events kept per tenant'),
+    cfg.IntOpt('server_events_max_wait', default=60,
+               help='Maximum seconds a long-poll or event stream request '
+                    'is held open'),
+]
+
+cfg.CONF.register_opts(opts, group='compute')
+
+
+def get_server_state(instance):
+    status, power_state, task_state = servers.get_server_status(instance)
+    return {
+        'status': status,
+        'OS-EXT-STS:power_state': power_state,
+        'OS-EXT-STS:task_state': task_state,
+        'OS-EXT-STS:vm_state': instance['status']['keyName'],
+    }
+
+
+class ServerEventFeed(inventory.TenantWorker):
+    """Polls the server states of a tenant and records their transitions.
+
+    Every poll is compared with the previous one. Servers that appear,
+    disappear or change state produce an event with an increasing id.
+    The first poll only records the initial states.
+    """
+
+    def __init__(self, owner, client):
+        conf = cfg.CONF['compute']
+        # Listeners touch the feed while they wait, so it is idle once
+        # nobody has listened for longer than the longest allowed wait.
+        super(ServerEventFeed, self).__init__(
+            owner, client, conf['server_events_interval'],
+            conf['server_events_max_wait'] + conf['server_events_interval'])
+        self.events = collections.deque(maxlen=conf['server_events_buffer'])
+        self.last_id = 0
+        self.states = None
+        self._changed = threading.Condition()
+
+    def run_once(self):
+        cci = SoftLayer.CCIManager(self.client)
+        instances = cci.list_instances(
+            mask=servers.get_virtual_guest_status_mask())
+
+        states = dict((str(instance['id']), get_server_state(instance))
+                      for instance in instances)
+        if self.states is not None:
+            self.record(self.states, states)
+        self.states = states
+
+    def record(self, old_states, new_states):
+        timestamp = datetime.datetime.utcnow().isoformat()
+        events = []
+        for server_id, state in new_states.items():
+            previous = old_states.get(server_id)
+            if previous is None:
+                events.append(('created', server_id, state, None))
+            elif previous != state:
+                events.append(('changed', server_id, state, previous))
+        for server_id, previous in old_states.items():
+            if server_id not in new_states:
+                events.append(('deleted', server_id, {}, previous))
+
+        if not events:
+            return
+
+        with self._changed:
+            for event_type, server_id, state, previous in events:
+                self.last_id += 1
+                event = {'id': self.last_id,
+                         'event': event_type,
+                         'server_id': server_id,
+                         'timestamp': timestamp}
+                event.update(state)
+                if previous is not None:
+                    event['previous'] = previous
+                self.events.append(event)
+            self._changed.notify_all()
+
+    def wait(self, since, timeout):
+        """Returns the events after ``since``, waiting up to ``timeout``.
+
+        :returns: a tuple of the events, a flag telling whether events
+                  between ``since`` and the first returned event were
+                  dropped, and the event id to wait after next time
+        """
+        deadline = time.time() + timeout
+        with self._changed:
+            # The feed was restarted since the client last listened
+            lost = since > self.last_id
+            if lost:
+                since = self.last_id
+
+            while self.last_id <= since and not self.stopped.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+
+            events = [event for event in self.events if event['id'] > since]
+        truncated = lost or (bool(events) and events[0]['id'] > since + 1)
+        return events, truncated, events[-1]['id'] if events else since
+
+
+_feeds = inventory.TenantWorkers(ServerEventFeed)
+
+
+class ServerEventsV2(object):
+    """Feed of server state transitions of a tenant.
+
+    Clients long-poll with ``?since=<last event id>&timeout=<seconds>`` and
+    get the events that happened after ``since``. Clients accepting
+    ``text/event-stream`` get the events as server-sent events instead.
+    Without ``since``, only events that happen after the request are sent.
+    A single poller per tenant feeds every client, so SoftLayer is polled
+    at the same rate whatever the number of clients.
+    """
+
+    def on_get(self, req, resp, tenant_id):
+        owner = inventory.get_owner(req)
+        if owner is None:
+            return error_handling.unauthorized(
+                resp, 'Server events require an authenticated tenant')
+
+        max_wait = cfg.CONF['compute']['server_events_max_wait']
+        try:
+            since = req.get_param('since')
+            since = int(since) if since is not None else None
+            timeout = min(int(req.get_param('timeout') or max_wait),
+                          max_wait)
+        except ValueError:
+            return error_handling.bad_request(
+                resp, 'since and timeout must be integers')
+
+        feed = _feeds.get(owner, req.env['sl_client'])
+        if since is None:
+            since = feed.last_id
+
+        if req.client_accepts('text/event-stream') and not \
+                req.client_accepts('application/json'):
+            resp.content_type = 'text/event-stream'
+            resp.set_header('Cache-Control', 'no-cache')
+            resp.stream = self._stream(feed, req.env['sl_client'], since,
+                                       timeout)
+            return
+
+        events, truncated, since = feed.wait(since, timeout)
+        resp.status = 200
+        resp.body = {
+            'events': events,
+            'next': since,
+            'truncated': truncated,
+        }
+
+    def _stream(self, feed, client, since, timeout):
+        deadline = time.time() + timeout
+        yield 'retry: 1000\n\n'.encode('utf-8')
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            feed.touch(client)
+            events, truncated, since = feed.wait(since, min(remaining, 15))
+            if truncated:
+                yield 'event: truncated\ndata: {}\n\n'.encode('utf-8')
+            if not events:
+                yield ': keepalive\n\n'.encode('utf-8')
+            for event in events:
+                yield ('id: %s\nevent: %s\ndata: %s\n\n'
+                       % (event['id'], event['event'],
+                          json.dumps(event))).encode('utf-8')
@@ -1,15 +1,18 @@
 import SoftLayer
 
 from jumpgate.common import error_handling
+from jumpgate.common.sl import inventory
 
 
 class ServerIpsV2(object):
     def on_get(self, req, resp, tenant_id, server_id):
-        client = req.env['sl_client']
-        cci = SoftLayer.CCIManager(client)
-
-        instance = cci.get_instance(
-            server_id, mask='id, primaryIpAddress, primaryBackendIpAddress')
+        instance = inventory.get_resource(req, 'virtual_guests', server_id)
+        if instance is None:
+            client = req.env['sl_client']
+            cci = SoftLayer.CCIManager(client)
+            instance = cci.get_instance(
+                server_id,
+                mask='id, primaryIpAddress, primaryBackendIpAddress')
 
         addresses = {}
         if instance.get('primaryIpAddress'):
@@ -40,9 +43,12 @@ class ServerIpsNetworkV2(object):
             return error_handling.not_found(resp,
                                             message='Network does not exist')
 
-        client = req.env['sl_client']
-        cci = SoftLayer.CCIManager(client)
-        instance = cci.get_instance(server_id, mask='id, ' + network_mask)
+        instance = inventory.get_resource(req, 'virtual_guests', server_id)
+        if instance is None:
+            client = req.env['sl_client']
+            cci = SoftLayer.CCIManager(client)
+            instance = cci.get_instance(server_id,
+                                        mask='id, ' + network_mask)
 
         resp.body = {
             network_label: [
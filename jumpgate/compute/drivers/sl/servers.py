@@ -5,8 +5,11 @@ import re
 import SoftLayer
 
 
+from jumpgate.common import cache
 from jumpgate.common import config
 from jumpgate.common import error_handling
+from jumpgate.common import exceptions
+from jumpgate.common.sl import inventory
 from jumpgate.common import utils
 
 
@@ -49,6 +52,10 @@ class ServerActionV2(object):
 
         instance = cci.get_instance(instance_id)
 
+        # Actions change the state of the instance, so cached copies of it
+        # are dropped and ignored until the change has settled.
+        invalidate_server(req, instance_id)
+
         if 'pause' in body or 'suspend' in body:
             try:
                 vg_client.pause(id=instance_id)
@@ -124,14 +131,14 @@ class ServerActionV2(object):
             return
         elif 'resize' in body:
             flavor_id = int(body['resize'].get('flavorRef'))
-            for flavor in self.flavors:
-                if str(flavor_id) == flavor['id']:
-                    cci.upgrade(instance_id, cpus=flavor['cpus'],
-                                memory=flavor['ram'] / 1024)
-                    resp.status = 202
-                    return
-            return error_handling.bad_request(resp, message="Invalid flavor "
-                                              "id in the request body")
+            flavor = self.flavors.get(flavor_id)
+            if flavor is None:
+                return error_handling.bad_request(
+                    resp, message="Invalid flavor id in the request body")
+            cci.upgrade(instance_id, cpus=flavor['cpus'],
+                        memory=flavor['ram'] / 1024)
+            resp.status = 202
+            return
         elif 'confirmResize' in body:
             resp.status = 204
             return
@@ -153,23 +160,21 @@ class ServersV2(object):
 
         params = get_list_params(req)
 
-        sl_instances = cci.list_instances(**params)
+        sl_instances = inventory.list_resources(req, 'virtual_guests')
+        if sl_instances is not None:
+            sl_instances = filter_instances(sl_instances, req)
+        else:
+            sl_instances = cci.list_instances(**params)
         if not isinstance(sl_instances, list):
             sl_instances = [sl_instances]
 
-        results = []
-        for instance in sl_instances:
-            results.append({
-                'id': instance['id'],
-                'links': [
-                    {
-                        'href': self.app.get_endpoint_url(
-                            'compute', req, 'v2_server', server_id=id),
-                        'rel': 'self',
-                    }
-                ],
-                'name': instance['hostname'],
-            })
+        server_url = utils.url_builder(self.app, req, 'compute',
+                                       'v2_server', 'server_id')
+        results = [{'id': instance['id'],
+                    'links': [{'href': server_url(instance['id']),
+                               'rel': 'self'}],
+                    'name': instance['hostname']}
+                   for instance in sl_instances]
 
         resp.status = 200
         resp.body = {'servers': results}
@@ -197,6 +202,8 @@ class ServersV2(object):
             if networks:
                 self._handle_network(payload, client, networks)
             new_instance = cci.create_instance(**payload)
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.bad_request(resp, message=str(e))
 
@@ -224,21 +231,21 @@ class ServersV2(object):
 
     def _handle_flavor(self, payload, body):
         flavor_id = int(body['server'].get('flavorRef'))
-        for flavor in self.flavors:
-            if str(flavor_id) == flavor['id']:
-                payload['cpus'] = flavor['cpus']
-                payload['memory'] = flavor['ram']
-                payload['local_disk'] = (False if flavor['disk-type'] == 'SAN'
-                                         else True)
-                try:
-                    port_speed = flavor['portspeed']
-                    payload['nic_speed'] = port_speed
-                except Exception:
-                    # If port speed is not specified, it is left to SoftLayer
-                    # to provide the 'default' port speed
-                    pass
-                return
-        raise Exception('Flavor could not be found')
+        flavor = self.flavors.get(flavor_id)
+        if flavor is None:
+            raise Exception('Flavor could not be found')
+
+        payload['cpus'] = flavor['cpus']
+        payload['memory'] = flavor['ram']
+        payload['local_disk'] = (False if flavor['disk-type'] == 'SAN'
+                                 else True)
+        try:
+            port_speed = flavor['portspeed']
+            payload['nic_speed'] = port_speed
+        except Exception:
+            # If port speed is not specified, it is left to SoftLayer
+            # to provide the 'default' port speed
+            pass
 
     def _handle_sshkeys(self, payload, body, client):
         ssh_keys = []
@@ -395,6 +402,39 @@ def get_list_params(req):
     }
 
 
+def filter_instances(instances, req):
+    """Applies the filters of get_list_params() to mirrored instances."""
+    instances = sorted(instances, key=lambda i: i.get('createDate') or '')
+
+    if req.get_param('marker') is not None:
+        try:
+            marker = int(req.get_param('marker'))
+        except ValueError:
+            return []
+        instances = [i for i in instances if i['id'] > marker]
+
+    if req.get_param('ip') is not None:
+        instances = [i for i in instances
+                     if i.get('primaryIpAddress') == req.get_param('ip')]
+
+    name = req.get_param('name') or req.get_param('instance_name')
+    if name is not None:
+        instances = [i for i in instances if name in i.get('hostname', '')]
+
+    if req.get_param('limit') is not None:
+        try:
+            instances = instances[:int(req.get_param('limit'))]
+        except ValueError:
+            pass
+
+    return instances
+
+
+def load_virtual_guests(client):
+    cci = SoftLayer.CCIManager(client)
+    return cci.list_instances(mask=get_virtual_guest_mask())
+
+
 class ServersDetailV2(object):
     def __init__(self, app):
         self.app = app
@@ -405,14 +445,16 @@ class ServersDetailV2(object):
 
         params = get_list_params(req)
 
-        sl_instances = cci.list_instances(**params)
+        sl_instances = inventory.list_resources(req, 'virtual_guests')
+        if sl_instances is not None:
+            sl_instances = filter_instances(sl_instances, req)
+        else:
+            sl_instances = cci.list_instances(**params)
         if not isinstance(sl_instances, list):
             sl_instances = [sl_instances]
 
-        results = []
-        for instance in sl_instances:
-            results.append(
-                get_server_details_dict(self.app, req, instance, False))
+        results = [get_server_details_dict(self.app, req, instance, False)
+                   for instance in sl_instances]
 
         resp.status = 200
         resp.body = {'servers': results}
@@ -426,8 +468,27 @@ class ServerV2(object):
         client = req.env['sl_client']
         cci = SoftLayer.CCIManager(client)
 
-        instance = cci.get_instance(server_id,
-                                    mask=get_virtual_guest_mask())
+        owner = inventory.get_owner(req)
+        instance = None
+        if owner is not None:
+            instance = cache.RESOURCES.get(owner, 'virtual_guests', server_id)
+
+        if req.get_param('view') == 'status':
+            # Status-only view for clients polling builds and actions
+            if instance is None:
+                instance = cci.get_instance(
+                    server_id, mask=get_virtual_guest_status_mask())
+            resp.body = {
+                'server': get_server_status_dict(self.app, req, instance)}
+            return
+
+        if instance is None:
+            instance = cci.get_instance(server_id,
+                                        mask=get_virtual_guest_mask())
+            if owner is not None:
+                cache.RESOURCES.set(owner, 'virtual_guests', server_id,
+                                    instance,
+                                    config.CONF['compute']['server_cache_ttl'])
 
         results = get_server_details_dict(self.app, req, instance, True)
 
@@ -437,6 +498,7 @@ class ServerV2(object):
         client = req.env['sl_client']
         cci = SoftLayer.CCIManager(client)
 
+        invalidate_server(req, server_id)
         try:
             cci.cancel_instance(server_id)
         except SoftLayer.SoftLayerAPIError as e:
@@ -458,6 +520,7 @@ class ServerV2(object):
                 return error_handling.bad_request(
                     resp, message='Server name is blank')
 
+            invalidate_server(req, server_id)
             cci.edit(server_id, hostname=utils.lookup(body, 'server', 'name'))
 
         instance = cci.get_instance(server_id,
@@ -467,43 +530,115 @@ class ServerV2(object):
         resp.body = {'server': results}
 
 
+def invalidate_server(req, server_id):
+    """Drops the copies of a server cached for the tenant of a request."""
+    owner = inventory.get_owner(req)
+    if owner is not None:
+        cache.invalidate(owner, 'virtual_guests', server_id)
+
+
+class ServerLinks(object):
+    """Builds the links of the servers formatted for a request."""
+
+    ENV_KEY = 'jumpgate.server_links'
+
+    @classmethod
+    def for_request(cls, app, req):
+        """Returns the links of req, built once for all of its servers."""
+        links = req.env.get(cls.ENV_KEY)
+        if links is None:
+            links = req.env[cls.ENV_KEY] = cls(app, req)
+        return links
+
+    def __init__(self, app, req):
+        self.server = utils.url_builder(app, req, 'compute', 'v2_server',
+                                        'server_id')
+        self.flavor = utils.url_builder(app, req, 'compute', 'v2_flavor',
+                                        'flavor_id')
+        self.image = utils.url_builder(app, req, 'compute', 'v2_image',
+                                       'image_guid')
+
+
 def get_server_details_dict(app, req, instance, is_list):
+    links = ServerLinks.for_request(app, req)
+
+    flavor_id = 1
+    if is_list:
+        vs = req.env['sl_client']['Virtual_Guest']
+        for tag in vs.getTagReferences(id=instance['id']):
+            tag_string = tag['tag']['name']
+            if 'flavor_id' in tag_string:
+                # Try to parse the flavor id from the tag format
+                # i.e. 'flavor_id: 2'
+                match = re.search(r'\d+', tag_string)
+                if match:
+                    flavor_id = int(match.group())
+
+    status, power_state, task_state = get_server_status(instance)
+
+    addresses = {}
+    private_ip = instance.get('primaryBackendIpAddress')
+    if private_ip:
+        addresses['private'] = [
+            {'addr': private_ip, 'version': 4, 'OS-EXT-IPS:type': 'fixed'}]
+    public_ip = instance.get('primaryIpAddress')
+    if public_ip:
+        addresses['public'] = [
+            {'addr': public_ip, 'version': 4, 'OS-EXT-IPS:type': 'fixed'}]
+
+    order = utils.lookup(instance, 'billingItem', 'orderItem', 'order')
+    datacenter = instance.get('datacenter')
+    results = {
+        'id': str(instance['id']),
+        'accessIPv4': '',
+        'accessIPv6': '',
+        'addresses': addresses,
+        'created': instance['createDate'],
+        # TODO(nbeitenmiller) - Do I need to run this through isoformat()?
+        'flavor': {
+            'id': str(flavor_id),
+            'links': [{'href': links.flavor(flavor_id), 'rel': 'bookmark'}],
+        },
+        'hostId': instance['id'],
+        'links': [{'href': links.server(instance['id']), 'rel': 'self'}],
+        'name': instance['hostname'],
+        'OS-EXT-AZ:availability_zone': (datacenter.get('id')
+                                        if datacenter else None),
+        'OS-EXT-STS:power_state': power_state,
+        'OS-EXT-STS:task_state': task_state,
+        'OS-EXT-STS:vm_state': instance['status']['keyName'],
+        'security_groups': [{'name': 'default'}],
+        'status': status,
+        'tenant_id': instance['accountId'],
+        # NOTE(bodenr): userRecordId accessibility determined by permissions
+        # of API caller's user id and api key. Otherwise it will be None
+        'user_id': order.get('userRecordId') if order else None,
+        'updated': instance['modifyDate'],
+        # TODO(kmcdonald) - Don't hardcode this
+        'image_name': '',
+    }
+
+    # OpenStack only supports having one SSH Key assigned to an instance
+    if instance['sshKeys']:
+        results['key_name'] = instance['sshKeys'][0]['label']
 
     image_id = utils.lookup(instance,
                             'blockDeviceTemplateGroup',
                             'globalIdentifier')
-    tenant_id = instance['accountId']
+    if image_id:
+        results['image'] = {
+            'id': image_id,
+            'links': [{'href': links.image(image_id), 'rel': 'self'}],
+        }
 
-    client = req.env['sl_client']
-    vs = client['Virtual_Guest']
+    return results
 
-    flavor_url = None
-    flavor_id = 1
 
-    if is_list:
-        tags = vs.getTagReferences(id=instance['id'])
-        for tag in tags:
-            if 'flavor_id' in tag['tag']['name']:
-                try:
-                    # Try to parse the flavor id from the tag format
-                    # i.e. 'flavor_id: 2'
-                    tag_string = tag['tag']['name']
-
-                    flavor_id = int(re.search(r'\d+', tag_string).group())
-                    flavor_url = app.get_endpoint_url(
-                        'compute', req, 'v2_flavor', flavor_id=flavor_id)
-                except Exception:
-                    pass
-
-    # Workaround of hardcoded ID for VS's created before flavor-id
-    # pushed into tags
-    if not flavor_url:
-        flavor_url = app.get_endpoint_url(
-            'compute', req, 'v2_flavor', flavor_id=1)
-
-    server_url = app.get_endpoint_url(
-        'compute', req, 'v2_server', server_id=instance['id'])
+def get_server_status(instance):
+    """Maps the state of a SoftLayer instance to OpenStack.
 
+    :returns: a (status, power state, task state) tuple
+    """
     task_state = None
     transaction = utils.lookup(instance,
                                'activeTransaction',
@@ -540,85 +675,37 @@ def get_server_details_dict(app, req, instance, is_list):
         status = 'SHUTOFF'
         power_state = OPENSTACK_POWER_MAP['BLOCKED']
 
-    addresses = {}
-    if instance.get('primaryBackendIpAddress'):
-        addresses['private'] = [{
-            'addr': instance.get('primaryBackendIpAddress'),
-            'version': 4,
-            'OS-EXT-IPS:type': 'fixed',
-        }]
-
-    if instance.get('primaryIpAddress'):
-        addresses['public'] = [{
-            'addr': instance.get('primaryIpAddress'),
-            'version': 4,
-            'OS-EXT-IPS:type': 'fixed',
-        }]
-
-    # TODO(kmcdonald) - Don't hardcode this
-    image_name = ''
+    return status, power_state, task_state
 
-    results = {
+
+def get_server_status_dict(app, req, instance):
+    status, power_state, task_state = get_server_status(instance)
+    return {
         'id': str(instance['id']),
-        'accessIPv4': '',
-        'accessIPv6': '',
-        'addresses': addresses,
-        'created': instance['createDate'],
-        # TODO(nbeitenmiller) - Do I need to run this through isoformat()?
-        'flavor': {
-            'id': str(flavor_id),
-            'links': [
-                {
-                    'href': flavor_url,
-                    'rel': 'bookmark',
-                },
-            ],
-        },
-        'hostId': instance['id'],
         'links': [
             {
-                'href': server_url,
+                'href': app.get_endpoint_url('compute', req, 'v2_server',
+                                             server_id=instance['id']),
                 'rel': 'self',
             }
         ],
-        'name': instance['hostname'],
-        'OS-EXT-AZ:availability_zone': utils.lookup(instance,
-                                                    'datacenter',
-                                                    'id'),
         'OS-EXT-STS:power_state': power_state,
         'OS-EXT-STS:task_state': task_state,
         'OS-EXT-STS:vm_state': instance['status']['keyName'],
-        'security_groups': [{'name': 'default'}],
         'status': status,
-        'tenant_id': tenant_id,
-        # NOTE(bodenr): userRecordId accessibility determined by permissions
-        # of API caller's user id and api key. Otherwise it will be None
-        'user_id': utils.lookup(instance,
-                                'billingItem',
-                                'orderItem',
-                                'order',
-                                'userRecordId'),
-        'updated': instance['modifyDate'],
-        'image_name': image_name,
     }
 
-    # OpenStack only supports having one SSH Key assigned to an instance
-    if instance['sshKeys']:
-        results['key_name'] = instance['sshKeys'][0]['label']
 
-    if image_id:
-        results['image'] = {
-            'id': image_id,
-            'links': [
-                {
-                    'href': app.get_endpoint_url(
-                        'compute', req, 'v2_image', image_id=image_id),
-                    'rel': 'self',
-                },
-            ],
-        }
+def get_virtual_guest_status_mask():
+    mask = [
+        'id',
+        'powerState',
+        'status',
+        'activeTransaction[transactionStatus]',
+        'provisionDate',
+    ]
 
-    return results
+    return 'mask[%s]' % ','.join(mask)
 
 
 def get_virtual_guest_mask():
@@ -2,6 +2,7 @@ import datetime
 
 import SoftLayer
 
+from jumpgate.common.sl import inventory
 from jumpgate.compute.drivers.sl import servers
 
 
@@ -25,7 +26,11 @@ class UsageV2(object):
             'mask': servers.get_virtual_guest_mask(),
         }
 
-        for instance in cci.list_instances(**params):
+        instances = inventory.list_resources(req, 'virtual_guests')
+        if instances is None:
+            instances = cci.list_instances(**params)
+
+        for instance in instances:
             server_dict = {
                 'ended_at': None,
                 'flavor': 'custom',
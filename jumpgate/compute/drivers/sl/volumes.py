@@ -4,6 +4,7 @@ import uuid
 import six
 
 from jumpgate.common import error_handling
+from jumpgate.common import exceptions
 
 HTTP = six.moves.http_client  # pylint: disable=E1101
 
@@ -39,6 +40,8 @@ class OSVolumeAttachmentsV2(object):
                     for vol in blkDevices
                     if vol['diskImage']['type']['keyName'] != 'SWAP']
             resp.body = {"volumeAttachments": vols}
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             error_handling.volume_fault(resp, e.faultString)
 
@@ -88,6 +91,8 @@ class OSVolumeAttachmentsV2(object):
                             'The requested disk image is already attached to '
                             'another guest.',
                             code=HTTP.BAD_REQUEST)
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp,
                                                e.faultString,
@@ -117,6 +122,8 @@ class OSVolumeAttachmentsV2(object):
                     'Action causes migration to a new host. Migration is not '
                     'allowed.',
                     code=HTTP.BAD_REQUEST)
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             error_handling.volume_fault(resp, e.faultString)
 
@@ -167,6 +174,8 @@ class OSVolumeAttachmentV2(object):
             else:
                 return error_handling.volume_fault(resp, 'Invalid volume id.',
                                                    code=HTTP.BAD_REQUEST)
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp, e.faultString)
 
@@ -199,6 +208,8 @@ class OSVolumeAttachmentV2(object):
                             vg_client.detachDiskImage(volume_id,
                                                       id=instance_id)
                             break
+                        except exceptions.ResponseException:
+                            raise
                         except Exception as e:
                             error_handling.volume_fault(resp,
                                                         e.faultString)
@@ -209,6 +220,8 @@ class OSVolumeAttachmentV2(object):
                             'guest and cannot be detached.',
                             code=HTTP.BAD_REQUEST)
 
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp, e.faultString,
                                                code=500)
@@ -1,8 +1,11 @@
 import base64
 import json
 import logging
+import struct
 import time
 
+import six
+
 from jumpgate.common import aes
 from jumpgate.common import exceptions
 from jumpgate.common import utils
@@ -11,6 +14,14 @@ from jumpgate import config
 DEFAULT_TOKEN_DURATION = 60 * 60 * 24
 LOG = logging.getLogger(__name__)
 
+# Versions of the CompactTokenIdDriver token IDs
+TOKEN_FIELDS_VERSION = b'\x01'
+TOKEN_JSON_VERSION = b'\x02'
+# Fields of the tokens created by the token drivers and the SL auth helpers,
+# in their order in a TOKEN_FIELDS_VERSION token
+TOKEN_FIELDS = ('user_id', 'username', 'api_key', 'auth_type', 'tenant_id',
+                'userId', 'tokenHash')
+
 
 def auth_driver():
     return utils.load_driver(config.CONF['identity']['auth_driver'])
@@ -157,6 +168,16 @@ class TokenIdDriver(object):
         """
         raise NotImplementedError()
 
+    def revoke_token_id(self, token_id):
+        """Revoke a token ID so that it is no longer accepted.
+
+        Returns whether the token ID was revoked. Token IDs holding the
+        token itself can't be revoked, by default this returns False.
+
+        :param token_id: The token ID to revoke.
+        """
+        return False
+
 
 class AuthDriver(object):
     """Encapsulates logic to authenticate an identity request
@@ -263,10 +284,114 @@ class AESTokenIdDriver(TokenIdDriver):
         super(AESTokenIdDriver, self).__init__()
 
     def create_token_id(self, token):
-        return base64.b64encode(aes.encode_aes(json.dumps(token)))
+        return base64.b64encode(
+            aes.encode_aes(json.dumps(token))).decode('ascii')
 
     def token_from_id(self, token_id):
         try:
             return json.loads(aes.decode_aes(base64.b64decode(token_id)))
         except (TypeError, ValueError):
             raise exceptions.InvalidTokenError('Malformed token')
+
+
+_HEADER = struct.Struct('!dB')
+_TEXT = struct.Struct('!BH')
+_INTEGER = struct.Struct('!Bq')
+
+
+def _is_integer(value):
+    return (isinstance(value, six.integer_types) and
+            not isinstance(value, bool))
+
+
+def _pack_token(token):
+    """Returns (version, data) of a token.
+
+    Tokens holding only an expires number and TOKEN_FIELDS of text or integer
+    values are packed as binary fields, other tokens as JSON.
+    """
+    expires = token.get('expires')
+    if isinstance(expires, float) or _is_integer(expires):
+        mask = 0
+        fields = []
+        for bit, name in enumerate(TOKEN_FIELDS):
+            if name not in token:
+                continue
+            value = token[name]
+            if isinstance(value, six.string_types):
+                value = value.encode('utf-8')
+                fields.append(_TEXT.pack(0, len(value)) + value)
+            elif _is_integer(value):
+                fields.append(_INTEGER.pack(1, value))
+            else:
+                break
+            mask |= 1 << bit
+        else:
+            if len(fields) + 1 == len(token):
+                return (TOKEN_FIELDS_VERSION,
+                        _HEADER.pack(expires, mask) + b''.join(fields))
+
+    return TOKEN_JSON_VERSION, json.dumps(
+        token, separators=(',', ':')).encode('utf-8')
+
+
+def _unpack_token(version, data):
+    if version == TOKEN_JSON_VERSION:
+        return json.loads(data.decode('utf-8'))
+
+    expires, mask = _HEADER.unpack_from(data)
+    token = {'expires': expires}
+    offset = _HEADER.size
+    for bit, name in enumerate(TOKEN_FIELDS):
+        if not mask & (1 << bit):
+            continue
+        kind, size = _TEXT.unpack_from(data, offset)
+        if kind == 0:
+            offset += _TEXT.size + size
+            token[name] = data[offset - size:offset].decode('utf-8')
+        else:
+            token[name] = _INTEGER.unpack_from(data, offset)[1]
+            offset += _INTEGER.size
+    return token
+
+
+class CompactTokenIdDriver(TokenIdDriver):
+    """Token ID driver issuing short token IDs.
+
+    A token ID is a version byte followed by the token encrypted with AES-CTR
+    and authenticated with HMAC-SHA256, in URL-safe base64 without padding.
+    The usual token fields are packed in binary, other tokens as JSON. The
+    token IDs of AESTokenIdDriver are accepted while the
+    identity.accept_legacy_token_ids option is set.
+    """
+
+    def __init__(self):
+        super(CompactTokenIdDriver, self).__init__()
+        self.legacy = AESTokenIdDriver()
+
+    def create_token_id(self, token):
+        version, data = _pack_token(token)
+        token_id = base64.urlsafe_b64encode(
+            aes.encrypt_then_mac(data, header=version))
+        return token_id.decode('ascii').rstrip('=')
+
+    def token_from_id(self, token_id):
+        try:
+            if isinstance(token_id, six.text_type):
+                token_id = token_id.encode('ascii')
+            message = base64.urlsafe_b64decode(
+                token_id + b'=' * (-len(token_id) % 4))
+        except (TypeError, ValueError):
+            raise exceptions.InvalidTokenError('Malformed token')
+
+        version = message[:1]
+        if version not in (TOKEN_FIELDS_VERSION, TOKEN_JSON_VERSION):
+            if config.CONF['identity']['accept_legacy_token_ids']:
+                return self.legacy.token_from_id(token_id)
+            raise exceptions.InvalidTokenError('Malformed token')
+
+        try:
+            return _unpack_token(version,
+                                 aes.verify_then_decrypt(message, 1))
+        except (struct.error, IndexError, ValueError):
+            raise exceptions.InvalidTokenError('Malformed token')
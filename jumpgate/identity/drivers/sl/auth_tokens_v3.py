@@ -1,13 +1,12 @@
-import base64
 import datetime
 import json
 import logging
 
 from oslo.config import cfg
-import SoftLayer
 
-from jumpgate.common import aes
 from jumpgate.common.sl import auth
+from jumpgate.common.sl import client as sl_client
+from jumpgate.identity.drivers import core as identity
 
 LOG = logging.getLogger(__name__)
 
@@ -78,9 +77,9 @@ def get_access_v3(token_id, token_details, user):
 
 class AuthTokensV3(object):
     def __init__(self, template_file):
-        self._load_templates(template_file)
+        self.reload_templates(template_file)
 
-    def _load_templates(self, template_file):
+    def reload_templates(self, template_file):
         try:
             self.templates = parse_templates(open(template_file))
         except IOError:
@@ -132,7 +131,7 @@ class AuthTokensV3(object):
         body = req.stream.read().decode()
         credentials = json.loads(body)
         token_details, user = auth.get_new_token_v3(credentials)
-        token_id = base64.b64encode(aes.encode_aes(json.dumps(token_details)))
+        token_id = identity.token_id_driver().create_token_id(token_details)
 
         access = get_access_v3(token_id, token_details, user)
         # Add catalog to the access data
@@ -151,8 +150,9 @@ class TokenV2(object):
         token_details = auth.get_token_details(
             token_id, tenant_id=req.get_param('belongsTo'))
         endpoint = cfg.CONF['softlayer']['endpoint']
-        client = SoftLayer.Client(endpoint_url=endpoint)
+        client = sl_client.Client(endpoint_url=endpoint)
         client.auth = auth.get_auth(token_details)
+        client.set_deadline(req.env.get('jumpgate.deadline'))
 
         user = client['Account'].getCurrentUser(mask='id, username')
         access = get_access(token_id, token_details, user)
@@ -162,8 +162,9 @@ class TokenV2(object):
 
     def on_delete(self, req, resp, token_id):
         # This method is called when OpenStack wants to remove a token's
-        # validity, such as when a cookie expires. Our login tokens can't
-        # be forced to expire yet, so this does nothing.
-        LOG.warning('User attempted to delete token: %s', token_id)
+        # validity, such as when a cookie expires. Only the token ID drivers
+        # keeping the tokens, like StoredTokenIdDriver, can revoke them.
+        if not identity.token_id_driver().revoke_token_id(token_id):
+            LOG.warning('Unable to revoke token: %s', token_id)
         resp.status = 202
         resp.body = ''
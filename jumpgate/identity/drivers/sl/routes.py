@@ -0,0 +1,57 @@
+import os.path
+
+from jumpgate.common import reloader
+from jumpgate.common import sl as sl_common
+from jumpgate.identity.drivers.sl import auth_tokens_v3
+from jumpgate.identity.drivers.sl import services_v3
+from jumpgate.identity.drivers.sl import tenants
+from jumpgate.identity.drivers.sl import tokens
+from jumpgate.identity.drivers.sl import user
+from jumpgate.identity.drivers.sl import user_projects_v3
+from jumpgate.identity.drivers.sl import v3
+from jumpgate.identity.drivers.sl import versions
+
+
+def setup_routes(app, disp):
+    # V3 Routes
+    disp.set_handler('v3_auth_index', v3.V3(disp))
+    disp.set_handler('v3_user_projects', user_projects_v3.UserProjectsV3())
+
+    # V2 Routes
+    disp.set_handler('v2_tenants', tenants.TenantsV2())
+    disp.set_handler('v2_token', tokens.TokenV2())
+    disp.set_handler('v2_user', user.UserV2())
+
+    disp.set_handler('versions', versions.Versions(disp))
+
+    template_file = app.config.softlayer.catalog_template_file
+    if not os.path.exists(template_file):
+        template_file = app.config.find_file(template_file)
+
+    if template_file is None:
+        raise ValueError('Template file not found')
+
+    template_file_v3 = app.config.softlayer.catalog_template_file_v3
+    if not os.path.exists(template_file_v3):
+        template_file_v3 = app.config.find_file(template_file_v3)
+
+    if template_file_v3 is None:
+        raise ValueError('Template file v3 not found')
+
+    # Catalog templates are reloaded when their file changes
+    handlers = [
+        ('v2_tokens', tokens.TokensV2(template_file), template_file),
+        ('v2_token_endpoints', tokens.TokensV2(template_file),
+         template_file),
+        # V3 auth token route
+        ('v3_auth_tokens', auth_tokens_v3.AuthTokensV3(template_file_v3),
+         template_file_v3),
+        # V3 service
+        ('v3_services', services_v3.ServicesV3(template_file_v3),
+         template_file_v3),
+    ]
+    for nickname, handler, path in handlers:
+        disp.set_handler(nickname, handler)
+        reloader.watch(path, handler.reload_templates)
+
+    sl_common.add_hooks(app)
@@ -29,9 +29,9 @@ def parse_templates(template_lines):
 
 class ServicesV3(object):
     def __init__(self, template_file):
-        self._load_templates(template_file)
+        self.reload_templates(template_file)
 
-    def _load_templates(self, template_file):
+    def reload_templates(self, template_file):
         try:
             self.templates = parse_templates(open(template_file))
         except IOError:
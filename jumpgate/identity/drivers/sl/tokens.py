@@ -141,9 +141,9 @@ class SLAuthDriver(identity.AuthDriver):
 
 class TokensV2(object):
     def __init__(self, template_file):
-        self._load_templates(template_file)
+        self.reload_templates(template_file)
 
-    def _load_templates(self, template_file):
+    def reload_templates(self, template_file):
         try:
             self.templates = parse_templates(open(template_file))
         except IOError:
@@ -233,8 +233,9 @@ class TokenV2(object):
 
     def on_delete(self, req, resp, token_id):
         # This method is called when OpenStack wants to remove a token's
-        # validity, such as when a cookie expires. Our login tokens can't
-        # be forced to expire yet, so this does nothing.
-        LOG.warning('User attempted to delete token: %s', token_id)
+        # validity, such as when a cookie expires. Only the token ID drivers
+        # keeping the tokens, like StoredTokenIdDriver, can revoke them.
+        if not identity.token_id_driver().revoke_token_id(token_id):
+            LOG.warning('Unable to revoke token: %s', token_id)
         resp.status = 202
         resp.body = ''
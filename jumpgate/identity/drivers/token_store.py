@@ -0,0 +1,138 @@
+"""Token IDs standing for tokens kept in a local SQLite database.
+
+StoredTokenIdDriver hands out short random token IDs and stores the tokens
+they stand for, so that looking a token up is a single primary key lookup
+and revoking it deletes its row. The database is a file under state_path
+by default, shared by the workers of a host and kept across restarts.
+
+Rows are keyed by a hash of the token ID and hold the token encrypted with
+the secret key: the database gives away neither usable token IDs nor
+credentials. Expired tokens are deleted every sweep_interval seconds.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from oslo.config import cfg
+import six
+
+from jumpgate.common import aes
+from jumpgate.common import exceptions
+from jumpgate.identity.drivers import core
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.StrOpt('db_path', default='$state_path/tokens.db',
+               help="SQLite database of the tokens. ':memory:' keeps the "
+                    "tokens of each worker in memory, for tests"),
+    cfg.IntOpt('sweep_interval', default=300,
+               help='Seconds between two deletions of the expired tokens'),
+]
+
+cfg.CONF.register_opts(opts, group='token_store')
+
+# Random bytes of a token ID, 22 characters once encoded
+TOKEN_ID_SIZE = 16
+
+
+class TokenStore(object):
+    """SQLite storage of tokens keyed by the hash of their ID."""
+
+    def __init__(self, path, sweep_interval):
+        self.sweep_interval = sweep_interval
+        self._swept_at = time.time()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if path != ':memory:' and directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Lets the workers sharing the file read while one of them writes,
+        # a token issued right before a power loss may be lost
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS tokens ('
+                'token_key TEXT PRIMARY KEY, '
+                'expires REAL NOT NULL, '
+                'data BLOB NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS tokens_by_expires '
+                'ON tokens (expires)')
+
+    def add(self, token_key, expires, data):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT INTO tokens VALUES (?, ?, ?)',
+                               (token_key, expires, sqlite3.Binary(data)))
+        if time.time() - self._swept_at >= self.sweep_interval:
+            self.sweep()
+
+    def get(self, token_key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM tokens WHERE token_key = ?',
+                (token_key,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def delete(self, token_key):
+        """Deletes a token, returns whether it was stored."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'DELETE FROM tokens WHERE token_key = ?', (token_key,))
+        return cursor.rowcount > 0
+
+    def sweep(self):
+        """Deletes the expired tokens, returns how many were deleted."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'DELETE FROM tokens WHERE expires < ?', (now,))
+            self._swept_at = now
+        LOG.debug("Deleted %d expired tokens", cursor.rowcount)
+        return cursor.rowcount
+
+
+def _token_key(token_id):
+    if isinstance(token_id, six.text_type):
+        token_id = token_id.encode('utf-8')
+    return hashlib.sha256(token_id).hexdigest()
+
+
+class StoredTokenIdDriver(core.TokenIdDriver):
+    """Token ID driver storing the tokens in the [token_store] database.
+
+    Token IDs are random, 22 characters long and can be revoked.
+    """
+
+    def __init__(self):
+        super(StoredTokenIdDriver, self).__init__()
+        conf = cfg.CONF['token_store']
+        self.store = TokenStore(conf['db_path'], conf['sweep_interval'])
+
+    def create_token_id(self, token):
+        token_id = base64.urlsafe_b64encode(
+            os.urandom(TOKEN_ID_SIZE)).decode('ascii').rstrip('=')
+        expires = token.get('expires',
+                            time.time() + core.DEFAULT_TOKEN_DURATION)
+        self.store.add(_token_key(token_id), expires,
+                       aes.encrypt_then_mac(json.dumps(token).encode('utf-8')))
+        return token_id
+
+    def token_from_id(self, token_id):
+        data = self.store.get(_token_key(token_id))
+        if data is None:
+            raise exceptions.InvalidTokenError('Invalid token')
+        try:
+            return json.loads(aes.verify_then_decrypt(data).decode('utf-8'))
+        except ValueError:
+            # Stored before a change of the secret key
+            raise exceptions.InvalidTokenError('Invalid token')
+
+    def revoke_token_id(self, token_id):
+        return self.store.delete(_token_key(token_id))
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+
+from oslo.config import cfg
+
+LOG = logging.getLogger(__name__)
+
+opts = [
+    cfg.IntOpt('public_image_refresh_interval', default=300,
+               help='Seconds after which the shared public image catalog '
+                    'is refreshed in the background. 0 disables caching.'),
+    cfg.IntOpt('public_image_max_age', default=3600,
+               help='Seconds after which a stale public image catalog is '
+                    'no longer served and is refreshed before responding.'),
+]
+
+cfg.CONF.register_opts(opts, group='image')
+
+
+class ImageCatalog(object):
+    """Process-wide cache of an image listing shared by every tenant.
+
+    Entries are produced by ``loader(client)`` and served until they are
+    older than ``public_image_refresh_interval``. After that the stale
+    entries are still served while a single background thread reloads
+    them, until ``public_image_max_age`` is reached and the reload happens
+    inline. The loader needs SoftLayer credentials, so refreshes borrow
+    the client of the request that noticed the catalog was stale.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._entries = None
+        self._loaded_at = 0
+        self._refreshing = False
+
+    def clear(self):
+        with self._lock:
+            self._entries = None
+            self._loaded_at = 0
+
+    def get_entries(self, client):
+        interval = cfg.CONF['image']['public_image_refresh_interval']
+        if interval <= 0:
+            return self.loader(client)
+
+        max_age = max(cfg.CONF['image']['public_image_max_age'], interval)
+        entries, age = self._entries, time.time() - self._loaded_at
+        if entries is None or age >= max_age:
+            return self.refresh(client)
+
+        if age >= interval:
+            self._start_refresh(client)
+
+        return entries
+
+    def refresh(self, client):
+        entries = self.loader(client)
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.time()
+        return entries
+
+    def _start_refresh(self, client):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._background_refresh,
+                                  args=(client,))
+        thread.daemon = True
+        thread.start()
+
+    def _background_refresh(self, client):
+        try:
+            self.refresh(client)
+        except Exception:
+            LOG.exception('Unable to refresh the image catalog, '
+                          'continuing to serve stale entries')
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -1,10 +1,26 @@
+import base64
+import bisect
+import heapq
+import itertools
 import json
 import uuid
 
+from oslo.config import cfg
+import six
+from six.moves.urllib import parse  # pylint: disable=E0611
 from SoftLayer import utils as sl_utils
 
 from jumpgate.common import error_handling
 from jumpgate.common import utils
+from jumpgate.image.drivers.sl import catalog
+
+opts = [
+    cfg.IntOpt('image_list_limit', default=1000,
+               help='Default and maximum number of images returned by a '
+                    'single image listing. 0 returns every image.'),
+]
+
+cfg.CONF.register_opts(opts, group='image')
 
 
 class SchemaImageV2(object):
@@ -386,42 +402,63 @@ class ImagesV2(object):
         tenant_id = tenant_id or utils.lookup(req.env, 'auth', 'tenant_id')
 
         image_obj = SLImages(client)
+        public_images = PUBLIC_IMAGES.get_entries(client)
 
-        output = []
-        limit = None
+        limit = cfg.CONF['image']['image_list_limit'] or None
         if req.get_param('limit'):
-            limit = int(req.get_param('limit'))
-
-        marker = req.get_param('marker')
-        for visibility, funct in [('public', image_obj.get_public_images),
-                                  ('private', image_obj.get_private_images)]:
-
-            if limit == 0:
-                break
-            results = funct(name=req.get_param('name'),
-                            limit=limit,
-                            marker=marker)
-
-            if not results:
-                continue
-
-            if not isinstance(results, list):
-                results = [results]
-
-            for image in results:
-                formatted_image = get_v2_image_details_dict(self.app,
-                                                            req,
-                                                            image,
-                                                            tenant_id)
+            try:
+                requested = int(req.get_param('limit'))
+            except ValueError:
+                requested = -1
+            if requested < 0:
+                return error_handling.bad_request(resp, 'Invalid limit')
+            if limit is None or requested < limit:
+                limit = requested
+
+        name = req.get_param('name')
+        position = None
+        if req.get_param('marker'):
+            position = _decode_marker(image_obj, public_images,
+                                      req.get_param('marker'))
+            if position is None:
+                return error_handling.bad_request(resp, 'Invalid marker')
+
+        if limit is None:
+            images = _merge_images(public_images, image_obj, name, position,
+                                   chunk_size=100)
+            page = list(images)
+        else:
+            # One extra image tells whether there is a next page
+            images = _merge_images(public_images, image_obj, name, position,
+                                   chunk_size=limit + 1)
+            page = list(itertools.islice(images, limit + 1))
 
+        output = []
+        for key, visibility, image, extra in page[:limit]:
+            if visibility == 'public':
+                output.append(add_v2_image_links(self.app, req, image,
+                                                 extra, tenant_id))
+            else:
+                formatted_image = get_v2_image_details_dict(
+                    self.app, req, image, tenant_id)
                 if formatted_image:
                     formatted_image['visibility'] = visibility
                     output.append(formatted_image)
-                    if limit is not None:
-                        limit -= 1
+
         resp.status = 200
-        resp.body = {'images': sorted(output,
-                                      key=lambda x: x['name'].lower())}
+        resp.body = {'images': output}
+
+        if limit and len(page) > limit:
+            private_offset = position[1] if position else 0
+            for key, visibility, image, offset in page[:limit]:
+                if visibility == 'private':
+                    private_offset = offset
+
+            href = _images_url(req, name, limit,
+                               _encode_marker(key, private_offset))
+            # Glance returns a 'next' link, nova an 'images_links' list
+            resp.body['next'] = href
+            resp.body['images_links'] = [{'rel': 'next', 'href': href}]
 
 
 class ImageV1(object):
@@ -518,19 +555,64 @@ class ImagesV1(ImagesV2):
         }}
 
 
+class ImageLinks(object):
+    """Builds the links of the images formatted for a request."""
+
+    ENV_KEY = 'jumpgate.image_links'
+
+    @classmethod
+    def for_request(cls, app, req):
+        """Returns the links of req, built once for all of its images."""
+        links = req.env.get(cls.ENV_KEY)
+        if links is None:
+            links = req.env[cls.ENV_KEY] = cls(app, req)
+        return links
+
+    def __init__(self, app, req):
+        self.app = app
+        self.req = req
+        self.v1_image = utils.url_builder(app, req, 'image', 'v1_image',
+                                          'image_guid')
+        self.v2_image = utils.url_builder(app, req, 'image', 'v2_image',
+                                          'image_guid')
+        self.v2_image_file = utils.url_builder(app, req, 'image',
+                                               'v2_image_file', 'image_guid')
+        self._v2_schema = None
+
+    @property
+    def v2_schema(self):
+        if self._v2_schema is None:
+            self._v2_schema = self.app.get_endpoint_url('image', self.req,
+                                                        'v2_schema_image')
+        return self._v2_schema
+
+
 def get_v2_image_details_dict(app, req, image, tenant_id):
+    results = format_v2_image(image)
+    if not results:
+        return results
+
+    return add_v2_image_links(app, req, results, image['id'], tenant_id)
 
+
+def format_v2_image(image):
+    """Formats the request independent part of a v2 image.
+
+    The result has no owner or links, which makes it safe to share between
+    requests and tenants. See add_v2_image_links().
+    """
     if not image or not image.get('globalIdentifier'):
         return {}
 
+    visibility = image.get('visibility', 'public')
+    created = image.get('createDate')
     # TODO() - Don't hardcode some of these values
-    results = {
+    return {
         'id': image['globalIdentifier'],
         'name': image['name'],
         'status': 'active',
-        'visibility': image.get('visibility', 'public'),
-        'is_public': image.get('visibility', 'public') == 'public',
-        'owner': tenant_id,
+        'visibility': visibility,
+        'is_public': visibility == 'public',
         'size': int(image.get('blockDevicesDiskSpaceTotal', 0)),
         'disk_format': 'raw',
         'container_format': 'bare',
@@ -540,32 +622,186 @@ def get_v2_image_details_dict(app, req, image, tenant_id):
         'progress': 100,
         'metadata': {},
         # "checksum":"2cec138d7dae2aa59038ef8c9aec2390",
-        'updated': image.get('createDate'),
-        'created': image.get('createDate'),
-        'links': [
-            {'href': app.get_endpoint_url('image', req, 'v2_image',
-                                          image_guid=image['id']),
-             'rel': 'self'},
-            {'href': app.get_endpoint_url('image', req, 'v2_image_file',
-                                          image_guid=image['id']),
-             'rel': 'file'},
-            {'href': app.get_endpoint_url('image', req, 'v2_schema_image'),
-             'rel': 'schema'},
-            ]
+        'updated': created,
+        'created': created,
     }
 
+
+def add_v2_image_links(app, req, formatted_image, image_id, tenant_id):
+    """Returns a copy of a formatted v2 image with its owner and links."""
+    links = ImageLinks.for_request(app, req)
+    results = dict(formatted_image,
+                   owner=tenant_id,
+                   links=[{'href': links.v2_image(image_id), 'rel': 'self'},
+                          {'href': links.v2_image_file(image_id),
+                           'rel': 'file'},
+                          {'href': links.v2_schema, 'rel': 'schema'}])
     return results
 
 
+def load_public_images(client):
+    """Loads the formatted public images for the shared image catalog.
+
+    :returns: a tuple of sorted image keys (see _image_sort_key) and the
+              matching list of (formatted image, SoftLayer image id)
+    """
+    images = SLImages(client).get_public_images()
+    if images and not isinstance(images, list):
+        images = [images]
+
+    entries = []
+    for image in images or []:
+        formatted_image = format_v2_image(image)
+        if formatted_image:
+            formatted_image['visibility'] = 'public'
+            entries.append((_image_sort_key(image), formatted_image,
+                            image['id']))
+
+    entries.sort(key=lambda entry: entry[0])
+    return ([entry[0] for entry in entries],
+            [entry[1:] for entry in entries])
+
+
+PUBLIC_IMAGES = catalog.ImageCatalog(load_public_images)
+
+
+def _image_sort_key(image):
+    return ((image.get('name') or '').lower(), image['globalIdentifier'])
+
+
+def _merge_images(public_images, image_obj, name, position, chunk_size):
+    """Merges the public and private images into a single sorted stream.
+
+    Both streams are ordered by _image_sort_key and start right after
+    ``position``, a (sort key, private offset) tuple taken from a marker.
+    Items are (key, visibility, image, extra) tuples where ``extra`` is the
+    SoftLayer id for public images and, for private images, the offset to
+    resume the private listing from after that image. A private offset of
+    None means the offset is unknown and private images are skipped by key.
+    """
+    keys, entries = public_images
+    start_key, private_offset = position or (None, 0)
+
+    first = 0
+    if start_key is not None:
+        first = bisect.bisect_right(keys, start_key)
+
+    def public_stream():
+        for index in six.moves.range(first, len(entries)):
+            image, image_id = entries[index]
+            if name and not _matches_query(image['name'], name):
+                continue
+            yield keys[index], 'public', image, image_id
+
+    def private_stream():
+        offset = private_offset or 0
+        for image in image_obj.iter_private_images(name=name, offset=offset,
+                                                   chunk_size=chunk_size):
+            offset += 1
+            if not image.get('globalIdentifier'):
+                # Images without a GUID, such as captures in progress,
+                # can't be formatted or used as a marker
+                continue
+            key = _image_sort_key(image)
+            if private_offset is None and key <= start_key:
+                continue
+            yield key, 'private', image, offset
+
+    return heapq.merge(public_stream(), private_stream())
+
+
+def _encode_marker(key, private_offset):
+    data = json.dumps({'k': list(key), 'p': private_offset})
+    marker = base64.urlsafe_b64encode(data.encode('utf-8'))
+    return marker.decode('ascii').rstrip('=')
+
+
+def _decode_marker(image_obj, public_images, marker):
+    """Returns the (sort key, private offset) position of a marker.
+
+    Markers are normally opaque values built by _encode_marker(). Image
+    GUIDs used as markers by older clients are still accepted and are
+    resolved to the position of that image. None is returned for unknown
+    markers.
+    """
+    try:
+        padded = marker + '=' * (-len(marker) % 4)
+        data = json.loads(
+            base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        key = tuple(data['k'])
+        private_offset = data['p']
+        if len(key) == 2 and (private_offset is None or
+                              int(private_offset) >= 0):
+            return key, private_offset
+    except (ValueError, TypeError, KeyError):
+        pass
+
+    keys, entries = public_images
+    for index, (image, image_id) in enumerate(entries):
+        if image['id'] == marker:
+            return keys[index], None
+
+    images = image_obj.get_private_images(guid=marker, limit=1)
+    if images and not isinstance(images, list):
+        images = [images]
+    if images:
+        return _image_sort_key(images[0]), None
+
+    return None
+
+
+def _images_url(req, name, limit, marker):
+    params = [('limit', limit), ('marker', marker)]
+    if name:
+        params.append(('name', name))
+
+    return (req.protocol + '://' + req.get_header('host') + req.app +
+            req.path + '?' + parse.urlencode(params))
+
+
+def _matches_query(value, query):
+    """Applies a SoftLayer query string (see query_filter) to a value."""
+    operation = sl_utils.query_filter(query)['operation']
+    value = value or ''
+    if isinstance(operation, int):
+        return value == str(operation)
+
+    operator, _, operand = operation.partition(' ')
+    if operator == '_=':
+        return value.lower() == operand.lower()
+    if operator == '*=':
+        return operand.lower() in value.lower()
+    if operator == '^=':
+        return value.lower().startswith(operand.lower())
+    if operator == '$=':
+        return value.lower().endswith(operand.lower())
+    if operator == '~':
+        return operand in value
+    if operator == '!~':
+        return operand not in value
+    if operator == '>':
+        return value > operand
+    if operator == '<':
+        return value < operand
+    if operator == '>=':
+        return value >= operand
+    if operator == '<=':
+        return value <= operand
+    return value == operation
+
+
 def get_v1_image_details_dict(app, req, image, tenant_id=None):
     if not image or not image.get('globalIdentifier'):
         return {}
+    links = ImageLinks.for_request(app, req)
 
+    href = links.v1_image(image['id'])
+    created = image.get('createDate')
     # TODO() - Don't hardcode some of these values
-    results = {
+    return {
         'status': 'ACTIVE',
-        'updated': image.get('createDate'),
-        'created': image.get('createDate'),
+        'updated': created,
+        'created': created,
         'id': image['globalIdentifier'],
         'progress': 100,
         'metadata': {},
@@ -573,28 +809,16 @@ def get_v1_image_details_dict(app, req, image, tenant_id=None):
         'OS-EXT-IMG-SIZE:size': None,
         'container_format': 'bare',
         'disk_format': 'raw',
-        'is_public': True if image.get('visibility') == 'public' else False,
+        'is_public': image.get('visibility') == 'public',
         'protected': False,
         'owner': image.get('accountId'),
         'minDisk': 0,
         'minRam': 0,
         'name': image['name'],
-        'links': [
-            {
-                'href': app.get_endpoint_url('image', req, 'v1_image',
-                                             image_guid=image['id']),
-                'rel': 'self',
-            },
-            {
-                'href': app.get_endpoint_url('image', req, 'v1_image',
-                                             image_guid=image['id']),
-                'rel': 'bookmark',
-            }
-        ],
+        'links': [{'href': href, 'rel': 'self'},
+                  {'href': href, 'rel': 'bookmark'}],
     }
 
-    return results
-
 
 class SLImages(object):
     image_mask = ('id,accountId,name,globalIdentifier,blockDevices,parentId,'
@@ -645,6 +869,38 @@ class SLImages(object):
         account = self.client['Account']
         return account.getPrivateBlockDeviceTemplateGroups(**params)
 
+    def iter_private_images(self, name=None, offset=0, chunk_size=100):
+        """Iterates over the private images sorted by name and GUID."""
+        if name:
+            name_filter = sl_utils.query_filter(name)
+        else:
+            name_filter = {'operation': 'orderBy'}
+        name_filter['options'] = [{'name': 'sort', 'value': ['ASC']},
+                                  {'name': 'sortOrder', 'value': [1]}]
+
+        _filter = {'privateBlockDeviceTemplateGroups': {
+            'name': name_filter,
+            'globalIdentifier': {
+                'operation': 'orderBy',
+                'options': [{'name': 'sort', 'value': ['ASC']},
+                            {'name': 'sortOrder', 'value': [2]}]},
+        }}
+
+        account = self.client['Account']
+        while True:
+            images = account.getPrivateBlockDeviceTemplateGroups(
+                mask=self.image_mask, filter=_filter, limit=chunk_size,
+                offset=offset)
+            if images and not isinstance(images, list):
+                images = [images]
+
+            for image in images or []:
+                yield image
+
+            if not images or len(images) < chunk_size:
+                return
+            offset += len(images)
+
     def get_public_images(self, guid=None, name=None, limit=None, marker=None):
         _filter = sl_utils.NestedDict()
         if name:
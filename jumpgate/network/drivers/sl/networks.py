@@ -1,6 +1,7 @@
 import operator
 
 from jumpgate.common import error_handling
+from jumpgate.common.sl import inventory
 
 NETWORK_MASK = 'id, name, subnets, vlanNumber, networkSpace'
 
@@ -44,8 +45,13 @@ class NetworksV2(object):
             _filter['networkVlans']['id'] = {
                 'operation': req.get_param('name')}
 
-        vlans = client['Account'].getNetworkVlans(mask=NETWORK_MASK,
-                                                  filter=_filter)
+        vlans = inventory.list_resources(req, 'network_vlans')
+        if vlans is None:
+            vlans = client['Account'].getNetworkVlans(mask=NETWORK_MASK,
+                                                      filter=_filter)
+        elif req.get_param('name'):
+            vlans = [vlan for vlan in vlans
+                     if str(vlan['id']) == req.get_param('name')]
         network = [format_network(vlan, tenant_id)
                    for vlan in sorted(vlans, key=operator.itemgetter('id'))]
 
@@ -53,6 +59,10 @@ class NetworksV2(object):
         resp.status = 200
 
 
+def load_network_vlans(client):
+    return client['Account'].getNetworkVlans(mask=NETWORK_MASK)
+
+
 def format_network(sl_vlan, tenant_id):
     return {
         'admin_state_up': True,
@@ -0,0 +1,19 @@
+from jumpgate.common import sl as sl_common
+from jumpgate.common.sl import inventory
+from jumpgate.network.drivers.sl import extensions
+from jumpgate.network.drivers.sl import networks
+from jumpgate.network.drivers.sl import subnets
+
+
+def setup_routes(app, disp):
+    # V2 Routes
+    disp.set_handler('v2_network', networks.NetworkV2())
+    disp.set_handler('v2_networks', networks.NetworksV2())
+    disp.set_handler('v2_subnet', subnets.SubnetV2())
+    disp.set_handler('v2_subnets', subnets.SubnetsV2())
+    disp.set_handler('v2_extensions', extensions.ExtensionsV2())
+
+    inventory.register_resource('network_vlans', networks.load_network_vlans)
+    inventory.register_resource('subnets', subnets.load_subnets)
+
+    sl_common.add_hooks(app)
@@ -1,8 +1,10 @@
 import operator
 
 import ipaddress
+import six
 
 from jumpgate.common import error_handling
+from jumpgate.common.sl import inventory
 
 SUBNET_MASK = ('id, cidr, netmask, networkVlanId, networkIdentifier, gateway, '
                'version')
@@ -48,8 +50,13 @@ class SubnetsV2(object):
             _filter['subnets']['id'] = {
                 'operation': req.get_param('name')}
 
-        subnets = client['Account'].getSubnets(mask=SUBNET_MASK,
-                                               filter=_filter)
+        subnets = inventory.list_resources(req, 'subnets')
+        if subnets is None:
+            subnets = client['Account'].getSubnets(mask=SUBNET_MASK,
+                                                   filter=_filter)
+        elif req.get_param('name'):
+            subnets = [subnet for subnet in subnets
+                       if str(subnet['id']) == req.get_param('name')]
         resp.body = {
             'subnets': [format_subnetwork(subnet, tenant_id)
                         for subnet in sorted(subnets,
@@ -58,13 +65,18 @@ class SubnetsV2(object):
         resp.status = 200
 
 
-def format_subnetwork(subnet, tenant_id):
-    allocation_pools = []
+def load_subnets(client):
+    return client['Account'].getSubnets(mask=SUBNET_MASK)
 
-    cidr = str(subnet['networkIdentifier']) + '/' + str(subnet['cidr'])
 
-    allocation_pools.append({"start": str(ipaddress.ip_network(cidr)[0] + 2),
-                             "end": str(ipaddress.ip_network(cidr)[-1] - 1)})
+def format_subnetwork(subnet, tenant_id):
+    cidr = '%s/%s' % (subnet['networkIdentifier'], subnet['cidr'])
+    # Cheaper than building an ip_network for the first and last addresses
+    address = ipaddress.ip_address(
+        six.text_type(subnet['networkIdentifier']))
+    size = 1 << (address.max_prefixlen - int(subnet['cidr']))
+    allocation_pools = [{"start": str(address + 2),
+                         "end": str(address + size - 2)}]
     return {
         "name": '',
         "tenant_id": tenant_id,
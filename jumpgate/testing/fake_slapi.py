@@ -0,0 +1,941 @@
+"""In-process fake of the SoftLayer API.
+
+``FakeSLAPI`` answers SoftLayer API calls from the data of a single account,
+either generated with ``generate_account()`` or loaded from a JSON fixture.
+It supports the services and methods jumpgate uses, object masks, basic
+object filters (comparisons, ``in`` and ``orderBy``) and result limits, and
+counts the calls it receives. Latency and errors can be injected per
+service or method with ``set_profile()``.
+
+``FakeSLAPIServer`` serves it over HTTP with both the XML-RPC and the REST
+protocols, so jumpgate can be pointed at it with the ``[softlayer]
+endpoint`` option:
+
+    python -m jumpgate.testing.fake_slapi --guests 1000 --port 8000
+
+The fake is not a reference of the SoftLayer API: it only mimics enough of
+it to measure and test jumpgate without a SoftLayer account.
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import random
+import re
+import threading
+import time
+from wsgiref import simple_server
+
+import six
+from six.moves import socketserver
+from six.moves.urllib import parse
+from six.moves import xmlrpc_client
+
+ACCOUNT_ID = 123456
+USER_ID = 7000
+
+_PREFIX = 'SoftLayer_'
+
+# Where the objects of a service are found: in a property of the account,
+# or at the top level of the data
+COLLECTIONS = {
+    'Virtual_Guest': ('account', 'virtualGuests'),
+    'Virtual_Disk_Image': ('account', 'virtualDiskImages'),
+    'Virtual_Guest_Block_Device_Template_Group':
+        ('account', 'blockDeviceTemplateGroups'),
+    'Network_Vlan': ('account', 'networkVlans'),
+    'Network_Subnet': ('account', 'subnets'),
+    'Security_Ssh_Key': ('account', 'sshKeys'),
+    'User_Customer': ('account', 'users'),
+    'Product_Package': (None, 'productPackages'),
+    'Location_Datacenter': (None, 'datacenters'),
+}
+
+# Account properties computed from other properties
+DERIVED = {
+    'hourlyVirtualGuests': ('virtualGuests',
+                            lambda guest: guest.get('hourlyBillingFlag')),
+    'monthlyVirtualGuests': ('virtualGuests',
+                             lambda guest: not guest.get('hourlyBillingFlag')),
+    'privateBlockDeviceTemplateGroups': ('blockDeviceTemplateGroups',
+                                         lambda image: True),
+    'publicNetworkVlans': ('networkVlans',
+                           lambda vlan: vlan.get('networkSpace') == 'PUBLIC'),
+    'privateNetworkVlans': ('networkVlans',
+                            lambda vlan: vlan.get('networkSpace') ==
+                            'PRIVATE'),
+}
+
+# Relational properties returned by a method called without a mask
+DEFAULT_MASKS = {
+    'Virtual_Guest.getTagReferences': 'tag',
+}
+
+POWER_STATES = {
+    'powerOn': 'RUNNING',
+    'powerOff': 'HALTED',
+    'powerOffSoft': 'HALTED',
+    'pause': 'PAUSED',
+    'resume': 'RUNNING',
+    'rebootDefault': 'RUNNING',
+    'rebootSoft': 'RUNNING',
+    'rebootHard': 'RUNNING',
+}
+
+
+class Fault(Exception):
+    """Error returned by the fake.
+
+    Faults without a status are SoftLayer exceptions. Faults with a status
+    are HTTP errors, as returned by a failing load balancer.
+    """
+
+    def __init__(self, code, message, status=None):
+        super(Fault, self).__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+class Profile(object):
+    """Latency and errors injected in the calls of a service or method.
+
+    :param latency: seconds added to every call
+    :param jitter: maximum seconds randomly added to the latency
+    :param error_rate: share of the calls failing
+    :param fault_code: SoftLayer exception of the failing calls
+    :param status: HTTP status of the failing calls, instead of a fault
+    """
+
+    def __init__(self, latency=0, jitter=0, error_rate=0,
+                 fault_code='SoftLayer_Exception_Public',
+                 fault_string='Injected error', status=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fault_code = fault_code
+        self.fault_string = fault_string
+        self.status = status
+
+
+def _short_name(service):
+    if service.startswith(_PREFIX):
+        return service[len(_PREFIX):]
+    return service
+
+
+def _property_name(method):
+    name = method[3:] if method.startswith('get') else method
+    return name[:1].lower() + name[1:]
+
+
+def parse_mask(mask):
+    """Parses an object mask into a tree of property names.
+
+    ``'mask[id, status.name, datacenter[name]]'`` and its variations give
+    ``{'id': {}, 'status': {'name': {}}, 'datacenter': {'name': {}}}``.
+    """
+    if mask is None:
+        return None
+    if isinstance(mask, dict):
+        return dict((key, parse_mask(value) if isinstance(value, dict)
+                     else {}) for key, value in mask.items())
+
+    mask = mask.strip()
+    if mask.startswith('mask'):
+        mask = mask[len('mask'):]
+        # Type casts are ignored
+        if mask.startswith('('):
+            mask = mask[mask.index(')') + 1:]
+        if mask.startswith('.'):
+            mask = mask[1:]
+
+    tree = {}
+    _parse_mask_list(re.findall(r'\w+|[\[\],.]', mask), 0, tree)
+    return tree
+
+
+def _parse_mask_list(tokens, pos, tree):
+    while pos < len(tokens):
+        token = tokens[pos]
+        if token == ']':
+            return pos + 1
+        if token == ',':
+            pos += 1
+            continue
+        if token == '[':
+            pos = _parse_mask_list(tokens, pos + 1, tree)
+            continue
+
+        node = tree.setdefault(token, {})
+        pos += 1
+        while pos + 1 < len(tokens) and tokens[pos] == '.':
+            node = node.setdefault(tokens[pos + 1], {})
+            pos += 2
+        if pos < len(tokens) and tokens[pos] == '[':
+            pos = _parse_mask_list(tokens, pos + 1, node)
+    return pos
+
+
+def apply_mask(value, tree):
+    """Copies the properties of value selected by a parsed mask.
+
+    Like SoftLayer, relational properties (dicts and lists) are only
+    returned when the mask asks for them, and masks only naming relational
+    properties also return every local property.
+    """
+    if isinstance(value, list):
+        return [apply_mask(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    local = dict((key, item) for key, item in value.items()
+                 if not isinstance(item, (dict, list)))
+    if not tree:
+        return local
+
+    result = {}
+    if not any(key in local for key in tree):
+        result.update(local)
+    for key, subtree in tree.items():
+        if key in value:
+            result[key] = apply_mask(value[key], subtree)
+    return result
+
+
+def _values(item, path):
+    values = [item]
+    for key in path:
+        found = []
+        for value in values:
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+                if isinstance(value, list):
+                    found.extend(value)
+                else:
+                    found.append(value)
+        values = found
+    return values
+
+
+def _compare(value, operand):
+    try:
+        return float(value), float(operand)
+    except (TypeError, ValueError):
+        return six.text_type(value), six.text_type(operand)
+
+
+def _matches(value, operation, options):
+    if operation == 'orderBy':
+        return True
+    if operation == 'in':
+        data = [option.get('value') for option in options
+                if option.get('name') == 'data']
+        data = data[0] if data else []
+        return six.text_type(value) in [six.text_type(item) for item in data]
+    if not isinstance(operation, six.string_types):
+        return value == operation
+
+    if operation == 'is null':
+        return value is None
+    if operation == 'not null':
+        return value is not None
+    if value is None:
+        return False
+
+    operator, _, operand = operation.partition(' ')
+    text = six.text_type(value)
+    if operator == '_=':
+        return text.lower() == operand.lower()
+    if operator == '*=':
+        return operand.lower() in text.lower()
+    if operator == '^=':
+        return text.lower().startswith(operand.lower())
+    if operator == '$=':
+        return text.lower().endswith(operand.lower())
+    if operator == '~':
+        return operand in text
+    if operator == '!~':
+        return operand not in text
+    if operator == '!=':
+        return text != operand
+    if operator in ('>', '<', '>=', '<='):
+        left, right = _compare(value, operand)
+        return {'>': left > right, '<': left < right,
+                '>=': left >= right, '<=': left <= right}[operator]
+    return text == operation
+
+
+def _collect_conditions(tree, path, conditions):
+    for key, value in tree.items():
+        if not isinstance(value, dict):
+            continue
+        if 'operation' in value:
+            conditions.append((path + (key,), value['operation'],
+                               value.get('options') or []))
+        else:
+            _collect_conditions(value, path + (key,), conditions)
+
+
+def _sort_key(value):
+    if value is None:
+        return (0, 0, '')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value, '')
+    return (2, 0, six.text_type(value))
+
+
+def apply_filter(items, tree):
+    """Filters and sorts a list of objects with an object filter."""
+    conditions = []
+    _collect_conditions(tree, (), conditions)
+
+    def matches(item):
+        for path, operation, options in conditions:
+            values = _values(item, path)
+            if not values:
+                if operation != 'is null' and operation != 'orderBy':
+                    return False
+            elif not any(_matches(value, operation, options)
+                         for value in values):
+                return False
+        return True
+
+    result = [item for item in items if matches(item)]
+
+    sorts = []
+    for path, operation, options in conditions:
+        options = dict((option.get('name'), option.get('value'))
+                       for option in options)
+        if 'sort' in options:
+            order = (options.get('sortOrder') or [0])[0]
+            sorts.append((order, path, options['sort'][0] == 'DESC'))
+    # Sort by the least significant key first, sorts are stable
+    for _, path, reverse in sorted(sorts, reverse=True):
+        result.sort(key=lambda item: _sort_key(
+            (_values(item, path) or [None])[0]), reverse=reverse)
+    return result
+
+
+class FakeSLAPI(object):
+    """SoftLayer API answering calls from the data of an account.
+
+    Instances are WSGI applications speaking the XML-RPC and REST
+    protocols of the SoftLayer API.
+
+    :param data: account data, see generate_account()
+    :param seed: seed of the random injected latency and errors
+    """
+
+    def __init__(self, data=None, seed=0):
+        self.data = data if data is not None else generate_account()
+        self.calls = collections.Counter()
+        self._profiles = {}
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._indexes = {}
+        self._next_id = 90000000
+
+        self._handlers = {
+            ('Account', 'getCurrentUser'): self._get_current_user,
+            ('Virtual_Guest', 'getCreateObjectOptions'):
+                lambda obj: self.data['createObjectOptions'],
+            ('Virtual_Guest', 'createObject'): self._create_guest,
+            ('Virtual_Guest', 'createObjects'):
+                lambda obj, templates: [self._create_guest(obj, template)
+                                        for template in templates],
+            ('Virtual_Guest', 'setTags'): self._set_tags,
+            ('Virtual_Guest_Block_Device_Template_Group', 'getPublicImages'):
+                lambda obj: self.data.get('publicImages', []),
+        }
+        for method, state in POWER_STATES.items():
+            self._handlers[('Virtual_Guest', method)] = (
+                lambda obj, state=state: self._set_power_state(obj, state))
+
+    @classmethod
+    def from_fixture(cls, path, **kwargs):
+        with open(path) as fixture:
+            return cls(json.load(fixture), **kwargs)
+
+    def save_fixture(self, path):
+        with self._lock:
+            with open(path, 'w') as fixture:
+                json.dump(self.data, fixture, indent=1, sort_keys=True)
+
+    def set_profile(self, name='*', **kwargs):
+        """Injects latency or errors, see Profile.
+
+        :param name: '*', a service or a Service.method
+        """
+        self._profiles[name] = Profile(**kwargs)
+
+    def clear_profiles(self):
+        self._profiles.clear()
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def _profile(self, service, method):
+        for name in ('%s.%s' % (service, method), service, '*'):
+            if name in self._profiles:
+                return self._profiles[name]
+        return None
+
+    def call(self, service, method, args=(), identifier=None, mask=None,
+             object_filter=None, limit=None, offset=0):
+        """Answers a call like the SoftLayer API.
+
+        :raises Fault: when the call fails
+        """
+        service = _short_name(service)
+        with self._lock:
+            self.calls['%s.%s' % (service, method)] += 1
+            profile = self._profile(service, method)
+            delay = failed = None
+            if profile is not None:
+                delay = profile.latency + self._random.uniform(
+                    0, profile.jitter)
+                failed = self._random.random() < profile.error_rate
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise Fault(profile.fault_code, profile.fault_string,
+                        status=profile.status)
+
+        if mask is None:
+            mask = DEFAULT_MASKS.get('%s.%s' % (service, method))
+        tree = parse_mask(mask)
+        with self._lock:
+            result = self._dispatch(service, method, identifier, list(args))
+            if isinstance(result, list):
+                if object_filter:
+                    result = apply_filter(
+                        result, object_filter.get(_property_name(method),
+                                                  object_filter))
+                if limit:
+                    offset = offset or 0
+                    result = result[offset:offset + limit]
+            return apply_mask(result, tree)
+
+    def _collection(self, service):
+        owner, name = COLLECTIONS[service]
+        container = self.data['account'] if owner else self.data
+        return container.setdefault(name, [])
+
+    def _find(self, service, identifier):
+        index = self._indexes.get(service)
+        if index is None:
+            objects = list(self._collection(service))
+            if service == 'Virtual_Guest_Block_Device_Template_Group':
+                objects.extend(self.data.get('publicImages', []))
+            index = self._indexes[service] = dict(
+                (str(obj['id']), obj) for obj in objects)
+
+        obj = index.get(str(identifier))
+        if obj is None:
+            raise Fault('SoftLayer_Exception_ObjectNotFound',
+                        'Unable to find object with id of \'%s\'.'
+                        % identifier)
+        return obj
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def _dispatch(self, service, method, identifier, args):
+        obj = None
+        if service == 'Account':
+            obj = self.data['account']
+        elif identifier is not None and service in COLLECTIONS:
+            obj = self._find(service, identifier)
+
+        handler = self._handlers.get((service, method))
+        if handler is not None:
+            return handler(obj, *args)
+
+        if service in COLLECTIONS:
+            if method == 'getAllObjects':
+                return self._collection(service)
+            if method == 'createObject':
+                template = dict(args[0], id=self._new_id())
+                self._collection(service).append(template)
+                self._indexes.pop(service, None)
+                return template
+            if obj is not None and method == 'deleteObject':
+                self._collection(service).remove(obj)
+                self._indexes.pop(service, None)
+                return True
+            if obj is not None and method == 'editObject':
+                obj.update(args[0])
+                return True
+
+        if obj is not None and method == 'getObject':
+            return obj
+        if obj is not None and method.startswith('get'):
+            name = _property_name(method)
+            if service == 'Account' and name in DERIVED:
+                source, predicate = DERIVED[name]
+                return [item for item in obj.get(source, [])
+                        if predicate(item)]
+            return obj.get(name)
+
+        raise Fault('SoftLayer_Exception',
+                    'Function ("%s") is not a valid method for this service.'
+                    % method)
+
+    def _get_current_user(self, account):
+        return account['users'][0]
+
+    def _create_guest(self, obj, template):
+        guest_id = self._new_id()
+        guest = {
+            'id': guest_id,
+            'globalIdentifier': _guid(guest_id),
+            'accountId': ACCOUNT_ID,
+            'hostname': template.get('hostname'),
+            'domain': template.get('domain'),
+            'fullyQualifiedDomainName': '%s.%s' % (template.get('hostname'),
+                                                   template.get('domain')),
+            'maxCpu': template.get('startCpus'),
+            'startCpus': template.get('startCpus'),
+            'maxMemory': template.get('maxMemory'),
+            'hourlyBillingFlag': bool(template.get('hourlyBillingFlag')),
+            'localDiskFlag': bool(template.get('localDiskFlag')),
+            'createDate': _timestamp(),
+            'modifyDate': _timestamp(),
+            'status': {'keyName': 'ACTIVE', 'name': 'Active'},
+            'powerState': {'keyName': 'RUNNING', 'name': 'Running'},
+            'datacenter': template.get('datacenter') or {},
+            'activeTransaction': {'transactionStatus': {
+                'name': 'PROVISION', 'friendlyName': 'Provisioning'}},
+            'billingItem': {'id': guest_id, 'orderItem': {
+                'order': {'userRecordId': USER_ID}}},
+            'tagReferences': [],
+            'sshKeys': [],
+        }
+        if template.get('blockDeviceTemplateGroup'):
+            guest['blockDeviceTemplateGroup'] = template[
+                'blockDeviceTemplateGroup']
+        self._collection('Virtual_Guest').append(guest)
+        self._indexes.pop('Virtual_Guest', None)
+        return guest
+
+    def _set_power_state(self, guest, state):
+        guest['powerState'] = {'keyName': state, 'name': state.title()}
+        return True
+
+    def _set_tags(self, guest, tags):
+        guest['tagReferences'] = [{'tag': {'name': tag.strip()}}
+                                  for tag in (tags or '').split(',')
+                                  if tag.strip()]
+        return True
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        try:
+            if path.endswith('.json'):
+                status, content_type, body = self._handle_rest(environ, path)
+            else:
+                status, content_type, body = self._handle_xmlrpc(environ,
+                                                                 path)
+        except Fault as e:
+            status, content_type = '%d Error' % e.status, 'text/plain'
+            body = e.message.encode('utf-8')
+
+        start_response(status, [('Content-Type', content_type),
+                                ('Content-Length', str(len(body)))])
+        return [body]
+
+    def _read_body(self, environ):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        return environ['wsgi.input'].read(length) if length else b''
+
+    def _handle_xmlrpc(self, environ, path):
+        params, method = xmlrpc_client.loads(self._read_body(environ))
+        service = [part for part in path.split('/') if part][-1]
+        headers = {}
+        if params and isinstance(params[0], dict) and 'headers' in params[0]:
+            headers = params[0]['headers']
+            params = params[1:]
+
+        mask = (headers.get('SoftLayer_ObjectMask') or
+                headers.get('%sObjectMask' % service) or {}).get('mask')
+        limit = headers.get('resultLimit') or {}
+        try:
+            result = self.call(
+                service, method, params,
+                identifier=(headers.get('%sInitParameters' % service) or
+                            {}).get('id'),
+                mask=mask,
+                object_filter=headers.get('%sObjectFilter' % service),
+                limit=limit.get('limit'), offset=limit.get('offset'))
+            body = xmlrpc_client.dumps((result,), methodresponse=True,
+                                       allow_none=True)
+        except Fault as e:
+            if e.status:
+                raise
+            body = xmlrpc_client.dumps(xmlrpc_client.Fault(e.code,
+                                                           e.message),
+                                       allow_none=True)
+        return '200 OK', 'text/xml', body.encode('utf-8')
+
+    def _handle_rest(self, environ, path):
+        parts = [part for part in path[:-len('.json')].split('/') if part]
+        start = [index for index, part in enumerate(parts)
+                 if part.startswith(_PREFIX)][0]
+        service, parts = parts[start], parts[start + 1:]
+        method = parts[-1] if parts else 'getObject'
+        identifier = parts[0] if len(parts) > 1 else None
+
+        query = dict(parse.parse_qsl(environ.get('QUERY_STRING', '')))
+        object_filter = None
+        if query.get('objectFilter'):
+            object_filter = json.loads(query['objectFilter'])
+        limit = offset = None
+        if query.get('resultLimit'):
+            offset, limit = [int(part) for part in
+                             query['resultLimit'].split(',')]
+
+        args = []
+        body = self._read_body(environ)
+        if body:
+            args = json.loads(body.decode('utf-8')).get('parameters') or []
+
+        try:
+            result = self.call(service, method, args, identifier=identifier,
+                               mask=query.get('objectMask'),
+                               object_filter=object_filter, limit=limit,
+                               offset=offset)
+            status = '200 OK'
+        except Fault as e:
+            if e.status:
+                raise
+            status = ('404 Not Found' if e.code.endswith('NotFound')
+                      else '500 Internal Server Error')
+            result = {'error': e.message, 'code': e.code}
+        return status, 'application/json', json.dumps(result).encode('utf-8')
+
+
+class _ThreadingWSGIServer(socketserver.ThreadingMixIn,
+                           simple_server.WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(simple_server.WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSLAPIServer(object):
+    """Serves a FakeSLAPI over HTTP from a background thread."""
+
+    def __init__(self, api=None, host='127.0.0.1', port=0):
+        self.api = api if api is not None else FakeSLAPI()
+        self._server = simple_server.make_server(
+            host, port, self.api, server_class=_ThreadingWSGIServer,
+            handler_class=_QuietHandler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    @property
+    def xmlrpc_endpoint(self):
+        return self.url + '/xmlrpc/v3/'
+
+    @property
+    def rest_endpoint(self):
+        return self.url + '/rest/v3/'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _guid(number):
+    return '%08x-%04x-4%03x-8%03x-%012x' % (
+        number, number % 0xffff, number % 0xfff, number % 0xfff, number)
+
+
+def _timestamp(offset=0):
+    return time.strftime('%Y-%m-%dT%H:%M:%S-06:00',
+                         time.gmtime(1400000000 + offset))
+
+
+def _item(item_id, category, description, capacity, template):
+    return {'id': item_id, 'description': description,
+            'capacity': capacity, 'itemCategory': {'categoryCode': category},
+            'prices': [{'id': item_id + 100000, 'hourlyRecurringFee': '0.01',
+                        'recurringFee': '7'}],
+            'template': template}
+
+
+def _create_object_options():
+    return {
+        'processors': [
+            {'template': {'startCpus': cpus},
+             'itemPrice': {'item': {'description': '%d x 2.0 GHz Cores'
+                                    % cpus}}}
+            for cpus in (1, 2, 4, 8)],
+        'memory': [
+            {'template': {'maxMemory': memory},
+             'itemPrice': {'item': {
+                 'description': '%d GB' % (memory // 1024)}}}
+            for memory in (1024, 2048, 4096, 8192)],
+        'blockDevices': [
+            {'template': {'localDiskFlag': local, 'blockDevices': [
+                {'device': '0', 'diskImage': {'capacity': capacity}}]}}
+            for capacity in (25, 100) for local in (False, True)],
+        'networkComponents': [
+            {'template': {'networkComponents': [{'maxSpeed': speed}]}}
+            for speed in (10, 100, 1000)],
+        'datacenters': [
+            {'template': {'datacenter': {'name': name}}}
+            for name in ('dal05', 'wdc01', 'ams01')],
+        'operatingSystems': [
+            {'template': {'operatingSystemReferenceCode': code}}
+            for code in ('UBUNTU_14_64', 'CENTOS_6_64', 'DEBIAN_7_64')],
+    }
+
+
+def generate_account(guests=10, images=5, vlans=4, seed=0):
+    """Returns the data of an account with the given number of objects.
+
+    The same arguments always give the same data.
+    """
+    rand = random.Random(seed)
+    datacenters = [{'id': 265592 + index, 'name': name, 'longName': long_name}
+                   for index, (name, long_name) in enumerate(
+                       [('dal05', 'Dallas 5'), ('wdc01', 'Washington 1'),
+                        ('ams01', 'Amsterdam 1')])]
+
+    private_images = []
+    for index in range(images):
+        image_id = 2000 + index
+        private_images.append({
+            'id': image_id,
+            'accountId': ACCOUNT_ID,
+            'name': 'image-%03d' % index,
+            'globalIdentifier': _guid(image_id),
+            'createDate': _timestamp(index * 3600),
+            'blockDevicesDiskSpaceTotal': str(25 * 1024 ** 3),
+            'blockDevices': [{'device': '0', 'diskImageId': 5000 + index}],
+        })
+    public_images = [{
+        'id': 2500 + index,
+        'accountId': 1,
+        'name': 'public-%s' % code.lower(),
+        'globalIdentifier': _guid(2500 + index),
+        'createDate': _timestamp(),
+        'blockDevicesDiskSpaceTotal': str(25 * 1024 ** 3),
+        'blockDevices': [],
+    } for index, code in enumerate(['UBUNTU_14_64', 'CENTOS_6_64'])]
+
+    network_vlans = []
+    subnets = []
+    for index in range(vlans):
+        vlan_id = 3000 + index
+        datacenter = datacenters[index % len(datacenters)]
+        space = 'PUBLIC' if index % 2 == 0 else 'PRIVATE'
+        prefix = '10.%d.%d' % (index % 256, index // 256 % 256)
+        subnet = {
+            'id': 4000 + index,
+            'networkIdentifier': prefix + '.0',
+            'cidr': 24,
+            'netmask': '255.255.255.0',
+            'gateway': prefix + '.1',
+            'broadcastAddress': prefix + '.255',
+            'subnetType': 'PRIMARY',
+            'version': 4,
+            'networkVlanId': vlan_id,
+            'addressSpace': space,
+            'datacenter': datacenter,
+        }
+        subnets.append(subnet)
+        network_vlans.append({
+            'id': vlan_id,
+            'vlanNumber': 800 + index,
+            'name': 'vlan-%d' % index,
+            'networkSpace': space,
+            'primaryRouter': {'hostname': '%s.%s' % (
+                'fcr01a' if space == 'PUBLIC' else 'bcr01a',
+                datacenter['name']), 'datacenter': datacenter},
+            'subnets': [subnet],
+        })
+
+    disk_images = [{
+        'id': 5000 + index,
+        'name': 'disk-%03d' % index,
+        'capacity': 25,
+        'units': 'GB',
+        'typeId': 241,
+        'type': {'keyName': 'SYSTEM', 'name': 'System'},
+        'localDiskFlag': False,
+        'description': 'disk-%03d' % index,
+        'createDate': _timestamp(index * 60),
+        'storageRepositoryId': 5500 + index % len(datacenters),
+        'storageRepository': {
+            'id': 5500 + index % len(datacenters),
+            'datacenter': datacenters[index % len(datacenters)]},
+        'billingItem': {'id': 60000000 + index},
+        # The first disks are attached to the first guests
+        'blockDevices': [{'id': 7000000 + index, 'device': '2',
+                          'diskImageId': 5000 + index,
+                          'guestId': 10000000 + index,
+                          'bootableFlag': 0}] if index < guests else [],
+    } for index in range(max(images, guests // 10))]
+
+    virtual_guests = []
+    for index in range(guests):
+        guest_id = 10000000 + index
+        datacenter = datacenters[index % len(datacenters)]
+        cpus = rand.choice([1, 2, 4])
+        state = 'RUNNING' if rand.random() < 0.9 else 'HALTED'
+        guest = {
+            'id': guest_id,
+            'globalIdentifier': _guid(guest_id),
+            'accountId': ACCOUNT_ID,
+            'hostname': 'vs%05d' % index,
+            'domain': 'example.com',
+            'fullyQualifiedDomainName': 'vs%05d.example.com' % index,
+            'maxCpu': cpus,
+            'startCpus': cpus,
+            'maxMemory': rand.choice([1024, 2048, 4096]),
+            'hourlyBillingFlag': index % 3 != 0,
+            'localDiskFlag': index % 2 == 0,
+            'dedicatedAccountHostOnlyFlag': False,
+            'createDate': _timestamp(index * 60),
+            'modifyDate': _timestamp(index * 60 + 600),
+            'provisionDate': _timestamp(index * 60 + 600),
+            'primaryIpAddress': '169.54.%d.%d' % (index // 250 % 250,
+                                                  index % 250 + 2),
+            'primaryBackendIpAddress': '10.%d.%d.%d' % (
+                index % max(vlans, 1), index // 250 % 250, index % 250 + 2),
+            'status': {'keyName': 'ACTIVE', 'name': 'Active'},
+            'powerState': {'keyName': state, 'name': state.title()},
+            'datacenter': datacenter,
+            'operatingSystem': {
+                'softwareLicense': {'softwareDescription': {
+                    'name': 'Ubuntu', 'version': '14.04-64 Minimal',
+                    'referenceCode': 'UBUNTU_14_64'}},
+                'passwords': [{'username': 'root',
+                               'password': 'password%d' % index}],
+            },
+            'tagReferences': [{'id': 8000000 + index, 'tagId': index % 5,
+                               'resourceTableId': guest_id,
+                               'tag': {'id': index % 5,
+                                       'name': 'group%d' % (index % 5)}}],
+            'networkComponents': [
+                {'id': guest_id * 2 + port, 'port': port, 'speed': 100,
+                 'maxSpeed': 1000, 'status': 'ACTIVE'}
+                for port in range(2)],
+            'billingItem': {'id': 50000000 + index, 'recurringFee': '0.067',
+                            'orderItem': {'order': {
+                                'userRecordId': USER_ID}}},
+            'sshKeys': [],
+        }
+        if private_images:
+            image = private_images[index % len(private_images)]
+            guest['blockDeviceTemplateGroup'] = {
+                'id': image['id'],
+                'globalIdentifier': image['globalIdentifier']}
+        if index % 50 == 7:
+            guest['activeTransaction'] = {'transactionStatus': {
+                'name': 'CLOUD_CONFIGURE', 'friendlyName': 'Configuring'}}
+        virtual_guests.append(guest)
+
+    return {
+        'account': {
+            'id': ACCOUNT_ID,
+            'companyName': 'Fake Company',
+            'email': 'admin@example.com',
+            'users': [{'id': USER_ID, 'username': 'fake-user',
+                       'accountId': ACCOUNT_ID,
+                       'email': 'user@example.com'}],
+            'virtualGuests': virtual_guests,
+            'blockDeviceTemplateGroups': private_images,
+            'networkVlans': network_vlans,
+            'subnets': subnets,
+            'virtualDiskImages': disk_images,
+            'sshKeys': [{'id': 6000, 'label': 'default',
+                         'key': 'ssh-rsa AAAAB3NzaC1yc2E fake@example.com',
+                         'fingerprint': '00:11:22:33:44:55:66:77:88:99:aa:'
+                                        'bb:cc:dd:ee:ff',
+                         'createDate': _timestamp()}],
+        },
+        'publicImages': public_images,
+        'datacenters': datacenters,
+        'productPackages': [{
+            'id': 46,
+            'name': 'Cloud Server',
+            'keyName': 'CLOUD_SERVER',
+            'items': [
+                _item(1000 + cpus, 'guest_core', '%d x 2.0 GHz Cores' % cpus,
+                      cpus, {'startCpus': cpus})
+                for cpus in (1, 2, 4)],
+        }],
+        'createObjectOptions': _create_object_options(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serves a fake SoftLayer API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--fixture', help='JSON file of the account data')
+    parser.add_argument('--save-fixture',
+                        help='Write the account data to this file and exit')
+    parser.add_argument('--guests', type=int, default=10)
+    parser.add_argument('--images', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--jitter', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    if args.fixture:
+        api = FakeSLAPI.from_fixture(args.fixture, seed=args.seed)
+    else:
+        api = FakeSLAPI(generate_account(guests=args.guests,
+                                         images=args.images,
+                                         seed=args.seed), seed=args.seed)
+    if args.save_fixture:
+        api.save_fixture(args.save_fixture)
+        return
+
+    if args.latency or args.jitter or args.error_rate:
+        api.set_profile(latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate)
+
+    server = FakeSLAPIServer(api, args.host, args.port)
+    print('XML-RPC endpoint: %s' % server.xmlrpc_endpoint)
+    print('REST endpoint: %s' % server.rest_endpoint)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
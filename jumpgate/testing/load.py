@@ -0,0 +1,242 @@
+"""End-to-end load harness running jumpgate against a fake SoftLayer API.
+
+``LoadHarness`` serves a ``FakeSLAPI`` account over HTTP, builds the WSGI
+application with ``jumpgate.wsgi.make_api`` from a configuration pointing
+at it and drives requests through the application in-process. For every
+request it records the latency and the number of SoftLayer API calls made,
+so flows can be checked against call budgets.
+
+Module level caches of the drivers outlive the application, so a process
+should only run a single harness; see benchmarks/e2e.py.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from falcon.testing import helpers
+import six
+from six.moves import configparser
+
+from jumpgate.testing import fake_slapi
+from jumpgate import wsgi
+
+API_KEY = 'a' * 64
+
+# name, method, path, SoftLayer API calls allowed per request
+FLOWS = [
+    ('token_issue', 'POST', '/v2.0/tokens', 1),
+    ('token_validate', 'GET', '/v2.0/tokens/{token}', 1),
+    ('servers_list', 'GET', '/compute/v2/{tenant_id}/servers', 1),
+    ('servers_detail', 'GET', '/compute/v2/{tenant_id}/servers/detail', 1),
+    ('server_show', 'GET', '/compute/v2/{tenant_id}/servers/{server_id}', 2),
+    ('images_list', 'GET', '/image/v2/images', 2),
+    ('volumes_detail', 'GET', '/volume/v1/{tenant_id}/volumes/detail', 1),
+    ('flavors_detail', 'GET', '/compute/v2/{tenant_id}/flavors/detail', 0),
+]
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def percentile(durations, pct):
+    if not durations:
+        return 0
+    ordered = sorted(durations)
+    return ordered[min(int(len(ordered) * pct / 100.0), len(ordered) - 1)]
+
+
+class LoadHarness(object):
+    """Jumpgate application wired to a served fake SoftLayer API.
+
+    :param config_file: base jumpgate configuration. Files it refers to
+                        (catalog templates, flavors, volume types) are
+                        looked up in its directory.
+    :param guests: virtual guests of the fake account
+    :param transport: SoftLayer API transport, 'xmlrpc' or 'rest'
+    :param latency: seconds added to every SoftLayer API call
+    :param overrides: {section: {option: value}} applied to the config
+    """
+
+    def __init__(self, config_file, guests=10, transport='xmlrpc',
+                 latency=0, seed=0, overrides=None):
+        self.api = fake_slapi.FakeSLAPI(
+            fake_slapi.generate_account(guests=guests, seed=seed), seed=seed)
+        if latency:
+            self.api.set_profile(latency=latency)
+        self.server = fake_slapi.FakeSLAPIServer(self.api).start()
+
+        self.directory = tempfile.mkdtemp(prefix='jumpgate-load-')
+        try:
+            config_path = self._write_config(config_file, transport,
+                                             overrides or {})
+            self.app = wsgi.make_api(config_path)
+        except Exception:
+            self.close()
+            raise
+
+        self.token = None
+        self.tenant_id = None
+        self.server_id = None
+
+    def _write_config(self, config_file, transport, overrides):
+        source = os.path.dirname(os.path.abspath(config_file))
+        for name in os.listdir(source):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and not name.endswith('.conf'):
+                shutil.copy(path, self.directory)
+
+        parser = configparser.RawConfigParser()
+        parser.optionxform = str
+        parser.read(config_file)
+        settings = {
+            'DEFAULT': {'log_level': 'WARNING'},
+            'softlayer': {'endpoint': self.server.xmlrpc_endpoint,
+                          'rest_endpoint': self.server.rest_endpoint,
+                          'transport': transport},
+            'reload': {'watch_interval': '0', 'reload_on_sighup': 'false'},
+            'capture': {'path': os.path.join(self.directory,
+                                             'capture.jsonl')},
+        }
+        for section, options in overrides.items():
+            settings.setdefault(section, {}).update(options)
+        for section, options in settings.items():
+            if section != 'DEFAULT' and not parser.has_section(section):
+                parser.add_section(section)
+            for name, value in options.items():
+                parser.set(section, name, str(value))
+
+        path = os.path.join(self.directory, 'jumpgate.conf')
+        with open(path, 'w') as config:
+            parser.write(config)
+        return path
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def request(self, method, path, headers=None, body=None):
+        """Sends a request to the application.
+
+        :returns: the status code, the decoded body and the number of
+                  SoftLayer API calls made while handling the request
+        """
+        if body is not None and not isinstance(body, six.string_types):
+            body = json.dumps(body)
+        headers = dict(headers or {})
+        if body is not None:
+            headers.setdefault('Content-Type', 'application/json')
+        env = helpers.create_environ(path=path, method=method,
+                                     headers=headers, body=body or '')
+
+        result = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            result['status'] = int(status.split(' ', 1)[0])
+
+        calls = sum(self.api.calls.values())
+        chunks = self.app(env, start_response)
+        content = b''.join(chunk if isinstance(chunk, bytes)
+                           else chunk.encode('utf-8') for chunk in chunks)
+        calls = sum(self.api.calls.values()) - calls
+
+        try:
+            content = json.loads(content.decode('utf-8'))
+        except ValueError:
+            pass
+        return result['status'], content, calls
+
+    def authenticate(self):
+        user = self.api.data['account']['users'][0]
+        status, body, _ = self.request('POST', '/v2.0/tokens', body={
+            'auth': {'passwordCredentials': {'username': user['username'],
+                                             'password': API_KEY}}})
+        if status != 200:
+            raise AssertionError('Authentication failed: %s %s'
+                                 % (status, body))
+        self.token = body['access']['token']['id']
+        self.tenant_id = body['access']['token']['tenant']['id']
+        guests = self.api.data['account']['virtualGuests']
+        self.server_id = guests[len(guests) // 2]['id'] if guests else 0
+
+    def send_flow(self, method, path):
+        if self.token is None:
+            self.authenticate()
+        path = path.format(token=self.token, tenant_id=self.tenant_id,
+                           server_id=self.server_id)
+        headers = {'X-Auth-Token': self.token}
+        body = None
+        if path == '/v2.0/tokens':
+            user = self.api.data['account']['users'][0]
+            headers = {}
+            body = {'auth': {'passwordCredentials': {
+                'username': user['username'], 'password': API_KEY}}}
+        return self.request(method, path, headers=headers, body=body)
+
+    def check_budget(self, name, method, path, budget):
+        """Sends a single request of a flow, with cold caches.
+
+        :raises BudgetExceeded: when it made more calls than its budget
+        :returns: the number of SoftLayer API calls made
+        """
+        status, body, calls = self.send_flow(method, path)
+        if status >= 400:
+            raise AssertionError('%s failed: %s %s' % (name, status, body))
+        if calls > budget:
+            raise BudgetExceeded('%s made %d SoftLayer API calls, its budget '
+                                 'is %d' % (name, calls, budget))
+        return calls
+
+    def run_flow(self, method, path, requests=100, concurrency=1,
+                 duration=None):
+        """Sends requests of a flow from concurrent threads.
+
+        Stops after the given number of requests or, when given, once
+        duration seconds have passed.
+
+        :returns: a dict of throughput and latency statistics
+        """
+        if self.token is None:
+            self.authenticate()
+        durations = []
+        errors = []
+        lock = threading.Lock()
+        counter = iter(range(requests))
+
+        def worker():
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                    if duration and time.time() - start > duration:
+                        return
+                sent = time.time()
+                status, _, _ = self.send_flow(method, path)
+                with lock:
+                    durations.append(time.time() - sent)
+                    if status >= 400:
+                        errors.append(status)
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(max(concurrency, 1))]
+        calls = sum(self.api.calls.values())
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start
+        calls = sum(self.api.calls.values()) - calls
+
+        return {
+            'requests': len(durations),
+            'errors': len(errors),
+            'throughput': len(durations) / elapsed if elapsed else 0,
+            'p50': percentile(durations, 50),
+            'p90': percentile(durations, 90),
+            'p99': percentile(durations, 99),
+            'slapi_calls': calls / float(len(durations) or 1),
+        }
@@ -8,6 +8,8 @@ import SoftLayer
 
 from jumpgate.common import config
 from jumpgate.common import error_handling
+from jumpgate.common import exceptions
+from jumpgate.common.sl import inventory
 
 
 HTTP = six.moves.http_client  # pylint: disable=E1101
@@ -114,6 +116,8 @@ class VolumeV1(object):
         try:
             volinfo = vol.getObject(id=volume_id,
                                     mask=get_virt_disk_img_mask())
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp, e.faultString,
                                                code=HTTP.NOT_FOUND)
@@ -215,6 +219,8 @@ class VolumesV1(object):
                                  config.CONF['volume']['default_availability_zone'])  # noqa
             volume_type = body['volume'].get('volume_type')
 
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.bad_request(resp, str(e))
 
@@ -249,6 +255,8 @@ class VolumesV1(object):
                                         "SoftLayerAPIError",
                                         e.faultString,
                                         code=e.faultCode)
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp, str(e))
 
@@ -406,12 +414,16 @@ class VolumesV1(object):
 
         # Get SoftLayer getVirtualDiskImages() function
         try:
-            _getVirtualDiskImages = getattr(client['Account'],
-                                            'getVirtualDiskImages')
+            disk_images = inventory.list_resources(req,
+                                                   'virtual_disk_images')
+            if disk_images is None:
+                _getVirtualDiskImages = getattr(client['Account'],
+                                                'getVirtualDiskImages')
+                disk_images = _getVirtualDiskImages(
+                    mask=get_virt_disk_img_mask())
             # filter out the swap disk from the retrived portable storage
             # devices
-            vols = [x for x in
-                    _getVirtualDiskImages(mask=get_virt_disk_img_mask())
+            vols = [x for x in disk_images
                     if x['typeId'] != VIRTUAL_DISK_IMAGE_TYPE['SWAP'] and
                     not x['localDiskFlag']]
             resp.body = {"volumes":
@@ -420,41 +432,32 @@ class VolumesV1(object):
                                         client) for vol in vols]}
             resp.status = HTTP.OK
 
+        except exceptions.ResponseException:
+            raise
         except Exception as e:
             return error_handling.volume_fault(resp, str(e))
 
 
 def format_volume(tenant_id, volume, client, showDetails=False, version=1):
-    def _get_volume_status(volume):
-
-        status = None
-        if 'billingItem' in volume:
-            if len(volume['blockDevices']) > 0:
-                # The blockDevices is not empty. It is attached to VSI.
-                status = "in-use"
-            else:
-                status = "available"
-        else:
-            # For the volume that doesn't have billingItem is is either
-            # othered with VSI or it has been cancelled.
-            if len(volume['blockDevices']) > 0:
-                status = "in-use"
-            else:
-                status = "deleting"
-        return status
-
-    LOG.info("volume info: %s", str(volume))
+    LOG.debug("volume info: %s", volume)
     blkdevs = volume.get('blockDevices', None)
     attachment = []
     bootable = 'false'
-    status = _get_volume_status(volume)
-
     for blkdev in blkdevs:
         attachment.append(
             _translate_attachment(blkdev, client, showDetails=showDetails))
         if blkdev.get('bootableFlag'):
             bootable = 'true'
 
+    # A volume with block devices is attached to a VSI. Without a
+    # billingItem, a volume is either ordered with a VSI or cancelled.
+    if blkdevs:
+        status = "in-use"
+    elif 'billingItem' in volume:
+        status = "available"
+    else:
+        status = "deleting"
+
     zone = ""
     store_repo = volume.get('storageRepository')
     if store_repo and store_repo.get('datacenter'):
@@ -477,8 +480,7 @@ def format_volume(tenant_id, volume, client, showDetails=False, version=1):
 
     # Cinder volume API version greater than v1.
     if version > 1:
-        volinfo.update(
-            {"os-vol-tenant-attr:tenant_id": tenant_id})
+        volinfo["os-vol-tenant-attr:tenant_id"] = tenant_id
 
     return volinfo
 
@@ -511,6 +513,11 @@ def _translate_attachment(blkdev, client, showDetails=False):
     return d
 
 
+def load_virtual_disk_images(client):
+    return client['Account'].getVirtualDiskImages(
+        mask=get_virt_disk_img_mask())
+
+
 def get_virt_disk_img_mask():
     mask = [
         'id',
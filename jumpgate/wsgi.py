@@ -5,12 +5,13 @@ import os.path
 from oslo.config import cfg
 
 from jumpgate import api
+from jumpgate.common import reloader
 from jumpgate import config as jumpgate_config
 
 PROJECT = 'jumpgate'
 
 
-def make_api(config_path=None):
+def configure(config_path=None):
     # Find configuration files
     config_files = cfg.find_config_files(PROJECT)
 
@@ -34,8 +35,13 @@ def make_api(config_path=None):
     logger.setLevel(getattr(logging,
                             jumpgate_config.CONF['log_level'].upper()))
     logger.addHandler(logging.StreamHandler())
+
+
+def make_api(config_path=None):
+    configure(config_path)
     app = api.Jumpgate()
     app.load_endpoints()
     app.load_drivers()
+    reloader.start()
 
     return app.make_api()
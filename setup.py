@@ -13,6 +13,7 @@ install_requires_list = [
 
 if sys.version_info[0] < 3:
     install_requires_list.append('py2-ipaddress')
+    install_requires_list.append('futures')
 
 setup(
     name='jumpgate',
@@ -36,5 +37,9 @@ setup(
     install_requires=install_requires_list,
     setup_requires=[],
     test_suite='nose.collector',
-    entry_points={'console_scripts': ['jumpgate = jumpgate.cmd_main:main']}
+    entry_points={'console_scripts': [
+        'jumpgate = jumpgate.cmd_main:main',
+        'jumpgate-replay = jumpgate.cmd_replay:main',
+        'jumpgate-import-report = jumpgate.cmd_import_report:main',
+    ]}
 )
@@ -1,6 +1,8 @@
 from mock import patch, MagicMock
 import unittest
 
+import six
+
 from jumpgate.common.exceptions import InvalidTokenError
 from jumpgate.common.hooks.core import hook_format, hook_set_uuid
 from jumpgate.common.hooks.log import log_request
@@ -29,6 +31,24 @@ class TestHookFormat(unittest.TestCase):
 
         self.assertEquals(resp.status, '200 OK')
 
+    def test_format_http_client_status(self):
+        req = MagicMock()
+        resp = MagicMock()
+        resp.status = six.moves.http_client.ACCEPTED
+
+        hook_format(req, resp)
+
+        self.assertEquals(resp.status, '202 Accepted')
+
+    def test_format_too_many_requests(self):
+        req = MagicMock()
+        resp = MagicMock()
+        resp.status = 429
+
+        hook_format(req, resp)
+
+        self.assertEquals(resp.status, '429 Too Many Requests')
+
     def test_format_request_id(self):
         req = MagicMock()
         req.env = {'REQUEST_ID': '123456'}
@@ -0,0 +1,66 @@
+import unittest
+
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+from mock import patch
+
+from jumpgate.common import aes
+
+
+class TestAES(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('jumpgate.common.aes.config')
+        self.config = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config.CONF = {'secret_key': 'SECRET'}
+
+        for target in ['jumpgate.common.aes._cipher',
+                       'jumpgate.common.aes._token_ciphers']:
+            patcher = patch(target, (None, None))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        encoded = aes.encode_aes('{"user_id": 1}')
+
+        self.assertEqual(aes.decode_aes(encoded), '{"user_id": 1}')
+
+    def test_cipher_reused(self):
+        self.assertIs(aes.create_cypher(), aes.create_cypher())
+
+    def test_secret_key_changed(self):
+        encoded = aes.encode_aes('token')
+        cipher = aes.create_cypher()
+
+        self.config.CONF = {'secret_key': 'OTHER'}
+
+        self.assertIsNot(aes.create_cypher(), cipher)
+        self.assertNotEqual(aes.encode_aes('token'), encoded)
+
+    def test_encrypt_then_mac(self):
+        message = aes.encrypt_then_mac(b'some token data', header=b'\x01')
+
+        self.assertEqual(message[:1], b'\x01')
+        self.assertEqual(len(message),
+                         1 + aes.NONCE_SIZE + 15 + aes.TAG_SIZE)
+        self.assertEqual(aes.verify_then_decrypt(message, 1),
+                         b'some token data')
+
+    def test_encrypt_then_mac_is_ctr(self):
+        cipher, _ = aes.create_token_ciphers()
+        nonce = b'12345678'
+        key = aes.hmac.new(b'SECRET', b'jumpgate encryption',
+                           aes.hashlib.sha256).digest()
+        ctr = AES.new(key, AES.MODE_CTR,
+                      counter=Counter.new(64, prefix=nonce, initial_value=0))
+
+        self.assertEqual(aes._ctr(cipher, nonce, b'x' * 40),
+                         ctr.encrypt(b'x' * 40))
+
+    def test_verify_then_decrypt_invalid(self):
+        message = bytearray(aes.encrypt_then_mac(b'some token data'))
+        message[-1] ^= 1
+        message = bytes(message)
+
+        self.assertRaises(ValueError, aes.verify_then_decrypt, message)
+        self.assertRaises(ValueError, aes.verify_then_decrypt, message[:20])
@@ -0,0 +1,79 @@
+import unittest
+
+from mock import patch
+from oslo.config import cfg
+
+from jumpgate.common import cache
+
+
+class TestResourceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = cache.ResourceCache()
+
+    def test_set_get(self):
+        self.cache.set(1, 'things', 2, 'value', 60)
+        self.assertEquals(self.cache.get('1', 'things', '2'), 'value')
+        self.assertEquals(self.cache.get(1, 'things', 3), None)
+
+    def test_no_ttl_is_not_cached(self):
+        self.cache.set(1, 'things', 2, 'value', 0)
+        self.assertEquals(self.cache.get(1, 'things', 2), None)
+
+    @patch('jumpgate.common.cache.time')
+    def test_expired(self, mock_time):
+        mock_time.time.return_value = 100
+        self.cache.set(1, 'things', 2, 'value', 60)
+        mock_time.time.return_value = 161
+        self.assertEquals(self.cache.get(1, 'things', 2), None)
+
+    @patch('jumpgate.common.cache.time')
+    def test_invalidate_makes_resource_hot(self, mock_time):
+        mock_time.time.return_value = 100
+        self.cache.set(1, 'things', 2, 'value', 600)
+        self.cache.set(1, 'things', 3, 'other', 600)
+
+        self.cache.invalidate(1, 'things', 2)
+        self.assertEquals(self.cache.get(1, 'things', 2), None)
+        self.assertEquals(self.cache.get(1, 'things', 3), 'other')
+        self.assertTrue(self.cache.is_hot(1, 'things', 2))
+        self.assertTrue(self.cache.is_hot(1, 'things'))
+        self.assertFalse(self.cache.is_hot(2, 'things'))
+
+        # Nothing is cached while the resource is hot
+        self.cache.set(1, 'things', 2, 'value', 600)
+        self.assertEquals(self.cache.get(1, 'things', 2), None)
+
+        window = cfg.CONF['cache']['hot_window']
+        mock_time.time.return_value = 100 + window + 1
+        self.assertFalse(self.cache.is_hot(1, 'things', 2))
+        self.assertEquals(self.cache.hot_until(1, 'things', 2),
+                          100 + window)
+        self.cache.set(1, 'things', 2, 'value', 600)
+        self.assertEquals(self.cache.get(1, 'things', 2), 'value')
+
+    @patch('jumpgate.common.cache.time')
+    def test_invalidate_for_every_user_of_tenant(self, mock_time):
+        mock_time.time.return_value = 100
+        self.cache.set('1/a', 'things', 2, 'value', 600)
+        self.cache.set('1/b', 'things', 2, 'value', 600)
+        self.cache.set('3/c', 'things', 2, 'value', 600)
+
+        mock_time.time.return_value = 101
+        self.cache.invalidate('1/a', 'things', 2)
+        self.assertTrue(self.cache.is_hot('1/b', 'things', 2))
+        self.assertTrue(self.cache.is_hot('1/b', 'things'))
+        self.assertEquals(self.cache.get('3/c', 'things', 2), 'value')
+
+        # Copies cached before the change are not served once it settled
+        window = cfg.CONF['cache']['hot_window']
+        mock_time.time.return_value = 101 + window + 1
+        self.assertEquals(self.cache.get('1/b', 'things', 2), None)
+
+    @patch('jumpgate.common.cache.time')
+    def test_old_changes_are_forgotten(self, mock_time):
+        mock_time.time.return_value = 100
+        self.cache.invalidate(1, 'things', 2)
+        mock_time.time.return_value = 100 + 2 * cache._HOT_RETENTION
+        self.cache.invalidate(1, 'things', 3)
+        self.assertEquals(self.cache.hot_until(1, 'things', 2), 0)
@@ -0,0 +1,195 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import mock
+from six.moves import socketserver
+
+from jumpgate.common import cache
+from jumpgate.common import cache_backends
+
+
+class FakeMemcached(socketserver.StreamRequestHandler):
+    '''Serves the commands of the text protocol used by the backend'''
+
+    def handle(self):
+        data = self.server.data
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.split()
+            if parts[0] == b'get':
+                for key in parts[1:]:
+                    if key in data:
+                        self.wfile.write(b'VALUE ' + key + b' 0 ' +
+                                         str(len(data[key])).encode() +
+                                         b'\r\n' + data[key] + b'\r\n')
+                self.wfile.write(b'END\r\n')
+            elif parts[0] == b'set':
+                value = self.rfile.read(int(parts[4]) + 2)[:-2]
+                data[parts[1]] = value
+                self.wfile.write(b'STORED\r\n')
+            elif parts[0] in (b'incr', b'decr'):
+                if parts[1] not in data:
+                    self.wfile.write(b'NOT_FOUND\r\n')
+                    continue
+                delta = int(parts[2]) * (1 if parts[0] == b'incr' else -1)
+                data[parts[1]] = str(max(int(data[parts[1]]) + delta,
+                                         0)).encode()
+                self.wfile.write(data[parts[1]] + b'\r\n')
+            elif parts[0] == b'add':
+                value = self.rfile.read(int(parts[4]) + 2)[:-2]
+                if parts[1] in data:
+                    self.wfile.write(b'NOT_STORED\r\n')
+                else:
+                    data[parts[1]] = value
+                    self.wfile.write(b'STORED\r\n')
+            elif parts[0] == b'touch':
+                self.server.touched.append(parts[1:])
+                self.wfile.write(b'TOUCHED\r\n' if parts[1] in data
+                                 else b'NOT_FOUND\r\n')
+            elif parts[0] == b'delete':
+                found = data.pop(parts[1], None) is not None
+                self.wfile.write(b'DELETED\r\n' if found
+                                 else b'NOT_FOUND\r\n')
+            elif parts[0] == b'flush_all':
+                data.clear()
+                self.wfile.write(b'OK\r\n')
+
+
+class BackendTests(object):
+
+    def test_set_get_delete(self):
+        self.backend.set('a', {'value': [1, 2]}, 60)
+        self.assertEquals(self.backend.get('a'), {'value': [1, 2]})
+        self.assertEquals(self.backend.get('b'), None)
+
+        self.backend.delete('a')
+        self.assertEquals(self.backend.get('a'), None)
+
+    def test_incr(self):
+        self.assertEquals(self.backend.incr('n', 2, 60), 2)
+        self.assertEquals(self.backend.incr('n', 1, 60), 3)
+        self.assertEquals(self.backend.incr('n', -5, 60), 0)
+        self.assertEquals(self.backend.incr('m', -1, 60), 0)
+
+    @mock.patch('jumpgate.common.cache_backends.time')
+    def test_incr_refreshes_expiry(self, mock_time):
+        mock_time.time.return_value = 100
+        self.backend.incr('n', 1, 60)
+        mock_time.time.return_value = 150
+        self.backend.incr('n', 1, 60)
+        mock_time.time.return_value = 200
+        self.assertEquals(self.backend.incr('n', 1, 60), 3)
+        mock_time.time.return_value = 261
+        self.assertEquals(self.backend.incr('n', 1, 60), 1)
+
+    def test_clear(self):
+        self.backend.set('a', 1, 60)
+        self.backend.clear()
+        self.assertEquals(self.backend.get('a'), None)
+
+
+class TestMemoryBackend(BackendTests, unittest.TestCase):
+
+    def setUp(self):
+        self.backend = cache_backends.MemoryBackend(max_entries=2)
+
+    def test_least_recently_used_is_evicted(self):
+        self.backend.set('a', 1, 60)
+        self.backend.set('b', 2, 60)
+        self.backend.get('a')
+        self.backend.set('c', 3, 60)
+        self.assertEquals(self.backend.get('a'), 1)
+        self.assertEquals(self.backend.get('b'), None)
+
+    def test_expired(self):
+        self.backend.set('a', 1, -1)
+        self.assertEquals(self.backend.get('a'), None)
+
+
+class TestSharedMemoryBackend(BackendTests, unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.path = os.path.join(tmp_dir, 'cache')
+        self.backend = cache_backends.SharedMemoryBackend(self.path,
+                                                          64 * 1024, 512)
+
+    def test_shared_between_mappings(self):
+        other = cache_backends.SharedMemoryBackend(self.path, 64 * 1024, 512)
+        self.backend.set('a', 'value', 60)
+        self.assertEquals(other.get('a'), 'value')
+
+    def test_large_values_are_not_cached(self):
+        self.backend.set('a', 'x' * 1024, 60)
+        self.assertEquals(self.backend.get('a'), None)
+
+    def test_expired(self):
+        self.backend.set('a', 1, -1)
+        self.assertEquals(self.backend.get('a'), None)
+
+
+class TestMemcachedBackend(BackendTests, unittest.TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                                      FakeMemcached)
+        self.server.daemon_threads = True
+        self.server.data = {}
+        self.server.touched = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.backend = cache_backends.MemcachedBackend(
+            ['127.0.0.1:%d' % self.server.server_address[1]])
+
+    def test_incr_refreshes_expiry(self):
+        self.backend.incr('n', 1, 60)
+        self.backend.incr('n', 1, 60)
+        key, = self.server.data.keys()
+        self.assertEquals(self.server.touched, [[key, b'60']] * 2)
+
+    def test_keys_are_hashed(self):
+        self.backend.set('a key with spaces', 1, 60)
+        key, = self.server.data.keys()
+        self.assertTrue(key.startswith(b'jumpgate:'))
+        self.assertFalse(b' ' in key)
+
+    def test_unreachable_server_is_a_miss(self):
+        self.server.shutdown()
+        self.server.server_close()
+        backend = cache_backends.MemcachedBackend(
+            ['127.0.0.1:%d' % self.server.server_address[1]], timeout=0.1)
+        backend.set('a', 1, 60)
+        self.assertEquals(backend.get('a'), None)
+
+
+class TestSharedResourceCache(unittest.TestCase):
+
+    def test_changes_are_seen_by_other_workers(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, 'cache')
+        worker1 = cache.ResourceCache(
+            cache_backends.SharedMemoryBackend(path, 64 * 1024, 512))
+        worker2 = cache.ResourceCache(
+            cache_backends.SharedMemoryBackend(path, 64 * 1024, 512))
+
+        worker1.set(1, 'things', 2, {'id': 2}, 60)
+        self.assertEquals(worker2.get(1, 'things', 2), {'id': 2})
+
+        worker2.invalidate(1, 'things', 2)
+        self.assertEquals(worker1.get(1, 'things', 2), None)
+        self.assertTrue(worker1.is_hot(1, 'things', 2))
+        self.assertTrue(worker1.is_hot(1, 'things'))
+
+        worker1.set(1, 'things', 2, {'id': 2}, 60)
+        self.assertEquals(worker2.get(1, 'things', 2), None)
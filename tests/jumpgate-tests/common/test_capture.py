@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from falcon.testing import helpers
+import falcon
+import mock
+from oslo.config import cfg
+
+from jumpgate.common import capture
+from jumpgate.common.hooks import capture as capture_hooks
+
+
+class CaptureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'capture.jsonl')
+        self.override('path', self.path)
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'capture')
+        self.addCleanup(cfg.CONF.clear_override, name, 'capture')
+
+    def read_records(self):
+        for handler in capture.get_logger().handlers:
+            handler.flush()
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def make_request(self, path, query_string='', method='GET', body=''):
+        req = falcon.Request(helpers.create_environ(
+            path=path, query_string=query_string, method=method, body=body))
+        app = mock.MagicMock()
+        app.route_endpoint.return_value = (
+            'v2_token', '/v2.0/tenants/{tenant_id}/tokens/{token_id}')
+        client = mock.MagicMock(calls=['Account.getCurrentUser'])
+        req.env.update({'jumpgate.app': app, 'sl_client': client,
+                        'jumpgate.start_time': 100})
+        return req
+
+
+class TestSanitize(CaptureTestCase):
+
+    def test_sanitize_path(self):
+        template = '/v2.0/tenants/{tenant_id}/tokens/{token_id}/{user_id}'
+        self.assertEquals(
+            capture.sanitize_path('/v2.0/tenants/1/tokens/abc/2', template),
+            '/v2.0/tenants/{tenant_id}/tokens/{token_id}/2')
+        self.assertEquals(
+            capture.sanitize_path('/v2.0/tenants/1/tokens/abc.json',
+                                  '/v2.0/tenants/{tenant_id}/tokens/'
+                                  '{token_id}'),
+            '/v2.0/tenants/{tenant_id}/tokens/{token_id}.json')
+        self.assertEquals(capture.sanitize_path('/unrouted', None),
+                          '/unrouted')
+
+    def test_sanitize_query(self):
+        self.assertEquals(
+            capture.sanitize_query('limit=10&api_key=abc&Password=x&name='),
+            {'limit': '10', 'api_key': capture.REDACTED,
+             'Password': capture.REDACTED, 'name': ''})
+
+
+class TestCapture(CaptureTestCase):
+
+    @mock.patch('time.time', mock.MagicMock(return_value=100.5))
+    def test_make_record(self):
+        req = self.make_request('/v2.0/tenants/1/tokens/abc',
+                                'token=abc&limit=1', method='POST',
+                                body='{"a": 1}')
+        self.assertEquals(capture.make_record(req, 201), {
+            'time': 100,
+            'method': 'POST',
+            'route': 'v2_token',
+            'path': '/v2.0/tenants/{tenant_id}/tokens/{token_id}',
+            'query': {'token': capture.REDACTED, 'limit': '1'},
+            'body_bytes': 8,
+            'status': 201,
+            'latency': 0.5,
+            'sl_calls': ['Account.getCurrentUser'],
+        })
+
+    def test_hook_writes_records(self):
+        req = self.make_request('/v2.0/tenants/1/tokens/abc')
+        resp = falcon.Response()
+        resp.status = falcon.HTTP_404
+        capture_hooks.capture_request(req, resp)
+        resp.status = 200
+        capture_hooks.capture_request(req, resp)
+
+        records = self.read_records()
+        self.assertEquals([record['status'] for record in records],
+                          [404, 200])
+        self.assertNotIn('abc', json.dumps(records))
+
+    @mock.patch('random.random', mock.MagicMock(return_value=0.5))
+    def test_sampling(self):
+        self.override('sample_rate', 0.4)
+        capture.capture(self.make_request('/v2.0/tenants/1/tokens/a'), 200)
+        self.override('sample_rate', 0.6)
+        capture.capture(self.make_request('/v2.0/tenants/1/tokens/b'), 200)
+        self.assertEquals(len(self.read_records()), 1)
+
+    def test_rotation(self):
+        self.override('max_bytes', 1000)
+        self.override('backup_count', 2)
+        for _ in range(20):
+            capture.capture(self.make_request('/v2.0/tenants/1/tokens/a'),
+                            200)
+        self.assertEquals(sorted(os.listdir(self.directory)),
+                          ['capture.jsonl', 'capture.jsonl.1',
+                           'capture.jsonl.2'])
+
+    def test_failures_are_logged(self):
+        req = self.make_request('/v2.0/tenants/1/tokens/a')
+        req.env['jumpgate.app'].route_endpoint.side_effect = ValueError
+        with mock.patch.object(capture, 'LOG') as log:
+            capture.capture(req, 200)
+        self.assertTrue(log.exception.called)
@@ -0,0 +1,163 @@
+import threading
+import time
+import unittest
+
+import falcon
+from falcon.testing import helpers
+import mock
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import deadline
+from jumpgate.common import dispatcher
+from jumpgate.common import exceptions
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import resilience
+from jumpgate import compute
+
+
+class DeadlineTestCase(unittest.TestCase):
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'deadline')
+        self.addCleanup(cfg.CONF.clear_override, name, 'deadline')
+
+
+class TestDeadlineHook(DeadlineTestCase):
+
+    def setUp(self):
+        self.app = mock.MagicMock()
+        self.app.route_nickname.return_value = 'v2_servers'
+        self.override('default_timeout', 60)
+        self.override('route_timeouts', {'v2_servers': '10'})
+
+    def get_timeout(self, headers=None, remote_addr='10.1.2.3'):
+        env = helpers.create_environ(path='/v2/1/servers', headers=headers)
+        env['REMOTE_ADDR'] = remote_addr
+        env['jumpgate.app'] = self.app
+        return deadline.get_timeout(falcon.Request(env))
+
+    def test_route_timeout(self):
+        self.assertEquals(self.get_timeout(), 10)
+        self.app.route_nickname.assert_called_once_with('/v2/1/servers')
+
+        self.app.route_nickname.return_value = 'v2_images'
+        self.assertEquals(self.get_timeout(), 60)
+
+    def test_route_timeouts_of_compute_endpoints(self):
+        disp = dispatcher.Dispatcher(mount='/compute')
+        compute.add_endpoints(disp)
+        for nickname in disp.get_unused_endpoints():
+            disp.set_handler(nickname, mock.MagicMock())
+        self.app.route_nickname.side_effect = disp.match
+        self.override('route_timeouts', {'v2_servers_detail': '30',
+                                         'v2_server_action': '120'})
+
+        for path, timeout in [('/compute/v2/1/servers/detail', 30),
+                              ('/compute/v2/1/servers/2/action', 120),
+                              ('/compute/v2/1/servers/2', 60)]:
+            env = helpers.create_environ(path=path)
+            env['jumpgate.app'] = self.app
+            self.assertEquals(deadline.get_timeout(falcon.Request(env)),
+                              timeout, path)
+
+    def test_header_shortens(self):
+        self.assertEquals(self.get_timeout({'X-Request-Timeout': '2.5'}), 2.5)
+        self.assertEquals(self.get_timeout({'X-Request-Timeout': '30'}), 10)
+
+    def test_trusted_header_extends(self):
+        self.override('trusted_networks', ['10.0.0.0/8'])
+        self.assertEquals(self.get_timeout({'X-Request-Timeout': '30'}), 30)
+        self.assertEquals(self.get_timeout({'X-Request-Timeout': '30'},
+                                           remote_addr='192.168.0.1'), 10)
+
+    def test_invalid_header(self):
+        with self.assertRaises(exceptions.ResponseException) as ctx:
+            self.get_timeout({'X-Request-Timeout': 'soon'})
+        self.assertEquals(ctx.exception.code, 400)
+
+    def test_hook(self):
+        req = falcon.Request(helpers.create_environ())
+        deadline.hook_set_deadline(req, None, {})
+        self.assertAlmostEqual(req.env['jumpgate.deadline'],
+                               time.time() + 60, delta=5)
+
+        self.override('default_timeout', 0)
+        req = falcon.Request(helpers.create_environ())
+        deadline.hook_set_deadline(req, None, {})
+        self.assertFalse('jumpgate.deadline' in req.env)
+
+
+class TestClientDeadline(unittest.TestCase):
+
+    def setUp(self):
+        self.client = sl_client.Client(timeout=30)
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cfg.CONF.set_override('retry_attempts', 0, 'resilience')
+        self.addCleanup(cfg.CONF.clear_override, 'retry_attempts',
+                        'resilience')
+        patcher = mock.patch('SoftLayer.transports.make_xml_rpc_api_call')
+        self.api_call = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_deadline(self):
+        self.assertEquals(self.client.timeout, 30)
+        self.client.call('Account', 'getObject')
+        self.assertEquals(self.api_call.call_args[0][0].timeout, 30)
+
+    def test_timeout_is_remaining_time(self):
+        self.client.set_deadline(time.time() + 5)
+        self.client.call('Account', 'getObject')
+        self.assertTrue(4 < self.api_call.call_args[0][0].timeout <= 5)
+
+        self.client.set_deadline(time.time() + 60)
+        self.assertEquals(self.client.timeout, 30)
+
+    def test_deadline_passed(self):
+        self.client.set_deadline(time.time() - 1)
+        with self.assertRaises(exceptions.DeadlineExceeded) as ctx:
+            self.client.call('Account', 'getObject')
+        self.assertEquals(ctx.exception.code, 503)
+        self.assertFalse(self.api_call.called)
+
+    def test_call_cut_short(self):
+        def timed_out(request):
+            self.client.set_deadline(time.time() - 1)
+            raise SoftLayer.TransportError(0, 'timed out')
+        self.api_call.side_effect = timed_out
+        self.client.set_deadline(time.time() + 1)
+
+        with self.assertRaises(exceptions.DeadlineExceeded) as ctx:
+            self.client.call('Account', 'getObject')
+        self.assertEquals(ctx.exception.code, 504)
+
+    def test_transport_error_before_deadline(self):
+        self.api_call.side_effect = SoftLayer.TransportError(0, 'refused')
+        self.client.set_deadline(time.time() + 60)
+        self.assertRaises(SoftLayer.TransportError, self.client.call,
+                          'Account', 'getObject')
+
+
+class TestClientCalls(unittest.TestCase):
+
+    def setUp(self):
+        self.client = sl_client.Client()
+        patcher = mock.patch('SoftLayer.transports.make_xml_rpc_api_call')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_calls_of_request_thread(self):
+        self.client.call('Account', 'getObject')
+        self.client.call('Virtual_Guest', 'getObject', id=1)
+        self.assertEquals(self.client.calls,
+                          ['Account.getObject', 'Virtual_Guest.getObject'])
+
+    def test_background_calls_not_recorded(self):
+        thread = threading.Thread(target=self.client.call,
+                                  args=('Account', 'getVirtualGuests'))
+        thread.start()
+        thread.join()
+        self.client.call('Account', 'getObject')
+        self.assertEquals(self.client.calls, ['Account.getObject'])
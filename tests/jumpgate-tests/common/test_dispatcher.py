@@ -52,6 +52,48 @@ class TestDispatcher(unittest.TestCase):
             ('/mountpoint/path0/to/{tenant_id}', handler),
         ])
 
+    def test_match(self):
+        self.disp.add_endpoint('servers', '/v2/{tenant_id}/servers')
+        self.disp.add_endpoint('server', '/v2/{tenant_id}/servers/{id}')
+        self.disp.add_endpoint('unused', '/v2/{tenant_id}/unused')
+        self.disp.set_handler('servers', MagicMock())
+        self.disp.set_handler('server', MagicMock())
+
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers'),
+                          'servers')
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers.json'),
+                          'servers')
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers/2'),
+                          'server')
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers/2/x'),
+                          None)
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/unused'), None)
+
+    def test_match_prefers_endpoints_added_last(self):
+        # Falcon routes /servers/detail to the route added after /{id}
+        self.disp.add_endpoint('server', '/v2/{tenant_id}/servers/{id}')
+        self.disp.add_endpoint('detail', '/v2/{tenant_id}/servers/detail')
+        self.disp.set_handler('server', MagicMock())
+        self.disp.set_handler('detail', MagicMock())
+
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers/detail'),
+                          'detail')
+        self.assertEquals(self.disp.match('/mountpoint/v2/1/servers/2'),
+                          'server')
+
+    def test_resolve(self):
+        self.disp.add_endpoint('server', '/v2/{tenant_id}/servers/{id}')
+        self.disp.add_endpoint('detail', '/v2/{tenant_id}/servers/detail')
+        self.disp.set_handler('server', MagicMock())
+        self.disp.set_handler('detail', MagicMock())
+
+        # Like falcon, endpoints added last are tried first
+        self.assertEquals(self.disp.resolve('/mountpoint/v2/1/servers/detail'),
+                          ('detail', {'tenant_id': '1'}))
+        self.assertEquals(self.disp.resolve('/mountpoint/v2/1/servers/2.json'),
+                          ('server', {'tenant_id': '1', 'id': '2'}))
+        self.assertEquals(self.disp.resolve('/mountpoint/v2/1'), (None, None))
+
 
 class TestDispatcherUrls(unittest.TestCase):
     def setUp(self):
@@ -89,3 +131,37 @@ class TestDispatcherUrls(unittest.TestCase):
             req, 'instance_detail', instance_id='9876')
 
         self.assertEquals(path, 'http://some_host/path/to/1234/9876')
+
+    def test_get_endpoint_path_template_quirks(self):
+        self.disp.add_endpoint('pair', '/pair/{id}/{id}/{other}/100%')
+        req = MagicMock()
+        req.env = {}
+
+        self.assertEquals(self.disp.get_endpoint_path(req, 'pair', id=7),
+                          '/pair/7/7/{other}/100%')
+        self.assertEquals(self.disp.get_endpoint_path(req, 'unknown'), '')
+
+    def test_get_endpoint_path_tenant_id_from_env(self):
+        req = MagicMock()
+        req.env = {'tenant_id': '1234'}
+
+        path = self.disp.get_endpoint_path(req, 'user_page',
+                                           tenant_id='5678')
+
+        self.assertEquals(path, '/path/to/1234')
+
+    def test_get_endpoint_url_base_url_cached(self):
+        req = MagicMock()
+        req.env = {'tenant_id': '1234'}
+        req.protocol = 'https'
+        req.get_header.return_value = 'some_host'
+        req.app = '/app'
+
+        self.disp.get_endpoint_url(req, 'user_page')
+        path = self.disp.get_endpoint_url(
+            req, 'instance_detail', instance_id='9876')
+
+        self.assertEquals(path, 'https://some_host/app/path/to/1234/9876')
+        self.assertEquals(req.env['jumpgate.base_url'],
+                          'https://some_host/app')
+        req.get_header.assert_called_once_with('host')
@@ -0,0 +1,143 @@
+import threading
+import time
+import unittest
+
+import mock
+from oslo.config import cfg
+
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import hedging
+
+
+class HedgingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        for name, value in [('_trackers', {}),
+                            ('_budget', hedging.HedgeBudget()),
+                            ('stats', {'calls': 0, 'hedges': 0, 'wins': 0})]:
+            patcher = mock.patch.object(hedging, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.override('enabled', True)
+        self.override('min_samples', 4)
+        self.override('min_delay', 0.01)
+        self.override('budget', 1.0)
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'hedging')
+        self.addCleanup(cfg.CONF.clear_override, name, 'hedging')
+
+    def train(self, name, duration=0.01, count=4):
+        tracker = hedging.get_tracker(name)
+        for _ in range(count):
+            tracker.record(duration)
+        return tracker
+
+
+class TestLatencyTracker(HedgingTestCase):
+
+    def test_delay(self):
+        tracker = self.train('Account.getObject', count=3)
+        self.assertEquals(tracker.delay(), None)
+
+        for duration in range(1, 101):
+            tracker.record(duration)
+        self.override('percentile', 90)
+        self.assertEquals(tracker.delay(), 90)
+
+    def test_min_delay(self):
+        self.override('min_delay', 0.5)
+        self.assertEquals(self.train('Account.getObject').delay(), 0.5)
+
+
+class TestHedgeBudget(unittest.TestCase):
+
+    def test_budget(self):
+        budget = hedging.HedgeBudget(burst=2)
+        self.assertFalse(budget.withdraw())
+        for _ in range(10):
+            budget.deposit(0.5)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+
+class TestHedgedCall(HedgingTestCase):
+
+    def setUp(self):
+        super(TestHedgedCall, self).setUp()
+        self.client = sl_client.Client()
+        self.deadlines = []
+        self.calls = 0
+
+    def call(self, slow):
+        def call(service, method, *args, **kwargs):
+            self.calls += 1
+            self.deadlines.append(self.client.get_deadline())
+            if slow.pop(0):
+                time.sleep(0.5)
+                return 'slow'
+            return 'fast'
+        return call
+
+    def test_should_hedge(self):
+        self.assertTrue(hedging.should_hedge('SoftLayer_Virtual_Guest',
+                                             'getObject'))
+        self.assertFalse(hedging.should_hedge('Virtual_Guest', 'getUsers'))
+        self.override('enabled', False)
+        self.assertFalse(hedging.should_hedge('Virtual_Guest', 'getObject'))
+
+    def test_not_trained(self):
+        result = hedging.hedged_call(self.client, self.call([False]),
+                                     'Virtual_Guest', 'getObject')
+        self.assertEquals(result, 'fast')
+        self.assertEquals(hedging.stats['hedges'], 0)
+
+    def test_hedge_wins(self):
+        self.train('Virtual_Guest.getObject')
+        deadline = time.time() + 30
+        self.client.set_deadline(deadline)
+
+        result = hedging.hedged_call(self.client, self.call([True, False]),
+                                     'Virtual_Guest', 'getObject', id=1)
+        self.assertEquals(result, 'fast')
+        self.assertEquals(self.calls, 2)
+        self.assertEquals(hedging.stats['hedges'], 1)
+        self.assertEquals(hedging.stats['wins'], 1)
+        # The deadline of the request reached the pool threads
+        self.assertEquals(self.deadlines, [deadline, deadline])
+
+    def test_no_budget(self):
+        self.train('Virtual_Guest.getObject')
+        self.override('budget', 0)
+
+        result = hedging.hedged_call(self.client, self.call([True]),
+                                     'Virtual_Guest', 'getObject')
+        self.assertEquals(result, 'slow')
+        self.assertEquals(self.calls, 1)
+
+    def test_error_then_success(self):
+        self.train('Virtual_Guest.getObject')
+        event = threading.Event()
+
+        def call(service, method):
+            if not event.is_set():
+                event.set()
+                time.sleep(0.1)
+                raise ValueError('boom')
+            return 'hedge'
+
+        self.assertEquals(hedging.hedged_call(self.client, call,
+                                              'Virtual_Guest', 'getObject'),
+                          'hedge')
+
+    def test_client_hedges(self):
+        with mock.patch.object(hedging, 'hedged_call',
+                               return_value={'id': 1}) as hedged_call:
+            with mock.patch('SoftLayer.transports.make_xml_rpc_api_call'):
+                self.assertEquals(
+                    self.client.call('Virtual_Guest', 'getObject', id=1),
+                    {'id': 1})
+        hedged_call.assert_called_once_with(self.client, self.client._call,
+                                            'Virtual_Guest', 'getObject',
+                                            id=1)
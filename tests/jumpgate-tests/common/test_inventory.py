@@ -0,0 +1,124 @@
+import unittest
+
+from mock import MagicMock, patch
+from oslo.config import cfg
+
+from jumpgate.common.sl import inventory
+
+
+class TestInventoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = inventory.InventoryStore(':memory:')
+
+    def test_replace_and_list(self):
+        self.store.replace('1/2', 'things', [{'id': 2}, {'id': 1}])
+        self.assertEquals(self.store.list('1/2', 'things'),
+                          [{'id': 2}, {'id': 1}])
+        self.assertEquals(self.store.list('1/3', 'things'), [])
+
+        self.store.replace('1/2', 'things', [{'id': 3}])
+        self.assertEquals(self.store.list('1/2', 'things'), [{'id': 3}])
+
+    def test_get_and_delete(self):
+        self.store.replace('1/2', 'things', [{'id': 2, 'name': 'two'}])
+        self.assertEquals(self.store.get('1/2', 'things', '2'),
+                          {'id': 2, 'name': 'two'})
+
+        self.store.delete('1/2', 'things', 2)
+        self.assertEquals(self.store.get('1/2', 'things', 2), None)
+
+    def test_is_fresh(self):
+        self.assertFalse(self.store.is_fresh('1/2', 'things', 60))
+        self.store.replace('1/2', 'things', [], synced_at=1)
+        self.assertFalse(self.store.is_fresh('1/2', 'things', 60))
+        self.store.replace('1/2', 'things', [])
+        self.assertTrue(self.store.is_fresh('1/2', 'things', 60))
+
+
+class TestInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.req = MagicMock()
+        self.req.env = {'auth': {'tenant_id': '1', 'user_id': '2'},
+                        'sl_client': MagicMock()}
+        self.store = inventory.InventoryStore(':memory:')
+        self.loader = MagicMock(return_value=[{'id': 5}])
+
+        patches = [
+            patch.dict(inventory.RESOURCES, {'things': self.loader},
+                       clear=True),
+            patch.dict(inventory._synchronizers.workers, clear=True),
+            patch.object(inventory, 'get_store', return_value=self.store),
+            patch.object(inventory.Synchronizer, 'start'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        cfg.CONF.set_override('enabled', True, 'inventory')
+        self.addCleanup(cfg.CONF.clear_override, 'enabled', 'inventory')
+
+    def test_disabled(self):
+        cfg.CONF.set_override('enabled', False, 'inventory')
+        self.assertEquals(inventory.list_resources(self.req, 'things'), None)
+        self.assertEquals(inventory._synchronizers.workers, {})
+
+    def test_unauthenticated_request(self):
+        self.req.env = {}
+        self.assertEquals(inventory.list_resources(self.req, 'things'), None)
+
+    def test_not_synchronized_yet(self):
+        self.assertEquals(inventory.list_resources(self.req, 'things'), None)
+        self.assertEquals(list(inventory._synchronizers.workers), ['1/2'])
+        inventory.Synchronizer.start.assert_called_once_with()
+
+    def test_served_from_mirror(self):
+        inventory.activate(self.req)
+        inventory._synchronizers.workers['1/2'].run_once()
+
+        self.loader.assert_called_once_with(self.req.env['sl_client'])
+        self.assertEquals(inventory.list_resources(self.req, 'things'),
+                          [{'id': 5}])
+        self.assertEquals(inventory.get_resource(self.req, 'things', 5),
+                          {'id': 5})
+        self.assertEquals(inventory.Synchronizer.start.call_count, 1)
+
+    def test_stale_mirror_is_ignored(self):
+        self.store.replace('1/2', 'things', [{'id': 5}], synced_at=1)
+        self.assertEquals(inventory.list_resources(self.req, 'things'), None)
+        self.assertEquals(inventory.get_resource(self.req, 'things', 5),
+                          None)
+
+    @patch('jumpgate.common.cache.RESOURCES')
+    def test_mirror_older_than_a_change_is_ignored(self, mock_cache):
+        inventory.activate(self.req)
+        inventory._synchronizers.workers['1/2'].run_once()
+        synced_at = self.store.synced_at('1/2', 'things')
+
+        mock_cache.hot_until.return_value = synced_at + 1
+        self.assertEquals(inventory.list_resources(self.req, 'things'), None)
+        self.assertEquals(inventory.get_resource(self.req, 'things', 5),
+                          None)
+        mock_cache.hot_until.assert_called_with('1/2', 'things', 5)
+
+        mock_cache.hot_until.return_value = synced_at
+        self.assertEquals(inventory.list_resources(self.req, 'things'),
+                          [{'id': 5}])
+
+    def test_failing_loader_keeps_previous_data(self):
+        inventory.activate(self.req)
+        synchronizer = inventory._synchronizers.workers['1/2']
+        synchronizer.run_once()
+
+        self.loader.side_effect = Exception('boom')
+        synchronizer.run_once()
+        self.assertEquals(self.store.list('1/2', 'things'), [{'id': 5}])
+
+    def test_idle_worker_stops(self):
+        inventory.activate(self.req)
+        synchronizer = inventory._synchronizers.workers['1/2']
+        synchronizer.idle_timeout = -1
+        synchronizer._run()
+
+        self.assertTrue(synchronizer.stopped.is_set())
+        self.assertFalse(self.loader.called)
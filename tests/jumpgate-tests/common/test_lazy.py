@@ -0,0 +1,90 @@
+import unittest
+
+import falcon
+from mock import MagicMock
+
+from jumpgate.common.dispatcher import Dispatcher
+from jumpgate.common.lazy import LazyService
+
+
+class ServerResource(object):
+    def on_get(self, req, resp, tenant_id, server_id):
+        resp.status = falcon.HTTP_200
+        resp.body = {'server': server_id}
+
+
+class TestLazyService(unittest.TestCase):
+    def setUp(self):
+        self.disp = Dispatcher(mount='/compute')
+        self.disp.add_endpoint('v2_server',
+                               '/v2/{tenant_id}/servers/{server_id}')
+        self.disp.add_endpoint('v2_unused', '/v2/{tenant_id}/unused')
+        self.resource = ServerResource()
+
+        self.module = MagicMock()
+        self.module.setup_routes.side_effect = (
+            lambda app, disp: disp.set_handler('v2_server', self.resource))
+
+        self.app = MagicMock()
+        self.before, self.after = MagicMock(), MagicMock()
+        self.app.before_hooks = [self.before]
+        self.app.after_hooks = [self.after]
+        self.default = MagicMock()
+        self.sink = LazyService(self.app, 'compute', self.disp, self.module,
+                                self.default)
+
+    def call(self, method, path):
+        req, resp = MagicMock(), MagicMock()
+        req.method = method
+        req.path = path
+        self.sink(req, resp)
+        return req, resp
+
+    def test_prefix(self):
+        self.assertTrue(self.sink.prefix.match('/compute'))
+        self.assertTrue(self.sink.prefix.match('/compute/v2'))
+        self.assertTrue(self.sink.prefix.match('/compute.json'))
+        self.assertFalse(self.sink.prefix.match('/computer'))
+        self.assertFalse(self.sink.prefix.match('/image/compute'))
+
+    def test_routes_loaded_once(self):
+        self.assertFalse(self.module.setup_routes.called)
+
+        self.call('GET', '/compute/v2/1/servers/2')
+        self.call('GET', '/compute/v2/1/servers/3')
+
+        self.module.setup_routes.assert_called_once_with(self.app, self.disp)
+
+    def test_call(self):
+        req, resp = self.call('GET', '/compute/v2/1/servers/2.json')
+
+        self.assertEqual(resp.status, falcon.HTTP_200)
+        self.assertEqual(resp.body, {'server': '2'})
+        self.before.assert_called_once_with(
+            req, resp, {'tenant_id': '1', 'server_id': '2'})
+        self.after.assert_called_once_with(req, resp)
+        self.assertFalse(self.default.called)
+
+    def test_call_not_routed(self):
+        req, resp = self.call('GET', '/compute/v2/1/unused')
+
+        self.default.assert_called_once_with(req, resp)
+        self.assertFalse(self.before.called)
+
+    def test_call_method_not_allowed(self):
+        req, resp = self.call('DELETE', '/compute/v2/1/servers/2')
+
+        self.assertEqual(resp.status, falcon.HTTP_405)
+        resp.set_header.assert_called_once_with('Allow', 'GET, OPTIONS')
+        self.assertFalse(self.before.called)
+
+    def test_call_options(self):
+        req, resp = self.call('OPTIONS', '/compute/v2/1/servers/2')
+
+        self.assertEqual(resp.status, falcon.HTTP_204)
+        resp.set_header.assert_called_once_with('Allow', 'GET, OPTIONS')
+
+    def test_call_unknown_method(self):
+        req, resp = self.call('BREW', '/compute/v2/1/servers/2')
+
+        self.assertEqual(resp.status, falcon.HTTP_400)
@@ -0,0 +1,143 @@
+import unittest
+
+import mock
+from oslo.config import cfg
+
+from jumpgate.common import cache_backends
+from jumpgate.common import exceptions
+from jumpgate.common.hooks import limits as limit_hooks
+from jumpgate.common import limits
+from jumpgate.common.sl import client as sl_client
+
+
+class LimitsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(limits, '_backend',
+                                    cache_backends.MemoryBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'limits')
+        self.addCleanup(cfg.CONF.clear_override, name, 'limits')
+
+
+class TestConcurrentRequests(LimitsTestCase):
+
+    def setUp(self):
+        super(TestConcurrentRequests, self).setUp()
+        self.override('max_concurrent_requests', 2)
+
+    def test_disabled(self):
+        self.override('max_concurrent_requests', 0)
+        self.assertFalse(limits.acquire_request_slot('1'))
+
+    def test_limit(self):
+        self.assertTrue(limits.acquire_request_slot('1'))
+        self.assertTrue(limits.acquire_request_slot('1'))
+        self.assertTrue(limits.acquire_request_slot('2'))
+
+        with self.assertRaises(exceptions.OverLimit) as ctx:
+            limits.acquire_request_slot('1')
+        self.assertEquals(ctx.exception.code, 429)
+        self.assertEquals(ctx.exception.retry_after, 1)
+
+        limits.release_request_slot('1')
+        self.assertTrue(limits.acquire_request_slot('1'))
+
+    def test_hooks(self):
+        req = mock.MagicMock()
+        req.env = {'auth': {'tenant_id': '1'}}
+        for _ in range(2):
+            limit_hooks.limit_concurrent_requests(req, None, {})
+        self.assertRaises(exceptions.OverLimit,
+                          limit_hooks.limit_concurrent_requests,
+                          mock.MagicMock(env={'tenant_id': '1'}), None, {})
+
+        limit_hooks.release_concurrent_requests(req, None)
+        self.assertFalse('jumpgate.request_slot' in req.env)
+        limit_hooks.limit_concurrent_requests(req, None, {})
+
+    def test_unauthenticated_requests_are_not_limited(self):
+        req = mock.MagicMock(env={})
+        for _ in range(3):
+            limit_hooks.limit_concurrent_requests(req, None, {})
+        self.assertFalse('jumpgate.request_slot' in req.env)
+
+
+class TestSLAPICalls(LimitsTestCase):
+
+    def setUp(self):
+        super(TestSLAPICalls, self).setUp()
+        self.override('slapi_calls_per_second', 2)
+        self.override('slapi_burst', 10)
+
+    @mock.patch('jumpgate.common.limits.time')
+    def test_budget(self, mock_time):
+        # Windows of 10 calls every 5 seconds
+        mock_time.time.return_value = 101
+        for _ in range(10):
+            limits.consume_slapi_call('1')
+        limits.consume_slapi_call('2')
+
+        with self.assertRaises(exceptions.OverLimit) as ctx:
+            limits.consume_slapi_call('1')
+        self.assertEquals(ctx.exception.retry_after, 5)
+
+        # The previous window still counts at the start of the next one
+        mock_time.time.return_value = 105
+        with self.assertRaises(exceptions.OverLimit) as ctx:
+            limits.consume_slapi_call('1')
+        self.assertEquals(ctx.exception.retry_after, 1)
+
+        mock_time.time.return_value = 105.5
+        limits.consume_slapi_call('1')
+
+    @mock.patch('jumpgate.common.limits.time')
+    def test_no_double_burst_across_windows(self, mock_time):
+        mock_time.time.return_value = 104.9
+        for _ in range(10):
+            limits.consume_slapi_call('1')
+
+        # Fixed windows would allow 10 more calls
+        mock_time.time.return_value = 105.1
+        for _ in range(3):
+            self.assertRaises(exceptions.OverLimit,
+                              limits.consume_slapi_call, '1')
+
+        # Rejected calls are not counted
+        mock_time.time.return_value = 110
+        for _ in range(10):
+            limits.consume_slapi_call('1')
+
+    @mock.patch('SoftLayer.Client.call')
+    def test_client(self, call):
+        self.override('slapi_burst', 1)
+        client = sl_client.Client()
+        client.tenant_id = '1'
+
+        client['Account'].getObject()
+        call.assert_called_once_with('Account', 'getObject')
+        self.assertRaises(exceptions.OverLimit,
+                          client['Account'].getObject)
+        self.assertEquals(call.call_count, 1)
+
+        # Calls without a tenant are not limited
+        sl_client.Client()['Account'].getObject()
+        self.assertEquals(call.call_count, 2)
+
+
+class TestOverLimit(unittest.TestCase):
+
+    def test_handle(self):
+        resp = mock.MagicMock()
+        exceptions.OverLimit.handle(
+            exceptions.OverLimit('Slow down', retry_after=3, code=429),
+            None, resp, {})
+
+        self.assertEquals(resp.status, 429)
+        self.assertEquals(resp.body, {'overLimit': {'code': '429',
+                                                    'message': 'Slow down',
+                                                    'retryAfter': '3'}})
+        resp.set_header.assert_called_once_with('Retry-After', '3')
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from oslo.config import cfg
+
+from jumpgate.common import reloader
+
+
+class TestReloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, 'file.json')
+        self.touch(100)
+        self.reloader = reloader.Reloader()
+
+    def touch(self, mtime):
+        with open(self.path, 'w') as f:
+            f.write('{}')
+        os.utime(self.path, (mtime, mtime))
+
+    def test_unchanged_file(self):
+        callback = mock.MagicMock()
+        self.reloader.watch(self.path, callback)
+        self.reloader.check()
+        self.assertFalse(callback.called)
+
+    def test_changed_file(self):
+        callback = mock.MagicMock()
+        self.reloader.watch(self.path, callback)
+        self.touch(200)
+
+        self.reloader.check()
+        self.reloader.check()
+        callback.assert_called_once_with(self.path)
+
+    def test_forced_reload(self):
+        callback = mock.MagicMock()
+        self.reloader.watch(self.path, callback)
+        self.reloader.check(force=True)
+        callback.assert_called_once_with(self.path)
+
+    def test_failing_callback(self):
+        failing = mock.MagicMock(side_effect=ValueError('bad file'))
+        callback = mock.MagicMock()
+        self.reloader.watch(self.path, failing)
+        self.reloader.watch(self.path, callback)
+        self.touch(200)
+
+        self.reloader.check()
+        callback.assert_called_once_with(self.path)
+
+    def test_missing_file(self):
+        callback = mock.MagicMock()
+        self.reloader.watch(self.path, callback)
+        os.remove(self.path)
+        self.reloader.check(force=True)
+        self.assertFalse(callback.called)
+
+    @mock.patch('threading.Thread')
+    def test_sighup(self, thread):
+        self.reloader._handle_sighup(1, None)
+        thread.assert_called_once_with(target=self.reloader.check,
+                                       kwargs={'force': True})
+        thread.return_value.start.assert_called_once_with()
+
+    @mock.patch('signal.signal')
+    def test_start_leaves_sighup_alone(self, signal):
+        self.reloader.start()
+        self.assertFalse(signal.called)
+
+    @mock.patch.object(reloader, 'RELOADER')
+    def test_sighup_only_when_asked(self, mock_reloader):
+        cfg.CONF.set_override('reload_on_sighup', True, 'reload')
+        self.addCleanup(cfg.CONF.clear_override, 'reload_on_sighup',
+                        'reload')
+        # Under a WSGI server
+        reloader.start()
+        mock_reloader.start.assert_called_with(0, False)
+        # From the jumpgate command
+        reloader.start(sighup=True)
+        mock_reloader.start.assert_called_with(0, True)
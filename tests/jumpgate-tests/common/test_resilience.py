@@ -0,0 +1,158 @@
+import unittest
+
+import mock
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import exceptions
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import resilience
+
+
+class ResilienceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.override('breaker_min_calls', 4)
+        self.override('breaker_error_rate', 0.5)
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'resilience')
+        self.addCleanup(cfg.CONF.clear_override, name, 'resilience')
+
+
+class TestTransientErrors(unittest.TestCase):
+
+    def test_is_transient(self):
+        self.assertTrue(resilience.is_transient(
+            SoftLayer.TransportError(0, 'connection refused')))
+        self.assertTrue(resilience.is_transient(
+            SoftLayer.TransportError(502, 'bad gateway')))
+        self.assertFalse(resilience.is_transient(
+            SoftLayer.TransportError(404, 'not found')))
+        self.assertFalse(resilience.is_transient(
+            SoftLayer.SoftLayerAPIError('SoftLayer_Exception_NotFound', '')))
+        self.assertFalse(resilience.is_transient(
+            exceptions.DeadlineExceeded('late', code=504)))
+        self.assertFalse(resilience.is_transient(
+            exceptions.DeadlineExceeded('late', code=503)))
+
+    def test_retry_delay(self):
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            delays = [resilience.retry_delay(attempt)
+                      for attempt in range(6)]
+        self.assertEquals(delays, [0.1, 0.2, 0.4, 0.8, 1.6, 2.0])
+
+
+class TestCircuitBreaker(ResilienceTestCase):
+
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        self.breaker = resilience.get_breaker('Account', 'getObject')
+
+    def test_opens_on_error_rate(self):
+        for success in (True, False, True):
+            self.breaker.record(success)
+        self.assertEquals(self.breaker.state, resilience.CLOSED)
+
+        self.breaker.record(False)
+        self.assertEquals(self.breaker.state, resilience.OPEN)
+        with self.assertRaises(exceptions.ServiceUnavailable) as ctx:
+            self.breaker.before_call()
+        self.assertEquals(ctx.exception.code, 503)
+        self.assertTrue(ctx.exception.retry_after > 0)
+
+        stats = resilience.get_breaker_stats()['Account.getObject']
+        self.assertEquals(stats, {'state': 'open', 'calls': 4,
+                                  'failures': 2, 'rejected': 1,
+                                  'opened': 1})
+
+    def test_half_open(self):
+        self.override('breaker_reset_timeout', 0)
+        for _ in range(4):
+            self.breaker.record(False)
+
+        self.breaker.before_call()
+        self.assertEquals(self.breaker.state, resilience.HALF_OPEN)
+        # A single trial call at a time
+        self.assertRaises(exceptions.ServiceUnavailable,
+                          self.breaker.before_call)
+
+        self.breaker.record(False)
+        self.assertEquals(self.breaker.state, resilience.OPEN)
+
+        self.breaker.before_call()
+        self.breaker.record(True)
+        self.assertEquals(self.breaker.state, resilience.CLOSED)
+
+    def test_discard_trial(self):
+        self.override('breaker_reset_timeout', 0)
+        for _ in range(4):
+            self.breaker.record(False)
+        self.breaker.before_call()
+
+        self.breaker.discard()
+        self.assertEquals(self.breaker.state, resilience.HALF_OPEN)
+        self.breaker.before_call()
+        self.breaker.record(True)
+        self.assertEquals(self.breaker.state, resilience.CLOSED)
+
+    def test_disabled(self):
+        self.override('breaker_error_rate', 0)
+        for _ in range(10):
+            self.breaker.record(False)
+        self.breaker.before_call()
+        self.assertEquals(self.breaker.state, resilience.CLOSED)
+
+
+class TestClientRetries(ResilienceTestCase):
+
+    def setUp(self):
+        super(TestClientRetries, self).setUp()
+        self.client = sl_client.Client()
+        patcher = mock.patch('SoftLayer.transports.make_xml_rpc_api_call')
+        self.api_call = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_retried(self):
+        self.api_call.side_effect = [SoftLayer.TransportError(0, 'reset'),
+                                     {'id': 1}]
+        self.assertEquals(self.client.call('Account', 'getObject'),
+                          {'id': 1})
+        self.assertEquals(self.api_call.call_count, 2)
+        self.assertEquals(self.sleep.call_count, 1)
+
+    def test_retries_exhausted(self):
+        self.api_call.side_effect = SoftLayer.TransportError(0, 'reset')
+        self.assertRaises(SoftLayer.TransportError, self.client.call,
+                          'Account', 'getObject')
+        self.assertEquals(self.api_call.call_count, 3)
+
+    def test_write_not_retried(self):
+        self.api_call.side_effect = SoftLayer.TransportError(0, 'reset')
+        self.assertRaises(SoftLayer.TransportError, self.client.call,
+                          'Virtual_Guest', 'createObject')
+        self.assertEquals(self.api_call.call_count, 1)
+
+    def test_application_error_not_retried(self):
+        self.api_call.side_effect = SoftLayer.SoftLayerAPIError(
+            'SoftLayer_Exception_ObjectNotFound', 'not found')
+        self.assertRaises(SoftLayer.SoftLayerAPIError, self.client.call,
+                          'Account', 'getObject')
+        self.assertEquals(self.api_call.call_count, 1)
+
+    def test_fails_fast_when_open(self):
+        self.override('retry_attempts', 0)
+        self.api_call.side_effect = SoftLayer.TransportError(0, 'reset')
+        for _ in range(4):
+            self.assertRaises(SoftLayer.TransportError, self.client.call,
+                              'Account', 'getObject')
+
+        self.assertRaises(exceptions.ServiceUnavailable, self.client.call,
+                          'Account', 'getObject')
+        self.assertEquals(self.api_call.call_count, 4)
@@ -0,0 +1,97 @@
+import importlib
+import os.path
+import sys
+import unittest
+
+import falcon
+from mock import patch
+from oslo.config import cfg
+import six
+from six.moves import builtins
+
+from jumpgate.api import Jumpgate
+from jumpgate.common import startup
+from jumpgate import wsgi
+
+DIR_PATH = os.path.dirname(__file__)
+TEST_CFG_LOC = os.path.join(DIR_PATH, '../test.jumpgate.conf')
+
+
+class TestImportTimer(unittest.TestCase):
+    def test_wrap(self):
+        timer = startup.ImportTimer()
+        calls = []
+
+        def nested(name):
+            calls.append(name)
+            if name == 'outer':
+                wrapped('inner')
+            return name
+
+        wrapped = timer.wrap(nested)
+
+        self.assertEqual(wrapped('outer'), 'outer')
+        self.assertEqual(calls, ['outer', 'inner'])
+        self.assertGreaterEqual(timer.seconds, 0)
+        self.assertEqual(timer._depth, 0)
+
+
+class TestStartupProfile(unittest.TestCase):
+    @patch('os.environ', {'JUMPGATE_CONFIG': TEST_CFG_LOC})
+    def test_run(self):
+        # make_api() parses the test config into the global one
+        self.addCleanup(cfg.CONF.clear)
+        originals = (wsgi.configure, Jumpgate.load_service_driver,
+                     Jumpgate.setup_service_routes, Jumpgate.make_api,
+                     builtins.__import__, importlib.import_module)
+        profile = startup.StartupProfile()
+
+        api = profile.run()
+
+        self.assertIsInstance(api, falcon.API)
+        self.assertEqual(originals,
+                         (wsgi.configure, Jumpgate.load_service_driver,
+                          Jumpgate.setup_service_routes, Jumpgate.make_api,
+                          builtins.__import__, importlib.import_module))
+        for phase in ['jumpgate imports', 'configuration',
+                      'endpoints compute', 'driver compute', 'falcon API']:
+            self.assertEqual(profile.phases[phase][3], 0, phase)
+        # Run by load_service_driver()
+        self.assertEqual(profile.phases['routes compute'][3], 1)
+        rows = dict((row, calls) for row, _, calls in
+                    profile.profiled_calls())
+        self.assertGreater(rows['falcon route registration'], 0)
+
+        out = six.StringIO()
+        profile.report(top=5, out=out)
+        self.assertIn('driver compute', out.getvalue())
+        self.assertIn('falcon route registration', out.getvalue())
+
+    @patch('os.environ', {'JUMPGATE_CONFIG': TEST_CFG_LOC})
+    @patch('jumpgate.common.startup.slowest_modules')
+    def test_without_call_profile(self, slowest_modules):
+        self.addCleanup(cfg.CONF.clear)
+        slowest_modules.return_value = [(2000, 5000, 'SoftLayer')]
+        profile = startup.StartupProfile(profile_calls=False)
+
+        profile.run()
+
+        self.assertIsNone(profile.stats)
+        self.assertIn('jumpgate.compute.drivers.sl.routes',
+                      profile.service_modules())
+        out = six.StringIO()
+        profile.report(top=5, modules=1, out=out)
+        self.assertIn('total with lazy_load', out.getvalue())
+        self.assertNotIn('slowest calls', out.getvalue())
+        self.assertIn('SoftLayer', out.getvalue().splitlines()[-1])
+        slowest_modules.assert_called_once_with(profile.service_modules(), 1)
+
+
+class TestSlowestModules(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), 'needs -X importtime')
+    def test_slowest_modules(self):
+        slowest = startup.slowest_modules(['json'], 100)
+
+        self.assertIn('json', [name for _, _, name in slowest])
+        self.assertEqual(slowest, sorted(slowest, reverse=True))
+        self.assertEqual(len(startup.slowest_modules(['json'], 1)), 1)
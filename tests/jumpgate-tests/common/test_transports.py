@@ -0,0 +1,233 @@
+import json
+import unittest
+
+import mock
+from oslo.config import cfg
+import requests
+import SoftLayer
+
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import resilience
+from jumpgate.common.sl import transports
+from jumpgate.compute.drivers.sl import servers
+from jumpgate.image.drivers.sl import images
+from jumpgate.network.drivers.sl import networks
+from jumpgate.testing import fake_slapi
+from jumpgate.volume.drivers.sl import volumes
+
+
+class TransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.MagicMock()
+        patcher = mock.patch.object(transports, '_session',
+                                    return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.override('endpoint', 'https://api.softlayer.com/xmlrpc/v3/')
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'softlayer')
+        self.addCleanup(cfg.CONF.clear_override, name, 'softlayer')
+
+    def respond(self, body, status=200):
+        resp = mock.MagicMock(status_code=status, reason='Reason')
+        resp.content = json.dumps(body).encode('utf-8')
+        self.session.request.return_value = resp
+
+
+class TestSelectTransport(TransportTestCase):
+
+    def test_default(self):
+        self.assertEquals(transports.select_transport('Account', None),
+                          transports.XMLRPC)
+
+    def test_per_service(self):
+        self.override('service_transports', {'Account': 'rest'})
+        self.assertEquals(
+            transports.select_transport('SoftLayer_Account', None),
+            transports.REST)
+        self.assertEquals(
+            transports.select_transport('Virtual_Guest', None),
+            transports.XMLRPC)
+
+    def test_fallbacks(self):
+        self.override('transport', 'rest')
+        basic = SoftLayer.BasicAuthentication('user', 'key')
+        token = SoftLayer.TokenAuthentication(1, 'hash')
+        self.assertEquals(transports.select_transport('Account', basic),
+                          transports.REST)
+        self.assertEquals(transports.select_transport('Account', token),
+                          transports.XMLRPC)
+        self.assertEquals(
+            transports.select_transport('Account', basic, {'id': ''}),
+            transports.XMLRPC)
+
+    def test_rest_endpoint(self):
+        self.assertEquals(transports.get_rest_endpoint(),
+                          'https://api.softlayer.com/rest/v3/')
+        self.override('rest_endpoint', 'https://rest.example.com/')
+        self.assertEquals(transports.get_rest_endpoint(),
+                          'https://rest.example.com/')
+
+
+class TestRestClient(TransportTestCase):
+
+    def setUp(self):
+        super(TestRestClient, self).setUp()
+        self.override('transport', 'rest')
+        self.client = sl_client.Client(timeout=30)
+        self.client.auth = SoftLayer.BasicAuthentication('user', 'key')
+
+    def test_get(self):
+        self.respond([{'id': 1, 'hostname': 'vs1'}])
+        result = self.client.call('Account', 'getVirtualGuests',
+                                  mask='id, hostname', limit=10, offset=20,
+                                  filter={'virtualGuests': {'id': {
+                                      'operation': 1}}})
+        self.assertEquals(result, [{'id': 1, 'hostname': 'vs1'}])
+
+        args, kwargs = self.session.request.call_args
+        self.assertEquals(args, (
+            'GET',
+            'https://api.softlayer.com/rest/v3/SoftLayer_Account/'
+            'getVirtualGuests.json'))
+        self.assertEquals(kwargs['params'], {
+            'objectMask': 'mask[id, hostname]',
+            'objectFilter': json.dumps(
+                {'virtualGuests': {'id': {'operation': 1}}}),
+            'resultLimit': '20,10'})
+        self.assertEquals(kwargs['auth'], ('user', 'key'))
+        self.assertEquals(kwargs['timeout'], 30)
+        self.assertEquals(kwargs['data'], None)
+
+    def test_iter(self):
+        pages = [[{'id': 1}, {'id': 2}], [{'id': 3}]]
+        self.session.request.side_effect = [
+            mock.MagicMock(status_code=200,
+                           content=json.dumps(page).encode('utf-8'))
+            for page in pages]
+        result = self.client.call('Account', 'getVirtualGuests', mask='id',
+                                  iter=True, chunk=2)
+        self.assertEquals(list(result), [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEquals(
+            [kwargs['params']['resultLimit']
+             for _, kwargs in self.session.request.call_args_list],
+            ['0,2', '2,2'])
+
+    def test_post(self):
+        self.respond(True)
+        self.assertTrue(self.client.call('Virtual_Guest', 'setTags',
+                                         'a,b', id=5))
+        args, kwargs = self.session.request.call_args
+        self.assertEquals(args, (
+            'POST',
+            'https://api.softlayer.com/rest/v3/SoftLayer_Virtual_Guest/5/'
+            'setTags.json'))
+        self.assertEquals(json.loads(kwargs['data']),
+                          {'parameters': ['a,b']})
+
+    def test_api_error(self):
+        self.respond({'error': 'Unable to find object with id of 5.',
+                      'code': 'SoftLayer_Exception_ObjectNotFound'}, 404)
+        with self.assertRaises(SoftLayer.SoftLayerAPIError) as ctx:
+            self.client.call('Virtual_Guest', 'getObject', id=5)
+        self.assertEquals(ctx.exception.faultCode,
+                          'SoftLayer_Exception_ObjectNotFound')
+
+    def test_transport_errors(self):
+        resp = mock.MagicMock(status_code=502, reason='Bad Gateway',
+                              content=b'<html></html>')
+        self.session.request.return_value = resp
+        with self.assertRaises(SoftLayer.TransportError) as ctx:
+            self.client.call('Virtual_Guest', 'createObject', {})
+        self.assertEquals(ctx.exception.faultCode, 502)
+
+        self.session.request.side_effect = requests.ConnectionError('down')
+        with self.assertRaises(SoftLayer.TransportError) as ctx:
+            self.client.call('Virtual_Guest', 'createObject', {})
+        self.assertEquals(ctx.exception.faultCode, 0)
+
+    @mock.patch('SoftLayer.transports.make_xml_rpc_api_call')
+    def test_token_auth_uses_xmlrpc(self, xmlrpc_call):
+        self.client.auth = SoftLayer.TokenAuthentication(1, 'hash')
+        self.client.call('Account', 'getObject')
+        self.assertTrue(xmlrpc_call.called)
+        self.assertFalse(self.session.request.called)
+
+    def test_timed_client(self):
+        client = sl_client.TimedClient()
+        self.respond({'id': 1})
+        client.call('Account', 'getObject')
+        self.assertEquals(client.get_last_calls()[0][0],
+                          'Account.getObject')
+
+
+class TestTransportsAgree(unittest.TestCase):
+    """The calls of the drivers return the same values over both."""
+
+    calls = [
+        ('Account', 'getVirtualGuests',
+         {'mask': servers.get_virtual_guest_mask()}),
+        ('Account', 'getPrivateBlockDeviceTemplateGroups',
+         {'mask': images.SLImages.image_mask}),
+        ('Account', 'getVirtualDiskImages',
+         {'mask': volumes.get_virt_disk_img_mask()}),
+        ('Account', 'getNetworkVlans', {'mask': networks.NETWORK_MASK}),
+        ('Account', 'getSubnets', {}),
+        ('Account', 'getObject', {}),
+        ('Account', 'getCurrentUser', {}),
+        ('Account', 'getVirtualGuests', {'mask': 'id', 'iter': True}),
+    ]
+
+    def setUp(self):
+        api = fake_slapi.FakeSLAPI(
+            fake_slapi.generate_account(guests=10, images=3, vlans=2))
+        self.server = fake_slapi.FakeSLAPIServer(api).start()
+        self.addCleanup(self.server.stop)
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cfg.CONF.set_override('endpoint', self.server.xmlrpc_endpoint,
+                              'softlayer')
+        self.addCleanup(cfg.CONF.clear_override, 'endpoint', 'softlayer')
+        self.addCleanup(cfg.CONF.clear_override, 'transport', 'softlayer')
+
+    def run_calls(self, transport):
+        cfg.CONF.set_override('transport', transport, 'softlayer')
+        client = sl_client.Client(endpoint_url=self.server.xmlrpc_endpoint)
+        client.auth = SoftLayer.BasicAuthentication('user', 'key')
+        results = []
+        for service, method, kwargs in self.calls:
+            result = client.call(service, method, **dict(kwargs))
+            results.append(list(result) if kwargs.get('iter') else result)
+        return results
+
+    def assertSameValue(self, first, second):
+        self.assertEquals(type(first), type(second))
+        if isinstance(first, dict):
+            self.assertEquals(sorted(first), sorted(second))
+            for key in first:
+                self.assertSameValue(first[key], second[key])
+        elif isinstance(first, list):
+            self.assertEquals(len(first), len(second))
+            for item, other in zip(first, second):
+                self.assertSameValue(item, other)
+        else:
+            self.assertEquals(first, second)
+
+    def test_same_results(self):
+        xmlrpc_results = self.run_calls(transports.XMLRPC)
+        rest_results = self.run_calls(transports.REST)
+        for xmlrpc_result, rest_result in zip(xmlrpc_results, rest_results):
+            self.assertTrue(xmlrpc_result)
+            self.assertSameValue(xmlrpc_result, rest_result)
+
+    def test_normalize(self):
+        value = transports.normalize(
+            json.loads('{"hostname": "vs1", "tags": ["caf\\u00e9"]}'))
+        self.assertEquals(value, {'hostname': 'vs1', 'tags': [u'caf\xe9']})
+        self.assertEquals(type(value['hostname']), str)
@@ -1,6 +1,12 @@
 import unittest
 
+from mock import MagicMock
+from mock import patch
+
+from jumpgate.common.dispatcher import Dispatcher
+from jumpgate.common import utils
 from jumpgate.common.utils import lookup
+from jumpgate.common.utils import url_builder
 
 
 class TestLookup(unittest.TestCase):
@@ -10,3 +16,66 @@ class TestLookup(unittest.TestCase):
         self.assertEquals(lookup({'key': 'value'}, 'key'), 'value')
         self.assertEquals(
             lookup({'key': {'key': 'value'}}, 'key', 'key'), 'value')
+
+
+class TestLoadDriver(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(utils._driver_cache, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('jumpgate.common.utils.import_class')
+    def test_load_driver_singleton(self, import_class):
+        driver = utils.load_driver('some.module.Driver')
+
+        self.assertIs(utils.load_driver('some.module.Driver'), driver)
+        import_class.assert_called_once_with('some.module.Driver')
+        import_class.return_value.assert_called_once_with()
+
+    @patch('jumpgate.common.utils.import_class')
+    def test_load_driver_import_error(self, import_class):
+        import_class.side_effect = ImportError
+
+        self.assertRaises(ImportError, utils.load_driver, 'some.Driver')
+        self.assertRaises(ImportError, utils.load_driver, 'some.Driver')
+        self.assertEqual(import_class.call_count, 2)
+
+
+class TestUrlBuilder(unittest.TestCase):
+    def setUp(self):
+        self.disp = Dispatcher(mount='/compute')
+        self.disp.add_endpoint('server', '/v2/{tenant_id}/servers/{server_id}')
+        self.app = MagicMock()
+        self.app.get_endpoint_url.side_effect = (
+            lambda service, req, nickname, **kwargs:
+            self.disp.get_endpoint_url(req, nickname, **kwargs))
+        self.req = MagicMock()
+        self.req.env = {'tenant_id': '1234'}
+        self.req.protocol = 'http'
+        self.req.get_header.return_value = 'some_host'
+        self.req.app = ''
+
+    def test_url_builder(self):
+        build = url_builder(self.app, self.req, 'compute', 'server',
+                            'server_id')
+
+        self.assertEquals(build(1),
+                          'http://some_host/compute/v2/1234/servers/1')
+        self.assertEquals(build('abc'),
+                          'http://some_host/compute/v2/1234/servers/abc')
+        self.assertEquals(self.app.get_endpoint_url.call_count, 1)
+
+    def test_url_builder_missing_var(self):
+        build = url_builder(self.app, self.req, 'compute', 'server',
+                            'image_id')
+
+        self.assertEquals(
+            build(1), 'http://some_host/compute/v2/1234/servers/{server_id}')
+
+    def test_url_builder_not_a_string(self):
+        app = MagicMock()
+        build = url_builder(app, self.req, 'compute', 'server', 'server_id')
+
+        self.assertEquals(build(1), app.get_endpoint_url.return_value)
+        app.get_endpoint_url.assert_called_with(
+            'compute', self.req, 'server', server_id=1)
@@ -1,4 +1,10 @@
+import json
+import os
+import shutil
+import tempfile
+import time
 import unittest
+
 import falcon
 from falcon.testing import helpers
 import mock
@@ -43,6 +49,12 @@ class TestFlavorList(unittest.TestCase):
         self.perform_flavor_detail('marker=3', TENANT_ID, FLAVOR_LIST)
         self.assertEquals(len(self.resp.body['flavors']), 2)
 
+    def test_on_get_for_flavor_list_marker_error(self):
+        self.perform_flavor_detail('marker=large', TENANT_ID, FLAVOR_LIST)
+        self.assertEquals(self.resp.status, 400)
+        self.assertEquals(self.resp.body['badRequest']['message'],
+                          "Invalid marker parameter.")
+
     def test_on_get_for_flavor_list_minDisk(self):
         '''Testing the flavor-list with the 'minDisk' parameter set to filter
         some flavors out
@@ -236,3 +248,236 @@ class TestFlavorList(unittest.TestCase):
 
     def tearDown(self):
         flavor_list_loader.Flavors._flavors = None
+
+
+class TestFlavorCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.flavors = [{'id': str(i), 'name': 'flavor %s' % i,
+                         'ram': 1024 * (i % 7 + 1), 'disk': 25 * (i % 5 + 1),
+                         'cpus': 1}
+                        for i in range(1, 200)]
+        self.catalog = flavor_list_loader.FlavorCatalog(self.flavors)
+
+    def brute_force(self, marker=None, min_disk=None, min_ram=None,
+                    limit=None):
+        flavors = sorted(self.flavors, key=lambda f: int(f['id']))
+        flavors = [f for f in flavors
+                   if (marker is None or int(f['id']) > int(marker)) and
+                   (min_disk is None or f['disk'] >= min_disk) and
+                   (min_ram is None or f['ram'] >= min_ram)]
+        return flavors[:limit] if limit is not None else flavors
+
+    def test_get(self):
+        self.assertEquals(self.catalog.get(42)['name'], 'flavor 42')
+        self.assertEquals(self.catalog.get('42')['name'], 'flavor 42')
+        self.assertEquals(self.catalog.get(500), None)
+        self.assertEquals(self.catalog.get('not a number'), None)
+        self.assertTrue(3 in self.catalog)
+        self.assertEquals(len(self.catalog), 199)
+
+    def test_filter(self):
+        for params in [{},
+                       {'marker': '150'},
+                       {'min_ram': 5000},
+                       {'min_disk': 100, 'limit': 3},
+                       {'marker': '42', 'min_ram': 7168, 'min_disk': 125},
+                       {'min_ram': 8000},
+                       {'limit': 0},
+                       {'limit': -2}]:
+            self.assertEquals(self.catalog.filter(**params),
+                              self.brute_force(**params), params)
+
+    def test_numeric_order(self):
+        self.assertEquals([f['id'] for f in self.catalog.filter(limit=12)],
+                          [str(i) for i in range(1, 13)])
+        self.assertEquals([f['id'] for f in
+                           self.catalog.filter(marker='9', limit=3)],
+                          ['10', '11', '12'])
+
+    def test_views_are_rendered_once_per_url(self):
+        render = mock.MagicMock(side_effect=lambda flavor: flavor['id'])
+        views = self.catalog.get_views(('http://a/', False), render)
+        self.assertEquals(views['7'], '7')
+        self.assertEquals(render.call_count, 199)
+
+        self.catalog.get_views(('http://a/', False), render)
+        self.assertEquals(render.call_count, 199)
+        self.catalog.get_views(('http://b/', False), render)
+        self.assertEquals(render.call_count, 398)
+
+    def test_least_recently_used_views_are_dropped(self):
+        self.catalog.max_views = 2
+        render = mock.MagicMock(side_effect=lambda flavor: flavor['id'])
+        self.catalog.get_views('a', render)
+        self.catalog.get_views('b', render)
+        self.catalog.get_views('a', render)
+        self.catalog.get_views('c', render)
+        self.assertEquals(render.call_count, 3 * 199)
+
+        self.catalog.get_views('a', render)
+        self.assertEquals(render.call_count, 3 * 199)
+        self.catalog.get_views('b', render)
+        self.assertEquals(render.call_count, 4 * 199)
+
+
+class TestFlavor(unittest.TestCase):
+
+    def test_on_get(self):
+        req = falcon.Request(get_client_env())
+        resp = falcon.Response()
+        app = mock.MagicMock()
+        app.get_endpoint_url.return_value = 'http://localhost/flavors/'
+        instance = flavors.FlavorV2(app=app, flavors=FLAVOR_LIST)
+
+        instance.on_get(req, resp, '3')
+        self.assertEquals(resp.body['flavor']['id'], '3')
+        self.assertEquals(resp.body['flavor']['ram'], 2048)
+
+    def test_on_get_padded_id(self):
+        req = falcon.Request(get_client_env())
+        resp = falcon.Response()
+        app = mock.MagicMock()
+        app.get_endpoint_url.return_value = 'http://localhost/flavors/'
+        instance = flavors.FlavorV2(app=app, flavors=FLAVOR_LIST)
+
+        instance.on_get(req, resp, '03')
+        self.assertEquals(resp.body['flavor']['id'], '3')
+
+    def test_on_get_not_found(self):
+        req = falcon.Request(get_client_env())
+        resp = falcon.Response()
+        instance = flavors.FlavorV2(app=mock.MagicMock(), flavors=FLAVOR_LIST)
+
+        instance.on_get(req, resp, '42')
+        self.assertEquals(resp.status, 404)
+
+
+CREATE_OPTIONS = {
+    'processors': [{'template': {'startCpus': 1}},
+                   {'template': {'startCpus': 2}},
+                   {'template': {'startCpus': 2,
+                                 'dedicatedAccountHostOnlyFlag': True}}],
+    'memory': [{'template': {'maxMemory': 1024}},
+               {'template': {'maxMemory': 2048}}],
+    'blockDevices': [
+        {'template': {'blockDevices': [{'device': '0',
+                                        'diskImage': {'capacity': 25}}],
+                      'localDiskFlag': False}},
+        {'template': {'blockDevices': [{'device': '2',
+                                        'diskImage': {'capacity': 100}}],
+                      'localDiskFlag': False}},
+        {'template': {'blockDevices': [{'device': '0',
+                                        'diskImage': {'capacity': 100}}],
+                      'localDiskFlag': True}}],
+    'networkComponents': [
+        {'template': {'networkComponents': [{'maxSpeed': 100}]}}],
+}
+
+
+class TestSoftLayerFlavors(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache_file = os.path.join(self.tmp_dir, 'flavors.json')
+        self.fallback = flavor_list_loader.get_listing_flavors(
+            {1: dict(flavor_list_loader.flavor1, extra_specs={})})
+        self.flavors = flavor_list_loader.SoftLayerFlavors(
+            self.cache_file, 3600, mock.MagicMock(), self.fallback)
+
+    def test_generate_flavors(self):
+        flavors = flavor_list_loader.generate_flavors(CREATE_OPTIONS)
+        # 2 cpus x 2 memory x 2 disks x 1 port speed
+        self.assertEquals(len(flavors), 8)
+
+        flavor = flavors['10100010240002500100']
+        self.assertEquals(flavor, {'id': '10100010240002500100', 'cpus': 1,
+                                   'ram': 1024, 'disk': 25,
+                                   'disk-type': 'SAN', 'portspeed': 100,
+                                   'name': '1 vCPU, 1GB ram, 25GB, SAN, '
+                                           '100Mbps'})
+        self.assertEquals(flavors['20200020480010000100']['disk-type'],
+                          'Local')
+
+    @mock.patch('SoftLayer.CCIManager.get_create_options')
+    def test_refresh(self, get_create_options):
+        get_create_options.return_value = CREATE_OPTIONS
+        self.flavors.refresh()
+
+        self.assertEquals(len(self.flavors), 8)
+        flavor = self.flavors.get('10100010240002500100')
+        self.assertEquals(flavor['extra_specs'], {'portspeed': 100})
+
+        with open(self.cache_file) as cache:
+            self.assertEquals(len(json.load(cache)['flavors']), 8)
+
+    @mock.patch('SoftLayer.CCIManager.get_create_options')
+    def test_load_from_cache(self, get_create_options):
+        flavors = flavor_list_loader.generate_flavors(CREATE_OPTIONS)
+        with open(self.cache_file, 'w') as cache:
+            json.dump({'generated_at': time.time(), 'flavors': flavors},
+                      cache)
+
+        self.flavors.load()
+        self.assertEquals(len(self.flavors), 8)
+        self.assertFalse(get_create_options.called)
+
+    @mock.patch('threading.Thread')
+    def test_load_without_cache(self, thread):
+        self.flavors.load()
+        self.assertEquals(list(self.flavors), list(self.fallback))
+        thread.assert_called_once_with(
+            target=self.flavors._background_refresh)
+
+        # Only one generation runs at a time
+        self.flavors.get(1)
+        self.assertEquals(thread.call_count, 1)
+
+
+class TestMakeClient(unittest.TestCase):
+
+    @mock.patch('SoftLayer.Client')
+    def test_proxy(self, client):
+        conf = mock.MagicMock()
+        flavor_list_loader.make_client(conf)
+        self.assertEquals(client.call_args[1]['proxy'], conf.softlayer.proxy)
+
+    @mock.patch('SoftLayer.__version__', 'v3.0.2')
+    @mock.patch('SoftLayer.Client')
+    def test_no_proxy_before_3_0_4(self, client):
+        flavor_list_loader.make_client(mock.MagicMock())
+        self.assertFalse('proxy' in client.call_args[1])
+
+
+class TestFlavorReload(unittest.TestCase):
+
+    def test_reload(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        flavor_file = os.path.join(tmp_dir, 'flavors.json')
+        with open(flavor_file, 'w') as f:
+            json.dump({'7': dict(flavor_list_loader.flavor1, id='7')}, f)
+
+        flavors = flavor_list_loader.ReloadableFlavors(FLAVOR_LIST.catalog)
+        old_catalog = flavors.catalog
+        flavor_list_loader.Flavors.reload(flavor_file, flavors)
+
+        self.assertEquals([f['id'] for f in flavors], ['7'])
+        self.assertEquals([f['id'] for f in old_catalog],
+                          ['1', '2', '3', '4', '5'])
+
+    def test_reload_invalid_file_keeps_flavors(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        flavor_file = os.path.join(tmp_dir, 'flavors.json')
+        with open(flavor_file, 'w') as f:
+            f.write('{"1": {"name": "no id"}}')
+
+        flavors = flavor_list_loader.ReloadableFlavors(FLAVOR_LIST.catalog)
+        self.assertRaises(ValueError, flavor_list_loader.Flavors.reload,
+                          flavor_file, flavors)
+        self.assertEquals(len(flavors), 5)
+
+    def tearDown(self):
+        flavor_list_loader.Flavors._flavors = None
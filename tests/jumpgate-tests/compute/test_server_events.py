@@ -0,0 +1,131 @@
+import json
+import unittest
+
+import falcon
+from falcon.testing import helpers
+import mock
+
+from jumpgate.compute.drivers.sl import server_events
+
+
+def make_instance(instance_id, power_state='RUNNING', transaction=None):
+    instance = {'id': instance_id,
+                'powerState': {'keyName': power_state},
+                'status': {'keyName': 'ACTIVE'},
+                'provisionDate': '2014-06-03T15:12:37-06:00'}
+    if transaction:
+        instance['activeTransaction'] = {
+            'transactionStatus': {'name': transaction}}
+    return instance
+
+
+class TestServerEventFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.feed = server_events.ServerEventFeed('1/2', self.client)
+        patcher = mock.patch('SoftLayer.CCIManager.list_instances')
+        self.list_instances = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def poll(self, *instances):
+        self.list_instances.return_value = list(instances)
+        self.feed.run_once()
+
+    def test_first_poll_has_no_events(self):
+        self.poll(make_instance(1), make_instance(2))
+        self.assertEquals(list(self.feed.events), [])
+        self.assertEquals(self.feed.last_id, 0)
+
+    def test_transitions(self):
+        self.poll(make_instance(1), make_instance(2))
+        self.poll(make_instance(1, 'HALTED'), make_instance(3, 'RUNNING',
+                                                            'PROVISION'))
+
+        events = dict((event['server_id'], event)
+                      for event in self.feed.events)
+        self.assertEquals(sorted(event['id'] for event in events.values()),
+                          [1, 2, 3])
+        self.assertEquals(events['1']['event'], 'changed')
+        self.assertEquals(events['1']['status'], 'SHUTOFF')
+        self.assertEquals(events['1']['previous']['status'], 'ACTIVE')
+        self.assertEquals(events['2']['event'], 'deleted')
+        self.assertEquals(events['3']['event'], 'created')
+        self.assertEquals(events['3']['status'], 'BUILD')
+        self.assertEquals(events['3']['OS-EXT-STS:task_state'], 'PROVISION')
+
+    def test_wait(self):
+        self.poll(make_instance(1))
+        self.assertEquals(self.feed.wait(0, 0), ([], False, 0))
+
+        self.poll(make_instance(1, 'PAUSED'))
+        events, truncated, since = self.feed.wait(0, 5)
+        self.assertEquals([event['id'] for event in events], [1])
+        self.assertFalse(truncated)
+        self.assertEquals(since, 1)
+
+    def test_wait_after_restart(self):
+        self.poll(make_instance(1))
+        self.assertEquals(self.feed.wait(40, 0), ([], True, 0))
+
+    def test_wait_after_dropped_events(self):
+        self.feed.events = server_events.collections.deque(maxlen=1)
+        self.poll(make_instance(1), make_instance(2))
+        self.poll(make_instance(1, 'PAUSED'), make_instance(2, 'PAUSED'))
+        events, truncated, since = self.feed.wait(0, 0)
+        self.assertEquals(len(events), 1)
+        self.assertTrue(truncated)
+        self.assertEquals(since, 2)
+
+
+class TestServerEventsV2(unittest.TestCase):
+
+    def setUp(self):
+        self.feed = mock.MagicMock(last_id=7)
+        self.feed.wait.return_value = ([{'id': 8, 'event': 'changed'}],
+                                       False, 8)
+        patcher = mock.patch.object(server_events._feeds, 'get',
+                                    return_value=self.feed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **kwargs):
+        env = helpers.create_environ(**kwargs)
+        env['sl_client'] = mock.MagicMock()
+        env['auth'] = {'tenant_id': '1', 'user_id': '2'}
+        req, resp = falcon.Request(env), falcon.Response()
+        server_events.ServerEventsV2().on_get(req, resp, '1')
+        return resp
+
+    def test_long_poll(self):
+        resp = self.get(query_string='since=3&timeout=5')
+        self.feed.wait.assert_called_once_with(3, 5)
+        self.assertEquals(resp.body, {'events': [{'id': 8,
+                                                  'event': 'changed'}],
+                                      'next': 8, 'truncated': False})
+
+    def test_long_poll_defaults(self):
+        self.get()
+        self.feed.wait.assert_called_once_with(
+            7, server_events.cfg.CONF['compute']['server_events_max_wait'])
+
+    def test_invalid_since(self):
+        resp = self.get(query_string='since=abc')
+        self.assertEquals(resp.status, 400)
+
+    def test_unauthenticated(self):
+        env = helpers.create_environ()
+        req, resp = falcon.Request(env), falcon.Response()
+        server_events.ServerEventsV2().on_get(req, resp, '1')
+        self.assertEquals(resp.status, 401)
+
+    def test_event_stream(self):
+        resp = self.get(query_string='timeout=5',
+                        headers={'Accept': 'text/event-stream'})
+        self.assertEquals(resp.content_type, 'text/event-stream')
+        chunks = resp.stream
+        self.assertEquals(next(chunks), b'retry: 1000\n\n')
+        self.assertEquals(
+            next(chunks),
+            ('id: 8\nevent: changed\ndata: %s\n\n'
+             % json.dumps({'id': 8, 'event': 'changed'})).encode('utf-8'))
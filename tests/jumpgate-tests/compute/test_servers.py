@@ -2,8 +2,11 @@ import unittest
 import falcon
 from falcon.testing import helpers
 import mock
+from oslo.config import cfg
 import SoftLayer
 
+from jumpgate.common import cache
+from jumpgate.common import cache_backends
 from jumpgate.compute.drivers.sl import flavor_list_loader
 from jumpgate.compute.drivers.sl import servers
 
@@ -68,6 +71,17 @@ class TestServersServerActionV2(unittest.TestCase):
                           vg_clientMock.createArchiveTransaction)
         self.assertEquals(resp.status, 500)
 
+    @mock.patch('jumpgate.compute.drivers.sl.servers.cache.invalidate')
+    def test_on_post_invalidates_cached_server(self, mockInvalidate):
+        self.client, self.env = get_client_env(body='{"os-stop": "None"}')
+        self.env['auth'] = {'tenant_id': TENANT_ID, 'user_id': 'user'}
+        req = falcon.Request(self.env)
+        instance = servers.ServerActionV2(app=mock.MagicMock(),
+                                          flavors=FLAVOR_LIST)
+        instance.on_post(req, falcon.Response(), TENANT_ID, INSTANCE_ID)
+        mockInvalidate.assert_called_once_with('%s/user' % TENANT_ID,
+                                               'virtual_guests', INSTANCE_ID)
+
     def test_on_post_powerOn(self):
         body_str = '{"os-start": "None"}'
         self.perform_server_action(body_str, TENANT_ID, INSTANCE_ID,
@@ -244,6 +258,76 @@ class TestServersServersDetailV2(unittest.TestCase):
                           set(dict.keys()))
         self.assertEquals(resp.status, 200)
 
+    @mock.patch('jumpgate.compute.drivers.sl.servers.get_server_details_dict')
+    @mock.patch('jumpgate.common.sl.inventory.list_resources')
+    @mock.patch('SoftLayer.CCIManager.list_instances')
+    def test_on_get_from_inventory(self, mockListInstance, mockInventory,
+                                   mockDetails):
+        mockInventory.return_value = [
+            {'id': 3, 'createDate': '2014-03', 'hostname': 'web3'},
+            {'id': 1, 'createDate': '2014-01', 'hostname': 'web1'},
+            {'id': 2, 'createDate': '2014-02', 'hostname': 'db2'},
+            {'id': 4, 'createDate': '2014-04', 'hostname': 'web4'},
+        ]
+        mockDetails.side_effect = lambda app, req, instance, is_list: (
+            instance['id'])
+        client, env = get_client_env(query_string='name=web&marker=1&limit=1')
+        req = falcon.Request(env)
+        resp = falcon.Response()
+        instance = servers.ServersDetailV2(app=mock.MagicMock())
+        instance.on_get(req, resp, TENANT_ID)
+
+        self.assertFalse(mockListInstance.called)
+        mockInventory.assert_called_once_with(req, 'virtual_guests')
+        self.assertEquals(resp.body['servers'], [3])
+
+
+class TestServerCache(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            cache, 'RESOURCES',
+            cache.ResourceCache(cache_backends.MemoryBackend()))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cfg.CONF.set_override('server_cache_ttl', 60, 'compute')
+        self.addCleanup(cfg.CONF.clear_override, 'server_cache_ttl',
+                        'compute')
+        patcher = mock.patch('jumpgate.compute.drivers.sl.servers.SoftLayer'
+                             '.CCIManager.get_instance')
+        self.get_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.get_instance.return_value = {'id': SERVER_ID,
+                                          'hostname': 'vs1'}
+
+    def request(self, user_id):
+        client, env = get_client_env()
+        env['auth'] = {'tenant_id': TENANT_ID, 'user_id': user_id}
+        return falcon.Request(env)
+
+    @mock.patch('jumpgate.compute.drivers.sl.servers.get_server_details_dict')
+    def test_cached_per_user(self, details):
+        handler = servers.ServerV2(app=mock.MagicMock())
+        handler.on_get(self.request('a'), falcon.Response(), TENANT_ID,
+                       SERVER_ID)
+        handler.on_get(self.request('a'), falcon.Response(), TENANT_ID,
+                       SERVER_ID)
+        self.assertEquals(self.get_instance.call_count, 1)
+
+        handler.on_get(self.request('b'), falcon.Response(), TENANT_ID,
+                       SERVER_ID)
+        self.assertEquals(self.get_instance.call_count, 2)
+
+        servers.invalidate_server(self.request('a'), SERVER_ID)
+        handler.on_get(self.request('a'), falcon.Response(), TENANT_ID,
+                       SERVER_ID)
+        self.assertEquals(self.get_instance.call_count, 3)
+
+        # Changes made by a user are seen by the other users of the tenant
+        handler.on_get(self.request('b'), falcon.Response(), TENANT_ID,
+                       SERVER_ID)
+        self.assertEquals(self.get_instance.call_count, 4)
+
 
 class TestServerDetail(unittest.TestCase):
     '''Certain properties such as 'metadata' and 'progress' are not being sent
@@ -354,6 +438,30 @@ class TestServerDetail(unittest.TestCase):
         self.assertEquals('status' in self.resp.body['server'].keys(), True)
         self.assertEquals(type(self.resp.body['server']['status']), str)
 
+    @mock.patch('jumpgate.compute.drivers.sl.servers.SoftLayer.CCIManager'
+                '.get_instance')
+    def test_on_get_server_status_view(self, get_instance_mock):
+        get_instance_mock.return_value = {
+            'id': 4953216,
+            'powerState': {'keyName': 'RUNNING', 'name': 'Running'},
+            'status': {'keyName': 'ACTIVE', 'name': 'Active'},
+            'activeTransaction': {
+                'transactionStatus': {'name': 'CLOUD_CONFIGURE'}},
+        }
+        client, env = get_client_env(query_string='view=status')
+        req, resp = falcon.Request(env), falcon.Response()
+        servers.ServerV2(app=mock.MagicMock()).on_get(req, resp, TENANT_ID,
+                                                      SERVER_ID)
+
+        get_instance_mock.assert_called_once_with(
+            SERVER_ID, mask=servers.get_virtual_guest_status_mask())
+        server = resp.body['server']
+        self.assertEquals(server['id'], '4953216')
+        self.assertEquals(server['status'], 'BUILD')
+        self.assertEquals(server['OS-EXT-STS:power_state'], 2)
+        self.assertEquals(server['OS-EXT-STS:task_state'], 'CLOUD_CONFIGURE')
+        self.assertEquals(server['OS-EXT-STS:vm_state'], 'ACTIVE')
+
     def test_on_get_server_detail_image_name(self):
         '''checking the type for the property 'image_name'
         '''
@@ -0,0 +1,195 @@
+import json
+import time
+import unittest
+
+import falcon
+from falcon import testing
+import mock
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common import cache_backends
+from jumpgate.common import deadline
+from jumpgate.common import exceptions
+from jumpgate.common.hooks import core as core_hooks
+from jumpgate.common.hooks.sl import client as client_hooks
+from jumpgate.common import limits
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import resilience
+from jumpgate.common import utils
+from jumpgate.compute.drivers.sl import flavor_list_loader
+from jumpgate.compute.drivers.sl import servers
+from jumpgate.compute.drivers.sl import volumes
+
+TENANT_ID = '333333'
+FLAVOR_LIST = flavor_list_loader.Flavors.get_flavors(app=mock.MagicMock())
+SERVER_BODY = json.dumps({'server': {'name': 'testserver',
+                                     'imageRef': 'a1783280-6b1f',
+                                     'availability_zone': 'dal05',
+                                     'flavorRef': '1'}})
+
+
+class SLErrorsTestCase(unittest.TestCase):
+    """Requests going through the real handlers and error handlers."""
+
+    before = [core_hooks.hook_set_uuid]
+
+    def setUp(self):
+        after = [core_hooks.hook_format]
+        self.api = falcon.API(before=self.before, after=after)
+        for ex in [exceptions.ResponseException, exceptions.OverLimit,
+                   exceptions.ServiceUnavailable]:
+            self.api.add_error_handler(
+                ex, utils.wrap_handler_with_hooks(ex.handle, after))
+        self.api.add_route('/v2/{tenant_id}/servers',
+                           servers.ServersV2(mock.MagicMock(), FLAVOR_LIST))
+        self.api.add_route(
+            '/v2/{tenant_id}/servers/{instance_id}/os-volume_attachments',
+            volumes.OSVolumeAttachmentsV2())
+
+        self.client = sl_client.Client()
+        self.client.tenant_id = TENANT_ID
+        patcher = mock.patch('SoftLayer.transports.make_xml_rpc_api_call')
+        self.api_call = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def override(self, name, value, group):
+        cfg.CONF.set_override(name, value, group)
+        self.addCleanup(cfg.CONF.clear_override, name, group)
+
+    def request(self, method, path, body='', headers=None):
+        env = testing.create_environ(path=path, method=method, body=body,
+                                     headers=headers)
+        env['sl_client'] = self.client
+        start_response = testing.StartResponseMock()
+        body = b''.join(self.api(env, start_response))
+        return start_response, json.loads(body.decode('utf-8'))
+
+    def get_volume_attachments(self, headers=None):
+        return self.request(
+            'GET', '/v2/%s/servers/1234/os-volume_attachments' % TENANT_ID,
+            headers=headers)
+
+    def post_server(self):
+        return self.request('POST', '/v2/%s/servers' % TENANT_ID,
+                            body=SERVER_BODY)
+
+
+class TestOverLimit(SLErrorsTestCase):
+
+    def setUp(self):
+        super(TestOverLimit, self).setUp()
+        patcher = mock.patch.object(limits, '_backend',
+                                    cache_backends.MemoryBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.override('slapi_calls_per_second', 1, 'limits')
+        self.override('slapi_burst', 1, 'limits')
+        # Spends the budget of the tenant
+        limits.consume_slapi_call(TENANT_ID)
+
+    def assertOverLimit(self, start_response, body):
+        self.assertEqual(start_response.status, '429 Too Many Requests')
+        self.assertIn('overLimit', body)
+        self.assertIn('retry-after', start_response.headers_dict)
+        self.assertFalse(self.api_call.called)
+
+    def test_volume_attachments(self):
+        self.assertOverLimit(*self.get_volume_attachments())
+
+    def test_create_server(self):
+        self.assertOverLimit(*self.post_server())
+
+
+class TestCircuitBreaker(SLErrorsTestCase):
+
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.override('breaker_min_calls', 4, 'resilience')
+        self.override('breaker_error_rate', 0.5, 'resilience')
+        self.override('retry_attempts', 0, 'resilience')
+        self.api_call.side_effect = SoftLayer.TransportError(0, 'reset')
+
+    def test_volume_attachments(self):
+        for _ in range(4):
+            start_response, body = self.get_volume_attachments()
+            self.assertEqual(start_response.status,
+                             '500 Internal Server Error')
+
+        start_response, body = self.get_volume_attachments()
+
+        self.assertEqual(start_response.status, '503 Service Unavailable')
+        self.assertIn('computeFault', body)
+        self.assertIn('retry-after', start_response.headers_dict)
+        self.assertEqual(self.api_call.call_count, 4)
+
+    def test_create_server(self):
+        for _ in range(4):
+            start_response, body = self.post_server()
+            self.assertEqual(start_response.status, '400 Bad Request')
+
+        start_response, body = self.post_server()
+
+        self.assertEqual(start_response.status, '503 Service Unavailable')
+        self.assertIn('retry-after', start_response.headers_dict)
+        self.assertEqual(self.api_call.call_count, 4)
+
+
+class TestDeadline(SLErrorsTestCase):
+
+    def setUp(self):
+        super(TestDeadline, self).setUp()
+        self.client.set_deadline(time.time() - 1)
+
+    def test_volume_attachments(self):
+        start_response, body = self.get_volume_attachments()
+
+        self.assertEqual(start_response.status, '503 Service Unavailable')
+        self.assertIn('computeFault', body)
+        self.assertFalse(self.api_call.called)
+
+    def test_create_server(self):
+        start_response, body = self.post_server()
+
+        self.assertEqual(start_response.status, '503 Service Unavailable')
+        self.assertIn('computeFault', body)
+        self.assertFalse(self.api_call.called)
+
+
+class TestDeadlineAndCircuitBreaker(SLErrorsTestCase):
+
+    # Requests get their deadline and SoftLayer client from the hooks
+    before = [core_hooks.hook_set_uuid, deadline.hook_set_deadline,
+              client_hooks.bind_client]
+
+    def setUp(self):
+        super(TestDeadlineAndCircuitBreaker, self).setUp()
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.override('breaker_min_calls', 4, 'resilience')
+        self.override('breaker_error_rate', 0.5, 'resilience')
+        self.override('retry_attempts', 0, 'resilience')
+
+        def slow_softlayer(request):
+            if request.timeout < 1:
+                time.sleep(request.timeout)
+                raise SoftLayer.TransportError(0, 'timed out')
+            return []
+        self.api_call.side_effect = slow_softlayer
+
+    def test_short_timeouts_do_not_open_breaker(self):
+        for _ in range(5):
+            start_response, body = self.get_volume_attachments(
+                headers={'X-Request-Timeout': '0.01'})
+            self.assertEqual(start_response.status, '504 Gateway Time-out')
+
+        # Another client is served
+        start_response, body = self.get_volume_attachments()
+
+        self.assertEqual(start_response.status, '200 OK')
+        self.assertEqual(body, {'volumeAttachments': []})
+        self.assertEqual(self.api_call.call_count, 6)
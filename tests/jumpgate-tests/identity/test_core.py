@@ -0,0 +1,102 @@
+import base64
+import unittest
+
+from mock import patch
+
+from jumpgate.common import exceptions
+from jumpgate.identity.drivers import core
+
+
+class TestCompactTokenIdDriver(unittest.TestCase):
+    def setUp(self):
+        self.conf = {'secret_key': 'SECRET',
+                     'identity': {'accept_legacy_token_ids': True}}
+        for target in ['jumpgate.common.aes.config.CONF',
+                       'jumpgate.identity.drivers.core.config.CONF']:
+            patcher = patch(target, self.conf)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for target in ['jumpgate.common.aes._cipher',
+                       'jumpgate.common.aes._token_ciphers']:
+            patcher = patch(target, (None, None))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.driver = core.CompactTokenIdDriver()
+        self.token = {'user_id': '1234',
+                      'username': 'someuser',
+                      'api_key': 'a' * 64,
+                      'auth_type': 'api_key',
+                      'tenant_id': '5678',
+                      'expires': 1400000000.25}
+
+    def decoded(self, token_id):
+        return base64.urlsafe_b64decode(token_id + '=' * (-len(token_id) % 4))
+
+    def test_round_trip(self):
+        token_id = self.driver.create_token_id(self.token)
+
+        self.assertNotIn('=', token_id)
+        self.assertNotIn('+', token_id)
+        self.assertNotIn('/', token_id)
+        self.assertEqual(self.decoded(token_id)[:1],
+                         core.TOKEN_FIELDS_VERSION)
+        self.assertEqual(self.driver.token_from_id(token_id), self.token)
+
+    def test_round_trip_integer_fields(self):
+        token = {'userId': 1234, 'tokenHash': 'abcdef', 'auth_type': 'token',
+                 'tenant_id': '5678', 'expires': 1400000000}
+
+        token_id = self.driver.create_token_id(token)
+
+        self.assertEqual(self.decoded(token_id)[:1],
+                         core.TOKEN_FIELDS_VERSION)
+        self.assertEqual(self.driver.token_from_id(token_id), token)
+
+    def test_round_trip_json(self):
+        self.token['roles'] = ['admin']
+
+        token_id = self.driver.create_token_id(self.token)
+
+        self.assertEqual(self.decoded(token_id)[:1], core.TOKEN_JSON_VERSION)
+        self.assertEqual(self.driver.token_from_id(token_id), self.token)
+
+    def test_shorter_than_legacy(self):
+        legacy_id = core.AESTokenIdDriver().create_token_id(self.token)
+
+        self.assertLess(len(self.driver.create_token_id(self.token)),
+                        len(legacy_id) // 2)
+
+    def test_legacy_token_id(self):
+        legacy_id = core.AESTokenIdDriver().create_token_id(self.token)
+
+        self.assertEqual(self.driver.token_from_id(legacy_id), self.token)
+
+    def test_legacy_token_id_disabled(self):
+        legacy_id = core.AESTokenIdDriver().create_token_id(self.token)
+        self.conf['identity']['accept_legacy_token_ids'] = False
+
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, legacy_id)
+
+    def test_tampered_token_id(self):
+        message = bytearray(self.decoded(
+            self.driver.create_token_id(self.token)))
+        message[12] ^= 1
+        token_id = base64.urlsafe_b64encode(bytes(message)).decode('ascii')
+
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, token_id)
+
+    def test_other_secret_key(self):
+        token_id = self.driver.create_token_id(self.token)
+        self.conf['secret_key'] = 'OTHER'
+
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, token_id)
+
+    def test_truncated_token_id(self):
+        token_id = self.driver.create_token_id(self.token)
+
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, token_id[:20])
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mock import patch
+from oslo.config import cfg
+
+from jumpgate.common import config
+from jumpgate.common import exceptions
+from jumpgate.identity.drivers import token_store
+
+
+class TestTokenStore(unittest.TestCase):
+    def setUp(self):
+        self.store = token_store.TokenStore(':memory:', 300)
+
+    def test_get(self):
+        self.store.add('key', time.time() + 60, b'data')
+
+        self.assertEqual(self.store.get('key'), b'data')
+        self.assertIsNone(self.store.get('other'))
+
+    def test_delete(self):
+        self.store.add('key', time.time() + 60, b'data')
+
+        self.assertTrue(self.store.delete('key'))
+        self.assertFalse(self.store.delete('key'))
+        self.assertIsNone(self.store.get('key'))
+
+    def test_sweep(self):
+        self.store.add('expired', time.time() - 1, b'data')
+        self.store.add('valid', time.time() + 60, b'data')
+
+        self.assertEqual(self.store.sweep(), 1)
+        self.assertIsNone(self.store.get('expired'))
+        self.assertEqual(self.store.get('valid'), b'data')
+
+    def test_add_sweeps(self):
+        self.store.add('expired', time.time() - 1, b'data')
+        self.store.sweep_interval = 0
+
+        self.store.add('valid', time.time() + 60, b'data')
+
+        self.assertIsNone(self.store.get('expired'))
+
+    def test_shared_file(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        db_path = os.path.join(path, 'tokens.db')
+        store = token_store.TokenStore(db_path, 300)
+
+        store.add('key', time.time() + 60, b'data')
+
+        self.assertEqual(token_store.TokenStore(db_path, 300).get('key'),
+                         b'data')
+
+    def test_creates_directory(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        db_path = os.path.join(path, 'state', 'tokens.db')
+
+        token_store.TokenStore(db_path, 300)
+
+        self.assertTrue(os.path.exists(db_path))
+
+    def test_default_path_is_under_state_path(self):
+        conf = cfg.ConfigOpts()
+        conf.register_opts(config.FILE_OPTIONS[None])
+        conf.register_opts(token_store.opts, group='token_store')
+        conf(args=[], default_config_files=[])
+        conf.set_override('state_path', '/srv/jumpgate')
+
+        self.assertEqual(conf.token_store.db_path, '/srv/jumpgate/tokens.db')
+
+
+class TestStoredTokenIdDriver(unittest.TestCase):
+    def setUp(self):
+        self.conf = {'secret_key': 'SECRET',
+                     'token_store': {'db_path': ':memory:',
+                                     'sweep_interval': 300}}
+        for target in ['jumpgate.common.aes.config.CONF',
+                       'jumpgate.identity.drivers.token_store.cfg.CONF']:
+            patcher = patch(target, self.conf)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch('jumpgate.common.aes._token_ciphers', (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.driver = token_store.StoredTokenIdDriver()
+        self.token = {'user_id': '1234',
+                      'username': 'someuser',
+                      'api_key': 'a' * 64,
+                      'auth_type': 'api_key',
+                      'tenant_id': '5678',
+                      'expires': time.time() + 60}
+
+    def test_round_trip(self):
+        token_id = self.driver.create_token_id(self.token)
+
+        self.assertEqual(len(token_id), 22)
+        self.assertEqual(self.driver.token_from_id(token_id), self.token)
+
+    def test_stored_encrypted(self):
+        token_id = self.driver.create_token_id(self.token)
+
+        data = self.driver.store.get(token_store._token_key(token_id))
+        self.assertNotIn(b'someuser', data)
+        self.assertIsNone(self.driver.store.get(token_id))
+
+    def test_unknown_token_id(self):
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, 'unknown')
+
+    def test_revoke_token_id(self):
+        token_id = self.driver.create_token_id(self.token)
+
+        self.assertTrue(self.driver.revoke_token_id(token_id))
+        self.assertFalse(self.driver.revoke_token_id(token_id))
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, token_id)
+
+    def test_other_secret_key(self):
+        token_id = self.driver.create_token_id(self.token)
+        self.conf['secret_key'] = 'OTHER'
+
+        self.assertRaises(exceptions.InvalidTokenError,
+                          self.driver.token_from_id, token_id)
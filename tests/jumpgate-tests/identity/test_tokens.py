@@ -0,0 +1,30 @@
+import unittest
+
+from mock import MagicMock
+from mock import patch
+
+from jumpgate.identity.drivers.sl import tokens
+
+
+class TestTokenV2(unittest.TestCase):
+    @patch('jumpgate.identity.drivers.sl.tokens.identity')
+    def test_on_delete(self, identity):
+        req, resp = MagicMock(), MagicMock()
+        revoke = identity.token_id_driver.return_value.revoke_token_id
+
+        tokens.TokenV2().on_delete(req, resp, 'TOKEN_ID')
+
+        revoke.assert_called_once_with('TOKEN_ID')
+        self.assertEqual(resp.status, 202)
+
+    @patch('jumpgate.identity.drivers.sl.tokens.LOG')
+    @patch('jumpgate.identity.drivers.sl.tokens.identity')
+    def test_on_delete_not_revoked(self, identity, log):
+        req, resp = MagicMock(), MagicMock()
+        identity.token_id_driver.return_value.revoke_token_id.return_value = (
+            False)
+
+        tokens.TokenV2().on_delete(req, resp, 'TOKEN_ID')
+
+        self.assertTrue(log.warning.called)
+        self.assertEqual(resp.status, 202)
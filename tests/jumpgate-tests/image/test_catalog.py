@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from mock import MagicMock, patch
+from oslo.config import cfg
+
+from jumpgate.image.drivers.sl import catalog
+
+
+class TestImageCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.loader = MagicMock(return_value=['image'])
+        self.client = MagicMock()
+        self.catalog = catalog.ImageCatalog(self.loader)
+
+    def tearDown(self):
+        cfg.CONF.clear_override('public_image_refresh_interval', 'image')
+        cfg.CONF.clear_override('public_image_max_age', 'image')
+
+    def test_first_call_loads(self):
+        self.assertEquals(self.catalog.get_entries(self.client), ['image'])
+        self.loader.assert_called_once_with(self.client)
+
+    def test_fresh_entries_are_reused(self):
+        self.catalog.get_entries(self.client)
+        self.catalog.get_entries(self.client)
+        self.assertEquals(self.loader.call_count, 1)
+
+    def test_caching_disabled(self):
+        cfg.CONF.set_override('public_image_refresh_interval', 0, 'image')
+        self.catalog.get_entries(self.client)
+        self.catalog.get_entries(self.client)
+        self.assertEquals(self.loader.call_count, 2)
+
+    @patch('jumpgate.image.drivers.sl.catalog.time')
+    def test_stale_entries_served_while_refreshing(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.catalog.get_entries(self.client)
+
+        loaded = threading.Event()
+        self.loader.side_effect = lambda client: loaded.set() or ['new']
+        mock_time.time.return_value = 1000 + 301
+        self.assertEquals(self.catalog.get_entries(self.client), ['image'])
+
+        self.assertTrue(loaded.wait(5))
+        for _ in range(50):
+            if not self.catalog._refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEquals(self.catalog.get_entries(self.client), ['new'])
+
+    @patch('jumpgate.image.drivers.sl.catalog.time')
+    def test_expired_entries_are_reloaded_inline(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.catalog.get_entries(self.client)
+
+        self.loader.return_value = ['new']
+        mock_time.time.return_value = 1000 + 3600
+        self.assertEquals(self.catalog.get_entries(self.client), ['new'])
+
+    @patch('jumpgate.image.drivers.sl.catalog.time')
+    def test_failed_background_refresh_keeps_entries(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.catalog.get_entries(self.client)
+
+        self.loader.side_effect = Exception('boom')
+        mock_time.time.return_value = 1000 + 301
+        self.catalog._background_refresh(self.client)
+
+        self.assertFalse(self.catalog._refreshing)
+        self.assertEquals(self.catalog.get_entries(self.client), ['image'])
@@ -1,5 +1,10 @@
+import falcon
+from falcon.testing import helpers
 from mock import MagicMock, patch
 from jumpgate.image.drivers.sl.images import (SLImages, ImagesV2, ImageV1,
+                                              PUBLIC_IMAGES,
+                                              add_v2_image_links,
+                                              format_v2_image,
                                               get_v1_image_details_dict,
                                               get_v2_image_details_dict,
                                               )
@@ -70,6 +75,7 @@ class TestImagesV2(unittest.TestCase):
         self.req, self.resp = MagicMock(), MagicMock()
         self.app = MagicMock()
         self.instance = ImagesV2(self.app)
+        PUBLIC_IMAGES.clear()
 
     def test_init(self):
         self.assertEquals(self.app, self.instance.app)
@@ -109,12 +115,130 @@ class TestImagesV2(unittest.TestCase):
 
     def test_on_get(self):
         dict = {'images': {'name': None}}
-        self.req.get_param('limit').return_value = None
-        self.req.get_param('marker').return_value = None
+        self.req.get_param.return_value = None
+        client = self.req.env['sl_client']
+        vgbdtg = client['Virtual_Guest_Block_Device_Template_Group']
+        vgbdtg.getPublicImages.return_value = []
         self.instance.on_get(self.req, self.resp)
         self.assertEquals(self.resp.body.keys(), dict.keys())
         self.assertEquals(self.resp.status, 200)
 
+    def test_on_get_uses_public_image_catalog(self):
+        params = {'name': 'cent*', 'limit': '2'}
+        self.req.get_param.side_effect = params.get
+        client = self.req.env['sl_client']
+        vgbdtg = client['Virtual_Guest_Block_Device_Template_Group']
+        vgbdtg.getPublicImages.return_value = [
+            {'id': 1, 'globalIdentifier': 'a', 'name': 'CentOS 6'},
+            {'id': 2, 'globalIdentifier': 'b', 'name': 'Ubuntu 12'},
+        ]
+        client['Account'].getPrivateBlockDeviceTemplateGroups.return_value = [
+            {'id': 3, 'globalIdentifier': 'c', 'name': 'centos-custom'},
+        ]
+
+        self.instance.on_get(self.req, self.resp)
+        self.instance.on_get(self.req, self.resp)
+
+        self.assertEquals(vgbdtg.getPublicImages.call_count, 1)
+        images = self.resp.body['images']
+        self.assertEquals(['a', 'c'], [image['id'] for image in images])
+        self.assertEquals(['public', 'private'],
+                          [image['visibility'] for image in images])
+
+    def _get_page(self, client, query_string):
+        env = helpers.create_environ(path='/v2/images',
+                                     query_string=query_string)
+        env['sl_client'] = client
+        req, resp = falcon.Request(env), falcon.Response()
+        self.instance.on_get(req, resp)
+        return resp
+
+    def _paging_client(self, private=None):
+        if private is None:
+            private = [
+                {'id': 2, 'globalIdentifier': 'b', 'name': 'bravo'},
+                {'id': 4, 'globalIdentifier': 'd', 'name': 'Delta'},
+            ]
+
+        def get_private(mask, filter, limit, offset=0):
+            guid = filter['privateBlockDeviceTemplateGroups'].get(
+                'globalIdentifier', {}).get('operation', '')
+            if guid.startswith('_= '):
+                return [image for image in private
+                        if image['globalIdentifier'] == guid[3:]]
+            return private[offset:offset + limit]
+
+        client = MagicMock()
+        client['Account'].getPrivateBlockDeviceTemplateGroups.side_effect = (
+            get_private)
+        vgbdtg = client['Virtual_Guest_Block_Device_Template_Group']
+        vgbdtg.getPublicImages.return_value = [
+            {'id': 5, 'globalIdentifier': 'e', 'name': 'echo'},
+            {'id': 1, 'globalIdentifier': 'a', 'name': 'Alpha'},
+            {'id': 3, 'globalIdentifier': 'c', 'name': 'charlie'},
+        ]
+        return client
+
+    def test_on_get_paginates_merged_images(self):
+        client = self._paging_client()
+        self.app.get_endpoint_url.return_value = 'url'
+
+        pages, query_string = [], 'limit=2'
+        while query_string is not None:
+            resp = self._get_page(client, query_string)
+            self.assertEquals(resp.status, 200)
+            pages.append([image['id'] for image in resp.body['images']])
+            query_string = None
+            if 'next' in resp.body:
+                self.assertEquals(resp.body['images_links'][0]['href'],
+                                  resp.body['next'])
+                query_string = resp.body['next'].split('?', 1)[1]
+
+        self.assertEquals([['a', 'b'], ['c', 'd'], ['e']], pages)
+
+    def test_on_get_skips_private_images_without_guid(self):
+        # Images being captured have no GUID yet
+        client = self._paging_client([
+            {'id': 2, 'globalIdentifier': 'b', 'name': 'bravo'},
+            {'id': 6, 'name': 'capture'},
+            {'id': 4, 'globalIdentifier': 'd', 'name': 'Delta'},
+        ])
+        self.app.get_endpoint_url.return_value = 'url'
+
+        resp = self._get_page(client, '')
+        self.assertEquals(['a', 'b', 'c', 'd', 'e'],
+                          [image['id'] for image in resp.body['images']])
+
+        resp = self._get_page(client, 'limit=3')
+        self.assertEquals(['a', 'b', 'c'],
+                          [image['id'] for image in resp.body['images']])
+        resp = self._get_page(client, resp.body['next'].split('?', 1)[1])
+        self.assertEquals(['d', 'e'],
+                          [image['id'] for image in resp.body['images']])
+
+    def test_on_get_accepts_guid_marker(self):
+        client = self._paging_client()
+        resp = self._get_page(client, 'marker=b&limit=10')
+        self.assertEquals(['c', 'd', 'e'],
+                          [image['id'] for image in resp.body['images']])
+        self.assertNotIn('next', resp.body)
+
+    def test_on_get_invalid_marker(self):
+        client = self._paging_client()
+        resp = self._get_page(client, 'marker=unknown')
+        self.assertEquals(resp.status, 400)
+
+    def test_format_v2_image_is_request_independent(self):
+        image = {'id': 1, 'globalIdentifier': 'a', 'name': 'CentOS 6'}
+        formatted = format_v2_image(image)
+        self.assertNotIn('links', formatted)
+        self.assertNotIn('owner', formatted)
+
+        res = add_v2_image_links(self.app, self.req, formatted, 1, 'tenant')
+        self.assertEquals(res['owner'], 'tenant')
+        self.assertEquals(len(res['links']), 3)
+        self.assertNotIn('links', formatted)
+
 class TestSLImages(unittest.TestCase):
     def setUp(self):
         self.client = MagicMock()
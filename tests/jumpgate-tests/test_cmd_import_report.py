@@ -0,0 +1,20 @@
+import sys
+import unittest
+
+import mock
+
+from jumpgate import cmd_import_report
+
+
+class TestImportReport(unittest.TestCase):
+    @mock.patch('jumpgate.common.startup.StartupProfile')
+    def test_main(self, profile_class):
+        with mock.patch.object(sys, 'argv', ['jumpgate-import-report',
+                                             '--config', 'jumpgate.conf',
+                                             '--top', '5']):
+            cmd_import_report.main()
+
+        profile_class.assert_called_once_with(profile_calls=False)
+        profile = profile_class.return_value
+        profile.run.assert_called_once_with('jumpgate.conf')
+        profile.report.assert_called_once_with(top=0, modules=5)
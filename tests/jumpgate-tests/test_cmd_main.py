@@ -0,0 +1,21 @@
+import unittest
+
+from mock import patch
+
+from jumpgate import cmd_main
+
+
+class TestMain(unittest.TestCase):
+
+    @patch('sys.argv', ['jumpgate', '--profile-startup'])
+    @patch('jumpgate.common.startup.StartupProfile')
+    def test_profile_startup(self, profile):
+        cmd_main.main()
+
+        profile.return_value.run.assert_called_once_with(None)
+        profile.return_value.report.assert_called_once_with(top=20,
+                                                            modules=0)
+
+    def test_jumpgate_not_imported_before_profiling(self):
+        # The profile times the import of jumpgate.wsgi and its modules
+        self.assertFalse(hasattr(cmd_main, 'wsgi'))
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from jumpgate import cmd_replay
+from jumpgate.testing import fake_slapi
+
+
+def make_record(time, method, route, path, query=None):
+    return {'time': time, 'method': method, 'route': route, 'path': path,
+            'query': query or {}, 'body_bytes': 0, 'status': 200,
+            'latency': 0.01, 'sl_calls': []}
+
+
+class EchoApp(object):
+    """Records the requests it gets and answers them like jumpgate."""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length).decode('utf-8')
+        with self.lock:
+            self.requests.append((environ['REQUEST_METHOD'],
+                                  environ['PATH_INFO'],
+                                  environ['QUERY_STRING'],
+                                  environ.get('HTTP_X_AUTH_TOKEN'),
+                                  json.loads(body) if body else None))
+        content = b'{}'
+        if environ['PATH_INFO'] == '/v2.0/tokens':
+            content = json.dumps({'access': {'token': {
+                'id': 'TOKEN', 'tenant': {'id': '42'}}}}).encode('utf-8')
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [content]
+
+
+class TestLoadRecords(unittest.TestCase):
+
+    def test_load_records(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'capture.jsonl')
+        with open(path + '.1', 'w') as f:
+            f.write(json.dumps(make_record(1, 'GET', None, '/a')) + '\n')
+            f.write(json.dumps(make_record(3, 'GET', None, '/c')) + '\n')
+        with open(path, 'w') as f:
+            f.write(json.dumps(make_record(2, 'GET', None, '/b')) + '\n\n')
+
+        records = cmd_replay.load_records([path])
+        self.assertEquals([record['path'] for record in records],
+                          ['/a', '/b', '/c'])
+
+
+class TestReplayer(unittest.TestCase):
+
+    def setUp(self):
+        self.app = EchoApp()
+        self.server = fake_slapi.FakeSLAPIServer(self.app).start()
+        self.addCleanup(self.server.stop)
+
+    def test_prepare(self):
+        replayer = cmd_replay.Replayer(self.server.url, token='T',
+                                       tenant_id='42')
+        self.assertEquals(
+            replayer.prepare(make_record(1, 'GET', 'v2_token',
+                                         '/v2.0/tokens/{token_id}')),
+            ('GET', '/v2.0/tokens/T', {}, None))
+        self.assertEquals(
+            replayer.prepare(make_record(1, 'DELETE', 'v2_server',
+                                         '/v2/{tenant_id}/servers/1')),
+            None)
+        replayer.include_writes = True
+        self.assertEquals(
+            replayer.prepare(make_record(1, 'DELETE', 'v2_server',
+                                         '/v2/{tenant_id}/servers/1')),
+            ('DELETE', '/v2/42/servers/1', {}, {}))
+
+    def test_replay(self):
+        replayer = cmd_replay.Replayer(self.server.url, username='user',
+                                       api_key='key')
+        replayer.authenticate()
+        self.assertEquals((replayer.token, replayer.tenant_id),
+                          ('TOKEN', '42'))
+
+        credentials = {'auth': {'passwordCredentials': {
+            'username': 'user', 'password': 'key'}}}
+        records = [
+            make_record(10, 'GET', 'v2_servers', '/v2/{tenant_id}/servers',
+                        {'limit': '1'}),
+            make_record(10.5, 'POST', 'v2_tokens', '/v2.0/tokens'),
+            make_record(11, 'POST', 'v2_servers', '/v2/{tenant_id}/servers'),
+        ]
+        elapsed = replayer.replay(records, speed=10, concurrency=1)
+
+        self.assertTrue(0.1 <= elapsed < 1)
+        self.assertEquals(self.app.requests[1:], [
+            ('GET', '/v2/42/servers', 'limit=1', 'TOKEN', None),
+            ('POST', '/v2.0/tokens', '', 'TOKEN', credentials),
+        ])
+        self.assertEquals(replayer.skipped, 1)
+        self.assertEquals(sorted(replayer.results), ['v2_servers',
+                                                     'v2_tokens'])
+        self.assertFalse(replayer.errors)
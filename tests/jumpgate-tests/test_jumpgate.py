@@ -96,6 +96,38 @@ class TestJumpgate(unittest.TestCase):
             call().setup_routes(self.app, identity_disp),
         ], any_order=True)
 
+    @patch('jumpgate.api.importlib.import_module')
+    def test_load_drivers_lazy(self, import_module):
+        compute_disp = MagicMock()
+        self.app._dispatchers = {'compute': compute_disp}
+
+        self.app.config = dict(TEST_CFG, lazy_load=True)
+        self.app.load_drivers()
+
+        import_module.assert_called_once_with('path.to.compute.driver')
+        driver = import_module.return_value
+        driver.add_hooks.assert_called_once_with(self.app)
+        self.assertFalse(driver.setup_routes.called)
+        self.assertEqual(self.app._lazy_drivers, {'compute': driver})
+
+    def test_make_api_lazy(self):
+        identity_disp = Dispatcher()
+        identity_disp.add_endpoint('v2_tokens', '/v2.0/tokens')
+        compute_disp = Dispatcher(mount='/compute')
+        compute_disp.add_endpoint('v2_servers', '/v2/{tenant_id}/servers')
+        self.app.add_dispatcher('identity', identity_disp)
+        self.app.add_dispatcher('compute', compute_disp)
+        self.app._lazy_drivers = {'identity': MagicMock(),
+                                  'compute': MagicMock()}
+
+        api = self.app.make_api()
+
+        self.assertEqual(api._routes, [])
+        # Sinks are tried in order: longest mount, root mount, NYI
+        self.assertEqual([sink.service for _, sink in api._sinks[:2]],
+                         ['compute', 'identity'])
+        self.assertEqual(api._sinks[0][1].default, api._sinks[2][1])
+
     def test_load_endpoints(self):
         self.app.config = TEST_CFG
         self.app.load_endpoints()
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from oslo.config import cfg
+import SoftLayer
+
+from jumpgate.common.sl import client as sl_client
+from jumpgate.common.sl import resilience
+from jumpgate.testing import fake_slapi
+
+
+class TestMasks(unittest.TestCase):
+
+    def test_parse_mask(self):
+        expected = {'id': {}, 'status': {'name': {}},
+                    'datacenter': {'name': {}, 'id': {}}}
+        for mask in ['mask[id,status.name,datacenter[name,id]]',
+                     'id, status.name, datacenter[name, id]',
+                     'mask(SoftLayer_Virtual_Guest)[id, status[name], '
+                     'datacenter.name, datacenter.id]']:
+            self.assertEquals(fake_slapi.parse_mask(mask), expected)
+        self.assertEquals(fake_slapi.parse_mask(None), None)
+
+    def test_apply_mask(self):
+        guest = {'id': 1, 'hostname': 'vs1',
+                 'status': {'keyName': 'ACTIVE', 'extra': {'a': 1}},
+                 'tagReferences': [{'tag': {'name': 't'}, 'id': 3}]}
+        self.assertEquals(fake_slapi.apply_mask(guest, None),
+                          {'id': 1, 'hostname': 'vs1'})
+        self.assertEquals(
+            fake_slapi.apply_mask(guest, fake_slapi.parse_mask('id,status')),
+            {'id': 1, 'status': {'keyName': 'ACTIVE'}})
+        self.assertEquals(
+            fake_slapi.apply_mask(guest,
+                                  fake_slapi.parse_mask('tagReferences.tag')),
+            {'id': 1, 'hostname': 'vs1',
+             'tagReferences': [{'id': 3, 'tag': {'name': 't'}}]})
+
+
+class TestFilters(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [
+            {'id': 1, 'name': 'Beta', 'cpus': 4, 'tags': [{'name': 'a'}]},
+            {'id': 2, 'name': 'alpha', 'cpus': 2, 'tags': [{'name': 'b'}]},
+            {'id': 3, 'name': 'gamma', 'cpus': 8, 'tags': []},
+        ]
+
+    def ids(self, tree):
+        return [item['id'] for item in
+                fake_slapi.apply_filter(self.items, tree)]
+
+    def test_operations(self):
+        query = SoftLayer.utils.query_filter
+        self.assertEquals(self.ids({'name': query('beta')}), [1])
+        self.assertEquals(self.ids({'name': query('*ta')}), [1])
+        self.assertEquals(self.ids({'name': query('> beta')}), [3])
+        self.assertEquals(self.ids({'cpus': query('>= 4')}), [1, 3])
+        self.assertEquals(self.ids({'cpus': query(2)}), [2])
+        self.assertEquals(self.ids({'tags': {'name': {
+            'operation': 'in',
+            'options': [{'name': 'data', 'value': ['a', 'b']}]}}}), [1, 2])
+
+    def test_order_by(self):
+        self.assertEquals(self.ids({'cpus': {
+            'operation': 'orderBy',
+            'options': [{'name': 'sort', 'value': ['DESC']}]}}), [3, 1, 2])
+
+
+class TestFakeSLAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.api = fake_slapi.FakeSLAPI(
+            fake_slapi.generate_account(guests=20, images=3))
+
+    def test_generate_account_is_deterministic(self):
+        self.assertEquals(fake_slapi.generate_account(guests=5, seed=1),
+                          fake_slapi.generate_account(guests=5, seed=1))
+
+    def test_list_and_get(self):
+        guests = self.api.call('Account', 'getVirtualGuests',
+                               mask='id, hostname', limit=5, offset=5)
+        self.assertEquals(len(guests), 5)
+        self.assertEquals(guests[0], {'id': 10000005,
+                                      'hostname': 'vs00005'})
+
+        guest = self.api.call('SoftLayer_Virtual_Guest', 'getObject',
+                              identifier='10000003', mask='id,datacenter')
+        self.assertEquals(guest['datacenter']['name'], 'dal05')
+        self.assertEquals(self.api.calls['Virtual_Guest.getObject'], 1)
+
+        self.assertRaises(fake_slapi.Fault, self.api.call, 'Virtual_Guest',
+                          'getObject', identifier=1)
+        self.assertRaises(fake_slapi.Fault, self.api.call, 'Virtual_Guest',
+                          'unknownMethod', identifier=10000003)
+
+    def test_derived_properties(self):
+        hourly = self.api.call('Account', 'getHourlyVirtualGuests')
+        monthly = self.api.call('Account', 'getMonthlyVirtualGuests')
+        self.assertEquals(len(hourly) + len(monthly), 20)
+        self.assertEquals(len(self.api.call('Account',
+                                            'getPublicNetworkVlans')), 2)
+
+    def test_create_and_delete(self):
+        guest = self.api.call('Virtual_Guest', 'createObject', [{
+            'hostname': 'new', 'domain': 'example.com', 'startCpus': 1,
+            'maxMemory': 1024, 'datacenter': {'name': 'dal05'}}])
+        self.assertEquals(
+            self.api.call('Virtual_Guest', 'getObject',
+                          identifier=guest['id'])['hostname'], 'new')
+
+        self.assertTrue(self.api.call('Virtual_Guest', 'powerOff',
+                                      identifier=guest['id']))
+        self.assertEquals(self.api.call('Virtual_Guest', 'getPowerState',
+                                        identifier=guest['id'])['keyName'],
+                          'HALTED')
+
+        self.assertTrue(self.api.call('Virtual_Guest', 'deleteObject',
+                                      identifier=guest['id']))
+        self.assertRaises(fake_slapi.Fault, self.api.call, 'Virtual_Guest',
+                          'getObject', identifier=guest['id'])
+
+    def test_profiles(self):
+        self.api.set_profile('Account.getObject', error_rate=1,
+                             fault_code='SoftLayer_Exception_Public')
+        self.assertRaises(fake_slapi.Fault, self.api.call, 'Account',
+                          'getObject')
+        self.api.call('Account', 'getCurrentUser')
+
+        with mock.patch('time.sleep') as sleep:
+            self.api.set_profile('Account', latency=0.5)
+            self.api.call('Account', 'getCurrentUser')
+        sleep.assert_called_once_with(0.5)
+
+    def test_fixture(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'account.json')
+        self.api.save_fixture(path)
+        self.assertEquals(fake_slapi.FakeSLAPI.from_fixture(path).data,
+                          self.api.data)
+
+
+class TestFakeSLAPIServer(unittest.TestCase):
+
+    def setUp(self):
+        self.api = fake_slapi.FakeSLAPI(
+            fake_slapi.generate_account(guests=12))
+        self.server = fake_slapi.FakeSLAPIServer(self.api).start()
+        self.addCleanup(self.server.stop)
+        patcher = mock.patch.object(resilience, '_breakers', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def override(self, name, value):
+        cfg.CONF.set_override(name, value, 'softlayer')
+        self.addCleanup(cfg.CONF.clear_override, name, 'softlayer')
+
+    def check_client(self, client):
+        cci = SoftLayer.CCIManager(client)
+        instances = cci.list_instances(hostname='vs0000*',
+                                       mask='id,hostname,datacenter')
+        self.assertEquals(len(instances), 10)
+        self.assertEquals(instances[0]['datacenter']['name'], 'dal05')
+
+        instance = cci.get_instance(10000011, mask='id, hostname')
+        self.assertEquals(instance, {'id': 10000011, 'hostname': 'vs00011'})
+
+        with self.assertRaises(SoftLayer.SoftLayerAPIError) as ctx:
+            cci.get_instance(1)
+        self.assertEquals(ctx.exception.faultCode,
+                          'SoftLayer_Exception_ObjectNotFound')
+
+    def test_xmlrpc(self):
+        self.check_client(SoftLayer.Client(
+            endpoint_url=self.server.xmlrpc_endpoint))
+        self.assertEquals(self.api.calls['Account.getVirtualGuests'], 1)
+
+    def test_rest(self):
+        self.override('transport', 'rest')
+        self.override('rest_endpoint', self.server.rest_endpoint)
+        client = sl_client.Client(username='user', api_key='key')
+        self.check_client(client)
+
+        self.assertTrue(client['Virtual_Guest'].setTags('a,b', id=10000001))
+        self.assertEquals(
+            client['Virtual_Guest'].getTagReferences(id=10000001,
+                                                     mask='tag'),
+            [{'tag': {'name': 'a'}}, {'tag': {'name': 'b'}}])
+
+    def test_injected_http_errors(self):
+        self.api.set_profile(error_rate=1, status=503)
+        client = SoftLayer.Client(endpoint_url=self.server.xmlrpc_endpoint)
+        with self.assertRaises(SoftLayer.TransportError) as ctx:
+            client['Account'].getObject()
+        self.assertEquals(ctx.exception.faultCode, 503)
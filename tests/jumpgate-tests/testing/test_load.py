@@ -0,0 +1,44 @@
+import os.path
+import unittest
+
+from jumpgate.testing import load
+
+DIR_PATH = os.path.dirname(os.path.dirname(__file__))
+TEST_CFG_LOC = os.path.join(DIR_PATH, 'test.jumpgate.conf')
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_percentile(self):
+        durations = [0.5, 0.1, 0.4, 0.2, 0.3]
+        self.assertEqual(load.percentile(durations, 50), 0.3)
+        self.assertEqual(load.percentile(durations, 99), 0.5)
+        self.assertEqual(load.percentile([], 50), 0)
+
+
+class TestLoadHarness(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.harness = load.LoadHarness(TEST_CFG_LOC, guests=10)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.harness.close()
+
+    def test_call_budgets(self):
+        for name, method, path, budget in load.FLOWS:
+            self.harness.check_budget(name, method, path, budget)
+
+    def test_budget_exceeded(self):
+        self.assertRaises(load.BudgetExceeded, self.harness.check_budget,
+                          'servers_list', 'GET',
+                          '/compute/v2/{tenant_id}/servers', 0)
+
+    def test_run_flow(self):
+        result = self.harness.run_flow('GET', '/v2.0/tokens/{token}',
+                                       requests=6, concurrency=2)
+        self.assertEqual(result['requests'], 6)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['slapi_calls'], 1)
+        self.assertTrue(result['p50'] <= result['p99'])